@@ -55,6 +55,8 @@ if __name__ == "__main__":
             lambda:
             f"angular_v1x10^6 = {round(robots[0].get_angular_velocity() * 1000000, 3)}\n",
             lambda: f"angle1 = {robots[0].get_angle():0.2f}\n",
+            lambda:
+            f"collisions = {simulator.number_of_collisions_occurred}\n",
         ],
     )
 
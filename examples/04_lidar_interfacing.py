@@ -23,14 +23,14 @@ class customHumanControlled(HumanControlled):
         base_color: tuple[int, int, int] = (0, 128, 255),
         outline_color: tuple[int, int, int] = (0, 0, 0),
         group=1,
-        trigger=lambda: False,
+        trigger=lambda inputs: False,
     ):
         super().__init__(position, angle, size, center_of_rotation, sensors,
                          base_color, outline_color)
         self.trigger = trigger
 
     def event_handler(self, events):
-        if self.trigger():
+        if self.trigger(events):
             super().event_handler(events)
 
 
@@ -87,8 +87,7 @@ if __name__ == "__main__":
                 ),
             ],
             base_color=(255, 100, 201),
-            trigger=lambda: True
-            if pg.key.get_pressed()[pg.K_LCTRL] else False,
+            trigger=lambda inputs: True if inputs.keys[pg.K_LCTRL] else False,
         ),
         customHumanControlled(
             position=[550, 450],
@@ -103,8 +102,7 @@ if __name__ == "__main__":
                 customLIDARSensor(angle=45),
             ],
             base_color=(10, 100, 88),
-            trigger=lambda: False
-            if pg.key.get_pressed()[pg.K_LCTRL] else True,
+            trigger=lambda inputs: False if inputs.keys[pg.K_LCTRL] else True,
         ),
     ]
 
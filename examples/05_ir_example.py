@@ -10,6 +10,7 @@ from src.robot.human_controlled import HumanControlled
 from src.simulator.line_follower import LineSim
 from src.robot.utils.sensor import IRSensor
 import src.utils.helper_functions as hf
+from src.utils.control_systems import PIDController
 
 
 def create_ir_sensors() -> list[IRSensor]:
@@ -20,25 +21,6 @@ def create_ir_sensors() -> list[IRSensor]:
     ]
 
 
-class PIDController:
-
-    def __init__(self, kp: float, ki: float, kd: float):
-        self.kp = kp
-        self.ki = ki
-        self.kd = kd
-        self.previous_error = 0
-        self.integral = 0
-
-    def calculate(self, error: float, delta_time: float) -> float:
-        self.integral += error * delta_time
-        self.derivative = (error - self.previous_error) / delta_time
-        self.output = (self.kp * error) + (self.ki * self.integral) + (
-            self.kd * self.derivative)
-        self.previous_error = error
-        print(self.output)
-        return self.output
-
-
 class SimplePIDLineFollower(HumanControlled):
     auto_driving: bool = True
 
@@ -9,24 +9,21 @@ import random
 import time
 import pygame as pg
 import numpy as np
-import pandas as pd
 
 from src.robot.human_controlled import HumanControlled
 from src.simulator.maze_solver import MazeSim
+from src.simulator.maze_walls import CellTransform
 from src.robot.utils.sensor import LIDARSensor
+from src.utils.telemetry import TelemetryWriter
 import src.utils.helper_functions as hf
 from examples.helpers.micro_mouse_maze import MicroMouseMaze
-from examples.helpers.control_systems import PIDController as PID
+from src.utils.control_systems import PIDController as PID
 
 l = logging.getLogger(__name__)
 
 
 class MicroMouseController:
     _last_updated_on: float = -1
-    commands: pd.DataFrame = pd.DataFrame(
-        columns=["command", "argument", "status", "error"])
-    maze_data: pd.DataFrame = pd.DataFrame(
-        columns=["current_cell", "facing", "right", "front", "left"])
     maze = MicroMouseMaze(size=16)
 
     save_data_every_n_commands = 10
@@ -41,6 +38,7 @@ class MicroMouseController:
         cell_width_height=35,
         wall_width=4,
         starting_cell: int = 0,
+        cell_transform: CellTransform = None,
     ) -> None:
         self.starting_position: pg.Vector2 = pg.Vector2(initial_position)
         self.position: pg.Vector2 = pg.Vector2(initial_position)
@@ -51,8 +49,42 @@ class MicroMouseController:
         self.wall_width = wall_width
         self.starting_cell = starting_cell
         self.current_cell = self.starting_cell
+        self.cell_transform = cell_transform
+        """Pixel position of the cells, set from `MazeSim.cell_transform` once the simulator exists"""
         
         self.__start_time_stamp = time.strftime("%Y-%m-%d, %H%M%S")
+        self.maze_data = TelemetryWriter(
+            f"bin/mazes/maze_data {self.__start_time_stamp}.csv",
+            {
+                "current_cell": np.int32,
+                "facing": str,
+                "right": bool,
+                "front": bool,
+                "left": bool,
+            },
+            chunk_size=self.save_data_every_n_commands,
+        )
+        self.commands = TelemetryWriter(
+            f"bin/commands/commands {self.__start_time_stamp}.csv",
+            {
+                "command": str,
+                "argument": np.float64,
+                "status": bool,
+                "error": str,
+            },
+            chunk_size=self.save_data_every_n_commands,
+        )
+        self._pending_command = None
+
+    def close(self):
+        """
+        Write the buffered telemetry, logging the command still running as not finished.
+        """
+        if self._pending_command is not None:
+            self.commands.append(*self._pending_command[:2], False, "")
+            self._pending_command = None
+        self.maze_data.close()
+        self.commands.close()
 
     def update(
         self,
@@ -90,18 +122,13 @@ class MicroMouseController:
             else:
                 facing_direction = 'east'
 
-            __x_rel =hf.calculate_error_and_round(hf.map_value(self.position.x, 1102, 515, 0, -15))
-            __y_rel = hf.calculate_error_and_round(hf.map_value(self.position.y, 606, 24, 0, 15))
-            l.debug(f"476, __x_rel = {__x_rel}, __y_rel = {__y_rel}")
-            pos_in_cell_num = pg.Vector2(
-                __x_rel[0],
-                __y_rel[0],
-            ) #* throws type error if calculate_error_and_round returns None
+            __cell = self.cell_transform.cell_of(self.position,
+                                                 max_offset=0.25)
+            l.debug(f"476, __cell = {__cell}")
+            self.current_cell = self.maze.node_of_cell(
+                *__cell)  #* throws type error if cell_of returns None
             l.debug("784")
 
-            self.current_cell = abs(pos_in_cell_num.x) + abs(
-                pos_in_cell_num.y * 16)
-
             l.info(f"CURRENT CELL: {self.current_cell}")
             l.info(f"POSITION: {position}")
             l.info(f"ANGLE: {angle}")
@@ -122,13 +149,13 @@ class MicroMouseController:
                         lidar_data[2] ,
                         lidar_data[0] ,
                     ]}")
-                    self.maze_data.loc[self.maze_data.shape[0]] = [
+                    self.maze_data.append(
                         self.current_cell,
                         facing_direction,
                         __maze_data[0],
                         __maze_data[1],
                         __maze_data[2],
-                    ]
+                    )
                     l.info(f"MAZE DATA: {[
                         self.current_cell,
                         facing_direction,
@@ -145,23 +172,9 @@ class MicroMouseController:
                     )
 
                     if self.current_cell in [118, 119, 134, 135]:
-                        self.maze_data.to_csv(
-                            f"bin/mazes/maze_data {self.__start_time_stamp}.csv",
-                            index=False,
-                        )
+                        self.close()
                         print(f"One of the mid points(118, 119, 134, 135) i.e. {self.current_cell} is reached.")
                         exit()
-                        
-                    if self.commands.shape[
-                            0] % self.save_data_every_n_commands == 0:
-                        self.maze_data.to_csv(
-                            f"bin/mazes/maze_data {self.__start_time_stamp}.csv",
-                            index=False,
-                        )
-                        self.commands.to_csv(
-                            f"bin/commands/commands {self.__start_time_stamp}.csv",
-                            index=False,
-                        )
 
             else:
                 self.stack.append(self.starting_cell)
@@ -170,13 +183,13 @@ class MicroMouseController:
                     front=True,
                     facing_direction=facing_direction,
                 )
-                self.maze_data.loc[self.maze_data.shape[0]] = [
+                self.maze_data.append(
                     self.starting_cell,
                     facing_direction,
                     False,
                     True,
                     False,
-                ]
+                )
                 l.info(f"MAZE DATA: {[
                     self.starting_cell,
                     facing_direction,
@@ -190,10 +203,10 @@ class MicroMouseController:
                 
                 return -1
             else:
-                self.commands.loc[
-                    self.commands.shape[0] - 1,
-                    "status",
-                ] = True
+                if self._pending_command is not None:
+                    # the previous command is finished, log it as such
+                    self.commands.append(*self._pending_command[:2], True, "")
+                    self._pending_command = None
                 command_options = []
                 command = None
                 if len(self.commands_stack) == 0:
@@ -245,7 +258,7 @@ class MicroMouseController:
                 # Select a random command from the options
                 command = random.choice(
                     command_options) if command == None else command
-                self.commands.loc[self.commands.shape[0]] = command
+                self._pending_command = command
                 # print(self.commands)
                 l.info(f"COMMAND: {command}")
                 # print(command_options, command)
@@ -260,7 +273,6 @@ class MicroMouseController:
 
 class customHumanControlled(HumanControlled):
     __log_file_name: str = f"bin/micromouse_data_{time.strftime('%Y%m%d_%H%M%S')}.csv"
-    __mm_data = None
 
     translate_cart: bool = False
     tc_target = None
@@ -283,7 +295,7 @@ class customHumanControlled(HumanControlled):
         sensors: list,
         base_color: tuple[int, int, int] = (0, 128, 255),
         outline_color: tuple[int, int, int] = (0, 0, 0),
-        trigger=lambda: False,
+        trigger=lambda inputs: False,
     ):
         super().__init__(position, angle, size, center_of_rotation, sensors,
                          base_color, outline_color)
@@ -292,42 +304,49 @@ class customHumanControlled(HumanControlled):
             initial_position=position,
             initial_angle=angle,
         )
+        self.__mm_data = TelemetryWriter(
+            self.__log_file_name,
+            dict.fromkeys([
+                'Time',
+                'Position_X',
+                'Position_Y',
+                'Velocity_X',
+                'Velocity_Y',
+                'Acceleration',
+                'Angle',
+                'Angular_Velocity',
+                'Angular_Acceleration',
+            ], np.float64),
+        )
 
         self.__acc_values = np.random.binomial(1300, 0.9, size=100000)
         self.__ang_acc_values = np.random.binomial(80, 0.8, size=100000)
 
     def event_handler(self, events):
         #! pg.key.set_repeat(1)
-        if self.trigger():
+        if self.trigger(events):
             super().event_handler(events)
-            keys = pg.key.get_pressed()  # Get the current state of all keys
-            for event in events:
-                if event.type == pg.KEYDOWN:
-                    if event.key == pg.K_s:
-                        self.set_angular_acceleration(0)
-                        self.set_angular_velocity(0)
-
-                if keys[pg.K_UP]:
-                    self.set_acceleration(
-                        [random.choice(self.__acc_values), 0])
-                elif keys[pg.K_DOWN]:
-                    self.set_acceleration(
-                        [-random.choice(self.__acc_values), 0])
-                else:
-                    self.set_acceleration([0, 0])
+            keys = events.keys  # The state of all keys, captured once per frame
 
-                # Control for turning
-                if keys[pg.K_LEFT]:  # Turn left
-                    self.set_angular_acceleration(
-                        -random.choice(self.__ang_acc_values))
-                elif keys[pg.K_RIGHT]:  # Turn right
-                    self.set_angular_acceleration(
-                        random.choice(self.__ang_acc_values))
-                else:
-                    self.set_angular_acceleration(0)
+            if keys[pg.K_UP]:
+                self.set_acceleration([random.choice(self.__acc_values), 0])
+            elif keys[pg.K_DOWN]:
+                self.set_acceleration([-random.choice(self.__acc_values), 0])
+            else:
+                self.set_acceleration([0, 0])
+
+            # Control for turning
+            if keys[pg.K_LEFT]:  # Turn left
+                self.set_angular_acceleration(
+                    -random.choice(self.__ang_acc_values))
+            elif keys[pg.K_RIGHT]:  # Turn right
+                self.set_angular_acceleration(
+                    random.choice(self.__ang_acc_values))
+            else:
+                self.set_angular_acceleration(0)
 
-                if keys[pg.K_b]:
-                    self.__mm_data.to_csv(self.__log_file_name, index=False)
+            if keys[pg.K_b]:
+                self.__mm_data.flush()
 
     def update(self, time_step: float, events):
         try:
@@ -341,7 +360,7 @@ class customHumanControlled(HumanControlled):
         command = self.mouse.update(
             __pos,
             __angle,
-            [self._sensors[i].distance for i in range(len(self._sensors))],
+            self.sensor_data,
             previous_command_status=(not self.translate_cart)
             and (not self.rotate_cart),
         )
@@ -371,7 +390,7 @@ class customHumanControlled(HumanControlled):
                 l.debug("470")
                 self.set_acceleration([
                     self.tcPID.calculate(
-                        self._sensors[int(self.current_command[0][1])].distance
+                        self.sensor_data[int(self.current_command[0][1])]
                         - self.current_command[1],
                         dt,
                     ),
@@ -379,11 +398,11 @@ class customHumanControlled(HumanControlled):
                 ])
                 l.debug("157")
                 if abs(self.current_command[1] -
-                       self._sensors[int(self.current_command[0][1])].distance
+                       self.sensor_data[int(self.current_command[0][1])]
                        ) < self.tc_accepted_error:
                     self.translate_cart = False
                     self.set_acceleration([0, 0])
-                    l.debug(f"981, {self.current_command[1] -self._sensors[int(self.current_command[0][1])].distance}")
+                    l.debug(f"981, {self.current_command[1] -self.sensor_data[int(self.current_command[0][1])]}")
             else:
                 self.set_acceleration([
                     self.tcPID.calculate(
@@ -408,30 +427,25 @@ class customHumanControlled(HumanControlled):
                 self.rotate_cart = False
                 self.set_angular_acceleration(0)
 
-        data = {
-            'Time': time.time(),
-            'Position_X': __pos.x,
-            'Position_Y': __pos.y,
-            'Velocity_X': self.get_velocity().x,
-            'Velocity_Y': self.get_velocity().y,
-            'Acceleration': self.acceleration[0],
-            'Angle': math.radians(__angle),
-            'Angular_Velocity': self.get_angular_velocity(),
-            'Angular_Acceleration': self.get_angular_acceleration(),
-        }
-
-        df = pd.DataFrame([data])
-        if self.__mm_data is not None:
-            self.__mm_data = pd.concat(
-                [self.__mm_data, df],
-                ignore_index=True,
-                sort=False,
-            )
-        else:
-            self.__mm_data = df.copy()
+        self.__mm_data.append(
+            time.time(),
+            __pos.x,
+            __pos.y,
+            self.get_velocity().x,
+            self.get_velocity().y,
+            self.acceleration[0],
+            math.radians(__angle),
+            self.get_angular_velocity(),
+            self.get_angular_acceleration(),
+        )
 
         super().update(time_step, events)
 
+    def close(self):
+        self.mouse.close()
+        self.__mm_data.close()
+        super().close()
+
 
 class customLIDARSensor(LIDARSensor):
     angle_to_position: dict = {
@@ -482,8 +496,7 @@ if __name__ == "__main__":
                 customLIDARSensor(angle=90),
             ],
             base_color=(10, 100, 88),
-            trigger=lambda: False
-            if pg.key.get_pressed()[pg.K_LCTRL] else True,
+            trigger=lambda inputs: False if inputs.keys[pg.K_LCTRL] else True,
         ),
     ]
 
@@ -510,6 +523,8 @@ if __name__ == "__main__":
             lambda:
             f"position = {hf.round_vec_2d(robots[0].mouse.position, 3)}\n",
         ],
+        maze_size=16,
     )
+    robots[0].mouse.cell_transform = simulator.cell_transform
 
     simulator.run()
@@ -0,0 +1,207 @@
+import heapq
+import logging
+import math
+
+from examples.helpers.micro_mouse_maze import MicroMouseMaze
+
+l = logging.getLogger(__name__)
+
+
+class DStarLite:
+    """
+    Incremental shortest path planner (D* Lite) from the mouse to the goal cells of a MicroMouseMaze.
+
+    The search runs backwards from the goals, so when the mouse moves only the heuristic offset
+    changes, and when the maze reveals a wall or an opening only the vertices whose cost is affected
+    are repaired instead of replanning from scratch. Passages whose state is not known yet are
+    assumed to be open, see `MicroMouseMaze.optimistic_neighbours`.
+
+    Attributes:
+    -----------
+    maze : MicroMouseMaze
+        The maze planned in.
+    goals : set of int
+        The goal cells.
+    start : int
+        The cell the mouse is in.
+    """
+
+    def __init__(self, maze: MicroMouseMaze, start, goals=None):
+        """
+        Initializes the planner and subscribes it to the changes of the maze.
+
+        Parameters:
+        -----------
+        maze : MicroMouseMaze
+            The maze planned in.
+        start : int
+            The cell the mouse is in.
+        goals : iterable of int, optional
+            The goal cells, the four centre cells of the maze by default.
+        """
+        self.maze = maze
+        if goals is None:
+            half = maze.size // 2
+            goals = [
+                row * maze.size + col for row in (half - 1, half)
+                for col in (half - 1, half)
+            ]
+        self.goals = set(goals)
+        self.start = start
+        self._km = 0
+
+        self._g = [math.inf] * maze.total_nodes
+        self._rhs = [math.inf] * maze.total_nodes
+        self._queue = []  # (key, node), with stale entries
+        self._queued = {}  # node -> its current key in _queue
+        self._neighbours = [
+            set(maze.optimistic_neighbours(node))
+            for node in range(maze.total_nodes)
+        ]
+
+        for goal in self.goals:
+            self._rhs[goal] = 0
+            self._push(goal)
+        maze.add_listener(self.update)
+
+    def _distance(self, node, other):
+        row, col = divmod(node, self.maze.size)
+        other_row, other_col = divmod(other, self.maze.size)
+        return abs(row - other_row) + abs(col - other_col)
+
+    def _heuristic(self, node):
+        return self._distance(self.start, node)
+
+    def _key(self, node):
+        best = min(self._g[node], self._rhs[node])
+        return (best + self._heuristic(node) + self._km, best)
+
+    def _push(self, node):
+        key = self._key(node)
+        self._queued[node] = key
+        heapq.heappush(self._queue, (key, node))
+
+    def _update_vertex(self, node):
+        if node not in self.goals:
+            self._rhs[node] = min(
+                (self._g[neighbour] + 1
+                 for neighbour in self._neighbours[node]),
+                default=math.inf,
+            )
+        if self._g[node] != self._rhs[node]:
+            self._push(node)
+        else:
+            self._queued.pop(node, None)
+
+    def _top(self):
+        """Returns the smallest up to date queue entry, dropping stale ones."""
+        while self._queue:
+            key, node = self._queue[0]
+            if self._queued.get(node) == key:
+                return key, node
+            heapq.heappop(self._queue)
+        return (math.inf, math.inf), None
+
+    def _compute_shortest_path(self):
+        g, rhs = self._g, self._rhs
+        while True:
+            old_key, node = self._top()
+            if node is None or (old_key >= self._key(self.start)
+                                and rhs[self.start] == g[self.start]):
+                return
+            heapq.heappop(self._queue)
+            del self._queued[node]
+
+            new_key = self._key(node)
+            if old_key < new_key:
+                self._push(node)
+            elif g[node] > rhs[node]:
+                g[node] = rhs[node]
+                for neighbour in self._neighbours[node]:
+                    self._update_vertex(neighbour)
+            else:
+                g[node] = math.inf
+                self._update_vertex(node)
+                for neighbour in self._neighbours[node]:
+                    self._update_vertex(neighbour)
+
+    def update(self, node):
+        """
+        Takes into account new knowledge about a node, called by the maze.
+
+        Parameters:
+        -----------
+        node : int
+            The node which got visited or had a passage opened.
+        """
+        changed = set()
+        for cell in [node] + [
+                node + offset for bit, offset in self.maze._offsets.items()
+                if self.maze._in_bounds[node] & bit
+        ]:
+            neighbours = set(self.maze.optimistic_neighbours(cell))
+            if neighbours != self._neighbours[cell]:
+                changed.add(cell)
+                changed.update(neighbours ^ self._neighbours[cell])
+                self._neighbours[cell] = neighbours
+
+        for cell in changed:
+            self._update_vertex(cell)
+
+    def set_start(self, node):
+        """
+        Moves the mouse to another cell.
+
+        The heuristic is measured from the mouse, so moving it lowers the keys already in the queue
+        by at most the distance moved; that distance is added to every key computed from now on
+        instead of recomputing the queue.
+        """
+        self._km += self._distance(self.start, node)
+        self.start = node
+
+    def plan(self, start=None):
+        """
+        Returns a shortest path from the mouse to the closest goal, reusing the previous searches.
+
+        Parameters:
+        -----------
+        start : int, optional
+            The cell the mouse is in, if it moved since the last call.
+
+        Returns:
+        --------
+        list of int or None
+            The cells of the path, both ends included, or None if no goal can be reached.
+        """
+        if start is not None and start != self.start:
+            self.set_start(start)
+        self._compute_shortest_path()
+
+        node = self.start
+        if self._g[node] == math.inf and self._rhs[node] == math.inf:
+            return None
+        path = [node]
+        while node not in self.goals:
+            node = min(self._neighbours[node],
+                       key=self._g.__getitem__,
+                       default=None)
+            if node is None or self._g[node] == math.inf:
+                return None
+            path.append(node)
+        return path
+
+    def generate_commands(self,
+                          start=None,
+                          initial_facing="north",
+                          cell_width_hight=35):
+        """
+        Generates the movement commands to the closest goal, in the format of `MicroMouseMaze.generate_shortest_path_commands`.
+        """
+        path = self.plan(start)
+        if path is None or len(path) < 2:
+            return []
+        return self.maze.generate_path_commands(
+            path,
+            initial_facing=initial_facing,
+            cell_width_hight=cell_width_hight,
+        )
@@ -0,0 +1,172 @@
+import heapq
+import logging
+
+from examples.helpers.micro_mouse_maze import MicroMouseMaze
+
+l = logging.getLogger(__name__)
+
+
+class FloodFill:
+    """
+    Keeps the distance (in cells) from every cell of a MicroMouseMaze to the goal cells, the way micromouse firmware does.
+
+    Passages whose state is not known yet are assumed to be open, see `MicroMouseMaze.optimistic_neighbours`.
+    Whenever the maze learns something about a cell, only the cells whose distance actually changes
+    are re-flooded, starting from that cell and its neighbours.
+
+    Attributes:
+    -----------
+    maze : MicroMouseMaze
+        The maze the distances are kept for.
+    goals : set of int
+        The goal cells, at distance 0.
+    distances : list of int
+        The distance of each cell to the closest goal, `unreachable` if there is no path.
+    unreachable : int
+        Distance value of cells from which no goal can be reached.
+    """
+
+    def __init__(self, maze: MicroMouseMaze, goals=None):
+        """
+        Initializes the flood fill and subscribes it to the changes of the maze.
+
+        Parameters:
+        -----------
+        maze : MicroMouseMaze
+            The maze the distances are kept for.
+        goals : iterable of int, optional
+            The goal cells, the four centre cells of the maze by default.
+        """
+        self.maze = maze
+        if goals is None:
+            half = maze.size // 2
+            goals = [
+                row * maze.size + col for row in (half - 1, half)
+                for col in (half - 1, half)
+            ]
+        self.goals = set(goals)
+        self.unreachable = maze.total_nodes
+        self.reflood()
+        maze.add_listener(self.update)
+
+    def reflood(self):
+        """
+        Recomputes all the distances from scratch with a breadth-first search from the goals.
+        """
+        self.distances = [self.unreachable] * self.maze.total_nodes
+        frontier = list(self.goals)
+        for goal in frontier:
+            self.distances[goal] = 0
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for node in frontier:
+                for neighbour in self.maze.optimistic_neighbours(node):
+                    if self.distances[neighbour] > distance:
+                        self.distances[neighbour] = distance
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+
+    def update(self, node):
+        """
+        Re-floods the region affected by new knowledge about a node, in two phases.
+
+        First the cells which lost the neighbour their distance came from are raised to
+        `unreachable`, following the cells which depended on them. Then the raised cells, and the
+        node with its neighbours, are lowered again in breadth-first order from their smallest
+        settled neighbour. Each affected cell is settled once, so the work stays proportional to the
+        number of cells whose distance changes, even when a dead end is found.
+
+        Parameters:
+        -----------
+        node : int
+            The node something new was learnt about.
+        """
+        maze = self.maze
+        distances = self.distances
+        unreachable = self.unreachable
+        seeds = [node] + [
+            node + offset for bit, offset in maze._offsets.items()
+            if maze._in_bounds[node] & bit
+        ]
+
+        # raise: a cell keeps its distance only while a neighbour is one closer to the goals
+        raised = []
+        stack = list(seeds)
+        while stack:
+            cell = stack.pop()
+            distance = distances[cell]
+            if cell in self.goals or distance >= unreachable:
+                continue
+            neighbours = maze.optimistic_neighbours(cell)
+            if any(distances[neighbour] == distance - 1
+                   for neighbour in neighbours):
+                continue
+            distances[cell] = unreachable
+            raised.append(cell)
+            stack.extend(neighbour for neighbour in neighbours
+                         if distances[neighbour] == distance + 1)
+
+        # lower: settle the raised cells and the seeds from their neighbours, closest first
+        heap = []
+        for cell in raised + seeds:
+            if cell in self.goals:
+                continue
+            distance = min(
+                (distances[neighbour]
+                 for neighbour in maze.optimistic_neighbours(cell)),
+                default=unreachable,
+            ) + 1
+            if distance < distances[cell]:
+                distances[cell] = distance
+                heapq.heappush(heap, (distance, cell))
+        while heap:
+            distance, cell = heapq.heappop(heap)
+            if distance != distances[cell]:
+                continue  # lowered again after being queued
+            for neighbour in maze.optimistic_neighbours(cell):
+                if distance + 1 < distances[neighbour]:
+                    distances[neighbour] = distance + 1
+                    heapq.heappush(heap, (distance + 1, neighbour))
+
+    def next_cell(self, node):
+        """
+        Returns the passable neighbour of a node closest to the goals, or None if the goals cannot be reached.
+        """
+        if self.distances[node] >= self.unreachable:
+            return None
+        return min(self.maze.optimistic_neighbours(node),
+                   key=self.distances.__getitem__,
+                   default=None)
+
+    def path_to_goal(self, node):
+        """
+        Returns the path from a node to the closest goal by descending the distances.
+
+        The path goes through passages not known yet, so it is the optimistic route the mouse should
+        try, and it changes as walls get discovered.
+        """
+        path = [node]
+        while path[-1] not in self.goals:
+            cell = self.next_cell(path[-1])
+            if cell is None:
+                return None
+            path.append(cell)
+        return path
+
+    def generate_commands(self,
+                          node,
+                          initial_facing="north",
+                          cell_width_hight=35):
+        """
+        Generates the movement commands to the closest goal, in the format of `MicroMouseMaze.generate_shortest_path_commands`.
+        """
+        path = self.path_to_goal(node)
+        if path is None or len(path) < 2:
+            return []
+        return self.maze.generate_path_commands(
+            path,
+            initial_facing=initial_facing,
+            cell_width_hight=cell_width_hight,
+        )
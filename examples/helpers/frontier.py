@@ -0,0 +1,171 @@
+import heapq
+import random
+
+
+class Frontier:
+    """
+    Keeps the set of cells of a MicroMouseMaze which are reachable but not visited yet.
+
+    A cell is on the frontier when it is unvisited and has an open passage to a visited cell. The set
+    is updated incrementally from the notifications of the maze, and the next cell to explore is
+    picked from it by a selection policy:
+
+    - "latest": the most recently discovered cell, i.e. depth-first exploration, O(1).
+    - "random": a uniformly random cell, O(1).
+    - "heuristic": the cell closest (Manhattan distance) to the centre of the maze, O(log n).
+    - "nearest": the cell closest (Manhattan distance) to the current cell, O(frontier size).
+    - any callable (frontier, current_cell) -> cell.
+
+    Attributes:
+    -----------
+    maze : MicroMouseMaze
+        The maze the frontier is kept for.
+    policy : str or callable
+        The selection policy used by `select`.
+    """
+
+    def __init__(self, maze, policy="latest", seed=None):
+        """
+        Initializes the frontier and subscribes it to the changes of the maze.
+
+        Parameters:
+        -----------
+        maze : MicroMouseMaze
+            The maze the frontier is kept for.
+        policy : str or callable, optional
+            The selection policy (default is "latest").
+        seed : int, optional
+            Seed of the random generator used by the "random" policy.
+        """
+        self.maze = maze
+        self.policy = policy
+        self._random = random.Random(seed)
+        self.rebuild()
+        maze.add_listener(self.update)
+
+    def rebuild(self):
+        """
+        Recomputes the frontier from scratch.
+        """
+        self._order = {}  # cell -> None, in discovery order
+        self._cells = []  # for O(1) random picks
+        self._index = {}  # cell -> position in _cells
+        self._heap = []  # (distance to centre, cell), with stale entries
+        for node in range(self.maze.total_nodes):
+            self.update(node)
+
+    def copy(self, maze):
+        """
+        Returns an independent copy of the frontier for a copy of its maze, without recomputing it.
+
+        The discovery order and the state of the random generator are kept, so the copy picks the
+        same cells as the original would.
+
+        Parameters:
+        -----------
+        maze : MicroMouseMaze
+            The copy of the maze the new frontier is kept for; it gets subscribed to it.
+        """
+        other = Frontier.__new__(Frontier)
+        other.maze = maze
+        other.policy = self.policy
+        other._random = random.Random()
+        other._random.setstate(self._random.getstate())
+        other._order = dict(self._order)
+        other._cells = list(self._cells)
+        other._index = dict(self._index)
+        other._heap = list(self._heap)
+        maze.add_listener(other.update)
+        return other
+
+    def __contains__(self, node):
+        return node in self._index
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def _add(self, node):
+        if node in self._index:
+            return
+        self._order[node] = None
+        self._index[node] = len(self._cells)
+        self._cells.append(node)
+        heapq.heappush(self._heap, (self._centre_distance(node), node))
+
+    def _remove(self, node):
+        index = self._index.pop(node, None)
+        if index is None:
+            return
+        del self._order[node]
+        last = self._cells.pop()
+        if last != node:
+            self._cells[index] = last
+            self._index[last] = index
+
+    def _centre_distance(self, node):
+        row, col = divmod(node, self.maze.size)
+        centre = (self.maze.size - 1) / 2
+        return abs(row - centre) + abs(col - centre)
+
+    def update(self, node):
+        """
+        Updates the frontier after something new was learnt about a node.
+
+        Parameters:
+        -----------
+        node : int
+            The node which got visited or had a passage opened.
+        """
+        visited = self.maze.is_visited(node)
+        if visited:
+            self._remove(node)
+        for neighbour in self.maze.neighbours(node):
+            neighbour_visited = self.maze.is_visited(neighbour)
+            if visited and not neighbour_visited:
+                self._add(neighbour)
+            elif neighbour_visited and not visited:
+                self._add(node)
+
+    def select(self, current_cell=None):
+        """
+        Picks the next cell to explore with the selection policy.
+
+        Parameters:
+        -----------
+        current_cell : int, optional
+            The cell the mouse is in, needed by the "nearest" policy.
+
+        Returns:
+        --------
+        int
+            A reachable unvisited cell.
+
+        Raises:
+        -------
+        IndexError
+            If there is no cell left to explore.
+        """
+        if not self._cells:
+            raise IndexError("No cell left to explore")
+
+        if callable(self.policy):
+            return self.policy(self, current_cell)
+        if self.policy == "latest":
+            return next(reversed(self._order))
+        if self.policy == "random":
+            return self._random.choice(self._cells)
+        if self.policy == "heuristic":
+            while self._heap[0][1] not in self._index:
+                heapq.heappop(self._heap)  # drop cells visited meanwhile
+            return self._heap[0][1]
+        if self.policy == "nearest":
+            row, col = divmod(current_cell, self.maze.size)
+            return min(
+                self._cells,
+                key=lambda cell: abs(cell // self.maze.size - row) + abs(
+                    cell % self.maze.size - col),
+            )
+        raise ValueError(f"Unknown frontier policy: {self.policy}")
@@ -1,15 +1,50 @@
-import random
+import heapq
 import logging
+import math
+import struct
+from collections import deque
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import networkx as nx
 
+from examples.helpers.frontier import Frontier
+
 l = logging.getLogger(__name__)
 
 
+#* passage bits of a cell, named after the directions used by add_edges
+#* (i.e. with north/south and east/west switched, see the note in add_edges)
+EAST = 1  # towards cell - 1
+WEST = 2  # towards cell + 1
+NORTH = 4  # towards cell + size
+SOUTH = 8  # towards cell - size
+VISITED = 16
+"""Bit marking a visited cell, stored in the same byte as its passages"""
+
+DIRECTION_BITS = {"east": EAST, "west": WEST, "north": NORTH, "south": SOUTH}
+OPPOSITE = {EAST: WEST, WEST: EAST, NORTH: SOUTH, SOUTH: NORTH}
+
+MAZE_FORMAT_MAGIC = b"MMZ1"
+"""First bytes of a maze saved by `MicroMouseMaze.to_bytes`"""
+
+# (front, right, back, left) passage bits for each facing direction
+_RELATIVE_BITS = {
+    "south": (SOUTH, WEST, NORTH, EAST),
+    "west": (WEST, NORTH, EAST, SOUTH),
+    "north": (NORTH, EAST, SOUTH, WEST),
+    "east": (EAST, SOUTH, WEST, NORTH),
+}
+
+
 class MicroMouseMaze:
     """
-    A class to represent and visualize a 2D maze for a micro mouse using a graph structure.
+    A class to represent and visualize a 2D maze for a micro mouse.
+
+    The maze is stored as one byte per cell: the low 4 bits tell which of the four passages of the
+    cell are known to be open (see `EAST`, `WEST`, `NORTH`, `SOUTH`) and the `VISITED` bit marks
+    visited cells, so a 16x16 maze takes 256 bytes and all queries are bit operations.
     
     Attributes:
     -----------
@@ -17,13 +52,13 @@ class MicroMouseMaze:
         The size of one side of the square maze (default is 16).
     total_nodes : int
         The total number of nodes in the maze, calculated as size * size.
-    maze : networkx.Graph
-        The graph representing the maze, with nodes and edges defining the structure.
-    visited_nodes : set
-        A set to track visited nodes.
+    cells : numpy.ndarray
+        One uint8 per node holding its passage bits and the visited bit.
+    frontier : Frontier
+        The reachable but unvisited nodes, from which `get_cell_to_explore` picks.
     """
 
-    def __init__(self, size=16):
+    def __init__(self, size=16, exploration_policy="latest"):
         """
         Initializes the MicroMouseMaze class.
         
@@ -31,21 +66,79 @@ class MicroMouseMaze:
         -----------
         size : int, optional
             The size of one side of the square maze (default is 16).
+        exploration_policy : str or callable, optional
+            The policy used to pick the next cell to explore, see `Frontier` (default is "latest").
         """
         self.size = size
         self.total_nodes = size * size
-        self.maze = nx.Graph()
-        self.visited_nodes = set()
+        self.cells = np.zeros(self.total_nodes, dtype=np.uint8)
+        self._listeners = []
         self._initialize_maze()
+        self.frontier = Frontier(self, exploration_policy)
 
     def _initialize_maze(self):
         """
-        Initializes the maze structure by adding nodes to the graph.
-        
-        Each node represents a cell in the maze grid, numbered from 0 to (size * size - 1).
+        Initializes the lookup tables of the maze.
+
+        `_offsets` maps a passage bit to the node number difference of the neighbour behind it and
+        `_in_bounds` holds, per node, the passage bits which do not lead out of the grid.
+        """
+        self._offsets = {EAST: -1, WEST: 1, NORTH: self.size, SOUTH: -self.size}
+
+        rows, cols = np.divmod(np.arange(self.total_nodes), self.size)
+        self._in_bounds = ((cols > 0) * EAST | (cols < self.size - 1) * WEST
+                           | (rows < self.size - 1) * NORTH
+                           | (rows > 0) * SOUTH).astype(np.uint8)
+
+    def copy(self):
+        """
+        Returns an independent copy of the maze.
+        """
+        other = MicroMouseMaze.__new__(MicroMouseMaze)
+        other.size = self.size
+        other.total_nodes = self.total_nodes
+        other.cells = self.cells.copy()
+        other._offsets = self._offsets
+        other._in_bounds = self._in_bounds
+        other._listeners = []
+        other.frontier = self.frontier.copy(other)
+        return other
+
+    def add_listener(self, callback):
+        """
+        Registers a callback called with a node whenever something new is learnt about it,
+        i.e. when it gets visited or one of its passages gets opened.
+
+        Parameters:
+        -----------
+        callback : callable
+            Function taking the node number.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, node):
+        for callback in self._listeners:
+            callback(node)
+
+    @property
+    def visited_nodes(self):
+        """
+        The set of visited nodes.
         """
-        for node in range(self.total_nodes):
-            self.maze.add_node(node)
+        return set(np.flatnonzero(self.cells & VISITED).tolist())
+
+    @property
+    def maze(self):
+        """
+        The maze as a networkx.Graph, built on demand for drawing.
+        """
+        graph = nx.Graph()
+        graph.add_nodes_from(range(self.total_nodes))
+        for bit in (WEST, NORTH):
+            nodes = np.flatnonzero(self.cells & bit)
+            graph.add_edges_from(
+                zip(nodes.tolist(), (nodes + self._offsets[bit]).tolist()))
+        return graph
 
     def visit_node(self, node):
         """
@@ -56,8 +149,9 @@ class MicroMouseMaze:
         node : int
             The node to be marked as visited.
         """
-        if 0 <= node < self.total_nodes:
-            self.visited_nodes.add(node)
+        if 0 <= node < self.total_nodes and not self.cells[node] & VISITED:
+            self.cells[node] |= VISITED
+            self._notify(node)
 
     def is_visited(self, node):
         """
@@ -73,7 +167,72 @@ class MicroMouseMaze:
         bool
             True if the node has been visited, False otherwise.
         """
-        return node in self.visited_nodes
+        return 0 <= node < self.total_nodes and bool(self.cells[node] & VISITED)
+
+    def is_open(self, node, bit):
+        """
+        Checks if the passage of a node in the direction of the given bit is known to be open.
+        """
+        return bool(self.cells[node] & bit)
+
+    def is_connected(self, node, other):
+        """
+        Checks if two nodes are neighbours with an open passage between them.
+        """
+        for bit, offset in self._offsets.items():
+            if node + offset == other:
+                return bool(self.cells[node] & bit)
+        return False
+
+    def neighbours(self, node):
+        """
+        Returns the nodes reachable from a node through one open passage.
+        """
+        passages = int(self.cells[node])
+        return [
+            node + offset for bit, offset in self._offsets.items()
+            if passages & bit
+        ]
+
+    def optimistic_neighbours(self, node):
+        """
+        Returns the neighbours of a node which are not separated from it by a known wall.
+
+        A passage is known once one of its two nodes is visited: it is then a wall unless it was
+        opened. Passages between two unvisited nodes are assumed to be open, which is how planners
+        route through the unexplored part of the maze.
+        """
+        passages = int(self.cells[node])
+        in_bounds = int(self._in_bounds[node])
+        neighbours = []
+        for bit, offset in self._offsets.items():
+            if not in_bounds & bit:
+                continue
+            neighbour = node + offset
+            if passages & bit or not (passages & VISITED
+                                      or self.cells[neighbour] & VISITED):
+                neighbours.append(neighbour)
+        return neighbours
+
+    def open_passages(self, node, bits):
+        """
+        Opens the passages of a node given as passage bits, along with the matching passages of its neighbours.
+
+        Passages leading out of the grid are ignored.
+
+        Returns:
+        --------
+        int
+            The passage bits which were not open before.
+        """
+        bits &= int(self._in_bounds[node]) & ~int(self.cells[node])
+        if bits:
+            self.cells[node] |= bits
+            for bit, offset in self._offsets.items():
+                if bits & bit:
+                    self.cells[node + offset] |= OPPOSITE[bit]
+            self._notify(node)
+        return bits
 
     def add_edges(
         self,
@@ -108,71 +267,21 @@ class MicroMouseMaze:
         """
 
         #* NOTE: north is switched with south and east is switched with west in all the comments
-        #* NOTE: north is switched with south and east is switched with west in all the comments
-        #* NOTE: north is switched with south and east is switched with west in all the comments
-        #* NOTE: north is switched with south and east is switched with west in all the comments
-        #* NOTE: north is switched with south and east is switched with west in all the comments
-        if make_visited:
-            self.visit_node(current_node)
-
         if not (0 <= current_node < self.total_nodes):
             return  # Ensure the current node is valid
 
-        # Define direction mappings based on the facing direction
-        directions = ['south', 'west', 'north', 'east']
-        facing_index = directions.index(facing_direction)
-
-        # Rotate the directions based on the facing direction
+        # Map the front, right, back and left flags to absolute passage bits
         # For example, if facing east, then "front" becomes "east", "right" becomes "south", etc.
-        rotated_directions = directions[
-            facing_index:] + directions[:facing_index]
-
-        # Now, map the front, right, left, and back to their new directions
-        # front -> first in rotated_directions, right -> second, left -> third, back -> fourth
-        front_direction = rotated_directions[0]
-        right_direction = rotated_directions[1]
-        left_direction = rotated_directions[3]
-        back_direction = rotated_directions[2]
-
-        # Calculate the row and column of the current node in the grid
-        row, col = divmod(current_node, self.size)
-
-        # Add edges based on the directional flags
-        if front and front_direction == 'south' and row > 0:  # Node above (north)
-            self.maze.add_edge(current_node, current_node - self.size)
-        elif front and front_direction == 'west' and col < self.size - 1:  # Node to the right (east)
-            self.maze.add_edge(current_node, current_node + 1)
-        elif front and front_direction == 'north' and row < self.size - 1:  # Node below (south)
-            self.maze.add_edge(current_node, current_node + self.size)
-        elif front and front_direction == 'east' and col > 0:  # Node to the left (west)
-            self.maze.add_edge(current_node, current_node - 1)
-
-        if right and right_direction == 'south' and row > 0:  # Node above (north)
-            self.maze.add_edge(current_node, current_node - self.size)
-        elif right and right_direction == 'west' and col < self.size - 1:  # Node to the right (east)
-            self.maze.add_edge(current_node, current_node + 1)
-        elif right and right_direction == 'north' and row < self.size - 1:  # Node below (south)
-            self.maze.add_edge(current_node, current_node + self.size)
-        elif right and right_direction == 'east' and col > 0:  # Node to the left (west)
-            self.maze.add_edge(current_node, current_node - 1)
-
-        if left and left_direction == 'south' and row > 0:  # Node above (north)
-            self.maze.add_edge(current_node, current_node - self.size)
-        elif left and left_direction == 'west' and col < self.size - 1:  # Node to the right (east)
-            self.maze.add_edge(current_node, current_node + 1)
-        elif left and left_direction == 'north' and row < self.size - 1:  # Node below (south)
-            self.maze.add_edge(current_node, current_node + self.size)
-        elif left and left_direction == 'east' and col > 0:  # Node to the left (west)
-            self.maze.add_edge(current_node, current_node - 1)
-
-        if back and back_direction == 'south' and row > 0:  # Node above (north)
-            self.maze.add_edge(current_node, current_node - self.size)
-        elif back and back_direction == 'west' and col < self.size - 1:  # Node to the right (east)
-            self.maze.add_edge(current_node, current_node + 1)
-        elif back and back_direction == 'north' and row < self.size - 1:  # Node below (south)
-            self.maze.add_edge(current_node, current_node + self.size)
-        elif back and back_direction == 'east' and col > 0:  # Node to the left (west)
-            self.maze.add_edge(current_node, current_node - 1)
+        front_bit, right_bit, back_bit, left_bit = _RELATIVE_BITS[
+            facing_direction]
+        # open the passages before marking the node visited, so listeners never see it walled in
+        self.open_passages(
+            current_node,
+            int((front and front_bit) | (right and right_bit)
+                | (back and back_bit) | (left and left_bit)),
+        )
+        if make_visited:
+            self.visit_node(current_node)
 
     def display_maze(self):
         """
@@ -180,23 +289,26 @@ class MicroMouseMaze:
         
         Visited nodes are colored light green, while unvisited nodes are light blue.
         """
+        graph = self.maze
+
         # Create a grid layout for the nodes
         pos = {
             node: (self.size - 1 - (node % self.size),
                    self.size - 1 - (node // self.size))
-            for node in self.maze.nodes
+            for node in graph.nodes
         }
         pos = {node: (x, self.size - 1 - y) for node, (x, y) in pos.items()}
 
         # Generate color mapping for nodes based on visitation status
+        visited_nodes = self.visited_nodes
         color_map = [
-            'lightgreen' if node in self.visited_nodes else 'lightblue'
-            for node in self.maze.nodes
+            'lightgreen' if node in visited_nodes else 'lightblue'
+            for node in graph.nodes
         ]
 
         # Display the maze using Matplotlib
         plt.figure(figsize=(16, 9))
-        nx.draw(self.maze,
+        nx.draw(graph,
                 pos,
                 with_labels=True,
                 node_color=color_map,
@@ -216,23 +328,26 @@ class MicroMouseMaze:
         format : str, optional
             The format of the saved file ('png' or 'svg', default is 'png').
         """
+        graph = self.maze
+
         # Create a grid layout for the nodes
         pos = {
             node: (self.size - 1 - (node % self.size),
                    self.size - 1 - (node // self.size))
-            for node in self.maze.nodes
+            for node in graph.nodes
         }
         pos = {node: (x, self.size - 1 - y) for node, (x, y) in pos.items()}
 
         # Generate color mapping for nodes based on visitation status
+        visited_nodes = self.visited_nodes
         color_map = [
-            'lightgreen' if node in self.visited_nodes else 'lightblue'
-            for node in self.maze.nodes
+            'lightgreen' if node in visited_nodes else 'lightblue'
+            for node in graph.nodes
         ]
 
         # Draw the maze graph
         plt.figure(figsize=(16, 9))
-        nx.draw(self.maze,
+        nx.draw(graph,
                 pos,
                 with_labels=True,
                 node_color=color_map,
@@ -248,20 +363,159 @@ class MicroMouseMaze:
         """
         Loads maze structure from a pandas DataFrame and adds edges to the maze graph.
 
+        All rows are converted to passage bits at once: each row gives the absolute bits of its
+        front/right/left flags through a lookup on its facing direction, the bits are OR-ed into the
+        cells with `np.bitwise_or.at` (so repeated cells accumulate) and mirrored into the neighbours.
+        The result is the same as calling `add_edges` on every row, and each touched node is
+        notified once at the end.
+
         Parameters:
         -----------
         df : pandas.DataFrame
             The DataFrame containing maze data with columns: ['current_cell', 'facing', 'right', 'front', 'left'].
         """
-        for _, row in df.iterrows():
-            current_cell = int(row['current_cell'])
-            self.add_edges(
-                current_node=current_cell,
-                facing_direction=row['facing'],
-                front=row['front'],
-                right=row['right'],
-                left=row['left'],
+        nodes = df['current_cell'].to_numpy(dtype=np.int64)
+        facing = pd.Index(list(_RELATIVE_BITS)).get_indexer(df['facing'])
+        if (facing < 0).any():
+            raise KeyError(
+                f"Unknown facing direction: {df['facing'][facing < 0].iloc[0]}"
             )
+        valid = (nodes >= 0) & (nodes < self.total_nodes)
+        nodes, facing = nodes[valid], facing[valid]
+
+        relative_bits = np.array(list(_RELATIVE_BITS.values()), dtype=np.uint8)
+        bits = np.zeros(len(nodes), dtype=np.uint8)
+        for column, index in (('front', 0), ('right', 1), ('left', 3)):
+            flags = df[column].to_numpy(dtype=bool)[valid]
+            bits |= relative_bits[facing, index] * flags.astype(np.uint8)
+        bits &= self._in_bounds[nodes]
+
+        before = self.cells.copy()
+        np.bitwise_or.at(self.cells, nodes, bits | VISITED)
+        for bit, offset in self._offsets.items():
+            opened = nodes[(bits & bit) != 0]
+            np.bitwise_or.at(self.cells, opened + offset, OPPOSITE[bit])
+
+        for node in np.flatnonzero(self.cells != before).tolist():
+            self._notify(node)
+
+    def to_bytes(self):
+        """
+        Returns the maze in a compact binary format: a small header followed by the cell bytes.
+
+        Returns:
+        --------
+        bytes
+            `MAZE_FORMAT_MAGIC`, the size as a little endian uint16, then one byte per node.
+        """
+        return (MAZE_FORMAT_MAGIC + struct.pack("<H", self.size) +
+                self.cells.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data, exploration_policy="latest"):
+        """
+        Creates a maze from the output of `to_bytes`.
+
+        Parameters:
+        -----------
+        data : bytes
+            The binary maze.
+        exploration_policy : str or callable, optional
+            The exploration policy of the new maze, see `Frontier`.
+
+        Returns:
+        --------
+        MicroMouseMaze
+            The loaded maze.
+        """
+        header_size = len(MAZE_FORMAT_MAGIC) + 2
+        if data[:len(MAZE_FORMAT_MAGIC)] != MAZE_FORMAT_MAGIC:
+            raise ValueError("Not a binary micro mouse maze")
+        (size, ) = struct.unpack("<H", data[len(MAZE_FORMAT_MAGIC):header_size])
+        cells = np.frombuffer(data, dtype=np.uint8, offset=header_size)
+        if len(cells) != size * size:
+            raise ValueError(
+                f"Expected {size * size} cells for a maze of size {size}, got {len(cells)}"
+            )
+        maze = cls(size=size, exploration_policy=exploration_policy)
+        maze.cells[:] = cells
+        maze.frontier.rebuild()
+        return maze
+
+    def save_binary(self, filepath):
+        """
+        Saves the maze to a file in the format of `to_bytes`.
+
+        Parameters:
+        -----------
+        filepath : str
+            The file path where the maze will be saved.
+        """
+        with open(filepath, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load_binary(cls, filepath, exploration_policy="latest"):
+        """
+        Loads a maze saved by `save_binary`.
+
+        Parameters:
+        -----------
+        filepath : str
+            The file to load.
+        exploration_policy : str or callable, optional
+            The exploration policy of the new maze, see `Frontier`.
+
+        Returns:
+        --------
+        MicroMouseMaze
+            The loaded maze.
+        """
+        with open(filepath, "rb") as file:
+            return cls.from_bytes(file.read(), exploration_policy)
+
+    def node_of_cell(self, x, y):
+        """
+        Returns the node of the (x, y) cell of a maze file or of `src.simulator.maze_walls.CellTransform`.
+
+        Cells are counted from the south west corner there, while nodes count columns from the
+        east side, see `from_walls`. Works on NumPy arrays too.
+        """
+        return self.size - 1 - x + self.size * y
+
+    @classmethod
+    def from_walls(cls, walls, exploration_policy="latest"):
+        """
+        Creates a fully explored maze from the ground truth walls of a maze file.
+
+        The maze files count cells from the south west corner while the nodes here count columns
+        from the east side, so cell (x, y) of the file is node `size - 1 - x + size * y`
+        (see `node_of_cell`).
+
+        Parameters:
+        -----------
+        walls : src.simulator.maze_walls.MazeWalls
+            The ground truth walls.
+        exploration_policy : str or callable, optional
+            The exploration policy of the new maze, see `Frontier`.
+
+        Returns:
+        --------
+        MicroMouseMaze
+            The maze with every node visited and every passage without a wall open.
+        """
+        maze = cls(size=walls.size, exploration_policy=exploration_policy)
+        x, y = np.meshgrid(np.arange(walls.size),
+                           np.arange(walls.size),
+                           indexing="ij")
+        nodes = maze.node_of_cell(x, y).ravel()
+        wall_bits = walls.cells().ravel()
+        cells = np.full(len(nodes), VISITED, dtype=np.uint8)
+        for wall_bit, bit in ((1, NORTH), (2, EAST), (4, SOUTH), (8, WEST)):
+            cells |= np.where(wall_bits & wall_bit, 0, bit).astype(np.uint8)
+        maze.cells[nodes] = cells & (maze._in_bounds[nodes] | VISITED)
+        maze.frontier.rebuild()
+        return maze
 
     def is_straight_line(self, nodes: list[int]):
         """
@@ -270,20 +524,21 @@ class MicroMouseMaze:
         if len(nodes) <= 2:
             return True
 
-        if (nodes[0] + 1 == nodes[1]) or (nodes[0] - 1 == nodes[1]):
-            diff = 1
-        else:
-            diff = 16
+        step = nodes[1] - nodes[0]
+        if abs(step) not in (1, self.size):
+            return False
 
         for i in range(2, len(nodes)):
-            if abs(nodes[i - 1] - nodes[i]) != diff:
+            if nodes[i] - nodes[i - 1] != step:
                 return False
 
         return True
 
     def get_all_lines(self, nodes: list):
         """
-        Splits the input list into sublists of continuous lines (straight paths).
+        Splits the input list into sublists of continuous lines (straight paths) in a single pass.
+
+        Consecutive lines share the node where the path turns.
 
         Parameters:
         -----------
@@ -299,22 +554,22 @@ class MicroMouseMaze:
             return [nodes]  # If less than two nodes, return as a single group
 
         lines = []
-        stack = []
-        for i in range(0, len(nodes)):
-            stack.append(nodes[i])
-            if not self.is_straight_line(stack):
-                stack.pop()
-                lines.append(stack)
-                stack = [nodes[i - 1], nodes[i]]
-            i += 1
-
-        if len(stack) >= 2:
-            lines.append(stack)
+        line = [nodes[0], nodes[1]]
+        step = nodes[1] - nodes[0]
+        for i in range(2, len(nodes)):
+            if nodes[i] - nodes[i - 1] == step:
+                line.append(nodes[i])
+            else:
+                lines.append(line)
+                line = [nodes[i - 1], nodes[i]]
+                step = nodes[i] - nodes[i - 1]
+
+        lines.append(line)
         return lines
 
     @classmethod
-    def get_direction_to_turn(cls, from_n: int, to_n: int):
-        """Returns a string("north", "east", "south", "west"), based on the direction one needs to move in to get from from_n to to_n."""
+    def get_direction_to_turn(cls, from_n: int, to_n: int, size: int = 16):
+        """Returns a string("north", "east", "south", "west"), based on the direction one needs to move in to get from from_n to to_n in a maze of the given size."""
 
         diff = from_n - to_n
 
@@ -322,13 +577,152 @@ class MicroMouseMaze:
             return "east"
         elif diff == -1:
             return "west"
-        elif diff == 16:
+        elif diff == size:
             return "south"
-        elif diff == -16:
+        elif diff == -size:
             return "north"
         else:
             return -1
 
+    @classmethod
+    def straight_travel_time(cls, number_of_cells, cell_width_hight,
+                             acceleration, max_speed):
+        """
+        Returns the time to travel a number of cells in a straight line, starting and ending at rest.
+
+        The speed follows a trapezoidal profile: constant acceleration up to `max_speed`, cruise, and
+        a symmetric deceleration; short straights never reach `max_speed`.
+        """
+        distance = number_of_cells * cell_width_hight
+        if distance >= max_speed**2 / acceleration:
+            return distance / max_speed + max_speed / acceleration
+        return 2 * math.sqrt(distance / acceleration)
+
+    def fastest_path(
+        self,
+        from_node,
+        to_node,
+        initial_facing="north",
+        cell_width_hight=35,
+        acceleration=1000,
+        max_speed=300,
+        turn_time=0.5,
+        return_time=False,
+    ):
+        """
+        Finds the path through known open passages taking the least time rather than the fewest cells.
+
+        Every straight is driven from rest to rest (see `straight_travel_time`), so long straights are
+        cheaper per cell than short ones, and every 90 degree turn costs `turn_time` (180 degrees
+        twice that). This is a Dijkstra search over (node, heading, length of the current straight).
+
+        Parameters:
+        -----------
+        from_node : int
+            The starting node.
+        to_node : int
+            The destination node.
+        initial_facing : str
+            The initial facing direction ("north", "east", "south", "west").
+        cell_width_hight : float
+            Width or height of a single cell.
+        acceleration : float
+            Acceleration and deceleration of the mouse, in cell_width_hight units per second squared.
+        max_speed : float
+            Top speed of the mouse, in cell_width_hight units per second.
+        turn_time : float
+            Seconds needed to turn in place by 90 degrees.
+        return_time : bool
+            If True, also return the travel time of the path.
+
+        Returns:
+        --------
+        list of int
+            The nodes of the path, from 'from_node' to 'to_node' included; a (path, seconds) tuple if return_time is True.
+
+        Raises:
+        -------
+        ValueError
+            If there is no known path between the nodes.
+        """
+        #* beyond this straight length every further cell is driven at top speed
+        cruise_cells = math.ceil(max_speed**2 /
+                                 (acceleration * cell_width_hight)) + 1
+        straight_times = [
+            self.straight_travel_time(n, cell_width_hight, acceleration,
+                                      max_speed)
+            for n in range(cruise_cells + 2)
+        ]
+
+        start = (from_node, DIRECTION_BITS[initial_facing], 0)
+        times = {start: 0}
+        parents = {start: None}
+        queue = [(0, start)]
+        while queue:
+            time, state = heapq.heappop(queue)
+            if time > times[state]:
+                continue
+            node, heading, straight = state
+            if node == to_node:
+                path = []
+                while state is not None:
+                    path.append(state[0])
+                    state = parents[state]
+                return (path[::-1], time) if return_time else path[::-1]
+
+            passages = int(self.cells[node])
+            for bit, offset in self._offsets.items():
+                if not passages & bit:
+                    continue
+                if bit == heading and straight:
+                    # one more cell turns a straight of `length` cells into `length + 1`
+                    length = min(straight, cruise_cells)
+                    cost = straight_times[length + 1] - straight_times[length]
+                    next_straight = min(straight + 1, cruise_cells)
+                else:
+                    turns = 0 if bit == heading else 2 if bit == OPPOSITE[
+                        heading] else 1
+                    cost = turns * turn_time + straight_times[1]
+                    next_straight = 1
+                next_state = (node + offset, bit, next_straight)
+                next_time = time + cost
+                if next_time < times.get(next_state, math.inf):
+                    times[next_state] = next_time
+                    parents[next_state] = state
+                    heapq.heappush(queue, (next_time, next_state))
+
+        raise ValueError(f"No known path from {from_node} to {to_node}")
+
+    def shortest_path(self, from_node, to_node):
+        """
+        Finds a shortest path between two nodes through known open passages with a breadth-first search.
+
+        Returns:
+        --------
+        list of int
+            The nodes of the path, from 'from_node' to 'to_node' included.
+
+        Raises:
+        -------
+        ValueError
+            If there is no known path between the nodes.
+        """
+        parents = {from_node: None}
+        queue = deque([from_node])
+        while queue:
+            node = queue.popleft()
+            if node == to_node:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parents[node]
+                return path[::-1]
+            for neighbour in self.neighbours(node):
+                if neighbour not in parents:
+                    parents[neighbour] = node
+                    queue.append(neighbour)
+        raise ValueError(f"No known path from {from_node} to {to_node}")
+
     def generate_shortest_path_commands(
         self,
         from_node,
@@ -354,14 +748,69 @@ class MicroMouseMaze:
         commands : list of str
             A list of commands to follow the shortest path.
         """
-        paths = self.get_all_lines(
-            nx.shortest_path(self.maze, source=from_node, target=to_node))
+        return self.generate_path_commands(
+            self.shortest_path(from_node, to_node),
+            initial_facing=initial_facing,
+            cell_width_hight=cell_width_hight,
+        )
+
+    def generate_fastest_path_commands(
+        self,
+        from_node,
+        to_node,
+        initial_facing="north",
+        cell_width_hight=35,
+        **travel_model,
+    ):
+        """
+        Generates movement commands to traverse the fastest path from 'from_node' to 'to_node', see `fastest_path`.
+
+        Parameters:
+        -----------
+        travel_model : dict
+            Optional acceleration, max_speed and turn_time passed to `fastest_path`.
+
+        Returns:
+        --------
+        commands : list of str
+            A list of commands to follow the fastest path.
+        """
+        return self.generate_path_commands(
+            self.fastest_path(from_node, to_node, initial_facing,
+                              cell_width_hight, **travel_model),
+            initial_facing=initial_facing,
+            cell_width_hight=cell_width_hight,
+        )
+
+    def generate_path_commands(
+        self,
+        path,
+        initial_facing="north",
+        cell_width_hight=35,
+    ):
+        """
+        Generates movement commands to traverse a given path, taking into account the initial facing direction.
+
+        Parameters:
+        -----------
+        path : list of int
+            Consecutive nodes to travel through, starting with the current node.
+        initial_facing : str
+            The initial facing direction ("north", "east", "south", "west").
+
+        Returns:
+        --------
+        commands : list of str
+            A list of commands to follow the path.
+        """
+        paths = self.get_all_lines(path)
         commands = []
         directions = {"north": 270, "east": 0, "south": 90, "west": 180}
         current_facing = initial_facing
 
         for path in paths:
-            face_to = MicroMouseMaze.get_direction_to_turn(path[0], path[1])
+            face_to = MicroMouseMaze.get_direction_to_turn(
+                path[0], path[1], self.size)
             if face_to != current_facing:
                 commands.append(["r", directions[face_to]])
                 current_facing = face_to
@@ -375,45 +824,27 @@ class MicroMouseMaze:
 
     def get_cell_to_explore(self, stack):
         """
-        Identifies the next cell to explore based on unvisited neighbors.
+        Identifies the next cell to explore among the reachable unvisited cells.
 
-        This method iterates through the stack in reverse order (excluding the last cell) to find neighbors of each cell.
-        It checks whether a path exists between the current cell and its neighbors using NetworkX and evaluates whether
-        the neighbor has already been visited. If unvisited, the neighbor is added to the list of exploration options.
+        The cells are tracked incrementally by `frontier` as the maze is discovered, so this does not
+        search the maze; the cell is picked by the exploration policy of the frontier.
 
         Parameters:
         -----------
         stack : list
-            Stack of cells representing the path explored so far.
+            Stack of cells representing the path explored so far, the last one being the current cell.
 
         Returns:
         --------
         int
-            A randomly selected neighboring cell that is unvisited and can be explored next.
-        """
-        options = []
-        for cell in stack[
-                -2::
-                -1]:  # Iterate through stack in reverse order, skipping the last element
-            # Calculate neighbors: left, right, top, bottom
-            neighbours = [
-                cell + 1, cell - 1, cell + self.size, cell - self.size
-            ]
-            for nei in neighbours:
-                try:
-                    # Check if there is a path between cell and neighbor
-                    nx.shortest_path(self.maze, source=cell, target=nei)
-                    if not self.is_visited(nei):
-                        options.append(nei)
-                except:
-                    pass
-            if len(options) != 0:
-                break
+            A reachable cell that is unvisited and can be explored next.
+        """
+        option = self.frontier.select(stack[-1] if stack else None)
 
         l.info(f"STACK: {stack}")
-        l.info(f"CELLS CAN BE EXPLORE: {options}")
+        l.info(f"CELL TO EXPLORE: {option}")
 
-        return random.choice(options)
+        return option
 
     def __distance_mouse_will_see_after_travel(self, path, cell_width_hight):
         """
@@ -437,21 +868,12 @@ class MicroMouseMaze:
         diff = path[0] - path[1]
         number_of_cell_in_front = 0
         current_cell = path[-1]
-        while True:
-            try:
-                # Check if there is a straight path to the next cell
-                path = nx.shortest_path(self.maze,
-                                        source=current_cell,
-                                        target=current_cell - diff)
-                current_cell -= diff
-                if len(path) > 2:
-                    # No straight path
-                    break
-                number_of_cell_in_front += 1
-            except:
-                # No valid path
-                break
-        return (cell_width_hight / 2) + (number_of_cell_in_front * 35)
+        # Count the cells reachable in a straight line through open passages
+        while self.is_connected(current_cell, current_cell - diff):
+            current_cell -= diff
+            number_of_cell_in_front += 1
+        return (cell_width_hight / 2) + (number_of_cell_in_front *
+                                         cell_width_hight)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,217 @@
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+OBSERVATION_POSE_SIZE = 6
+"""Leading entries of an observation: x, y, angle (radians), velocity x, velocity y, angular velocity"""
+COMMAND_SIZE = 2
+"""Entries of a command: forward acceleration, angular acceleration"""
+
+
+class Controller:
+    """
+    A class turning a robot's observation into actuator commands.
+
+    The observation is a 1-D float array holding the robot's pose (see `OBSERVATION_POSE_SIZE`)
+    followed by the data of each of its sensors, and the command is [forward acceleration, angular acceleration].
+
+    Override `compute` in child classes. A controller running in a separate process through
+    `SharedMemoryController` must be picklable and keeps its state in that process.
+    """
+
+    def compute(self, observation: np.ndarray) -> np.ndarray:
+        """
+        Override this function in child class as it is called at every frame.
+
+        Args:
+            observation (np.ndarray): The robot's pose followed by its sensor data.
+
+        Returns:
+            np.ndarray: [forward acceleration, angular acceleration].
+        """
+        return np.zeros(COMMAND_SIZE)
+
+    def step(self, observation: np.ndarray) -> np.ndarray:
+        """
+        Get the command for an observation, computing it in the calling thread.
+        """
+        return self.compute(observation)
+
+    def get_state(self):
+        """
+        Get a copy of the controller's internal state, as stored in simulator snapshots.
+
+        Override this function in child classes keeping state between frames, the base controller is stateless.
+        """
+        return None
+
+    def set_state(self, state):
+        """
+        Restore a state returned by `get_state`.
+        """
+        pass
+
+    def close(self):
+        """
+        Release the resources held by the controller.
+        """
+        pass
+
+
+class SharedMemoryController(Controller):
+    """
+    Runs a controller in a separate process so its cost does not stall the simulation loop.
+
+    The simulation and the controller process exchange data through one shared memory block holding
+    the latest observation and the latest command, each guarded by a sequence counter which is odd
+    while the data is being written. `step` publishes the observation and waits at most
+    `latency_budget` seconds for the matching command; if the controller is slower than that, the
+    last command it produced is applied and the fresh one is picked up on a later frame.
+
+    The state of the wrapped controller lives in the other process, so it is not part of simulator snapshots.
+
+    Example:
+        robot = Robot(position=[100, 100], angle=0, size=[14, 10], sensors=sensors,
+                      controller=SharedMemoryController(MyController(), observation_size=6 + len(sensors)))
+    """
+    # layout of the shared block, in float64 entries
+    _OBSERVATION_SEQUENCE = 0
+    _COMMAND_SEQUENCE = 1
+    _ANSWERED_SEQUENCE = 2
+    _STOP = 3
+    _HEADER_SIZE = 4
+
+    def __init__(
+        self,
+        controller: Controller,
+        observation_size: int,
+        latency_budget: float = 0.002,
+        poll_interval: float = 0.0001,
+    ):
+        """
+        Args:
+            controller (Controller): The controller to run in the separate process.
+            observation_size (int): Length of the observations passed to `step`.
+            latency_budget (float): Seconds `step` may wait for the command answering the current observation.
+            poll_interval (float): Seconds both sides sleep between polls of the shared block.
+        """
+        self.controller = controller
+        self.observation_size = observation_size
+        self.latency_budget = latency_budget
+        self.poll_interval = poll_interval
+
+        self._memory = shared_memory.SharedMemory(
+            create=True,
+            size=8 * (self._HEADER_SIZE + observation_size + COMMAND_SIZE),
+        )
+        self._block = np.ndarray(
+            (self._HEADER_SIZE + observation_size + COMMAND_SIZE, ),
+            dtype=np.float64,
+            buffer=self._memory.buf,
+        )
+        self._block[:] = 0
+        self._command = np.zeros(COMMAND_SIZE)
+
+        self._process = mp.Process(
+            target=_run_controller,
+            args=(self._memory.name, controller, observation_size,
+                  poll_interval),
+            daemon=True,
+        )
+        self._process.start()
+
+    def step(self, observation: np.ndarray) -> np.ndarray:
+        """
+        Publish an observation and get the newest command within the latency budget.
+
+        Args:
+            observation (np.ndarray): The robot's pose followed by its sensor data.
+
+        Returns:
+            np.ndarray: The command answering this observation, or the latest one if it did not arrive in time.
+        """
+        block = self._block
+        sequence = block[self._OBSERVATION_SEQUENCE] + 2
+        block[self._OBSERVATION_SEQUENCE] = sequence - 1
+        block[self._HEADER_SIZE:self._HEADER_SIZE +
+              self.observation_size] = observation
+        block[self._OBSERVATION_SEQUENCE] = sequence
+
+        deadline = time.perf_counter() + self.latency_budget
+        while True:
+            answered = self._read_command()
+            if answered >= sequence or time.perf_counter() >= deadline:
+                return self._command
+            time.sleep(self.poll_interval)
+
+    def _read_command(self) -> float:
+        """
+        Copy the latest consistent command into `_command` and return the observation sequence it answers.
+        """
+        block = self._block
+        start = self._HEADER_SIZE + self.observation_size
+        before = block[self._COMMAND_SEQUENCE]
+        if before % 2 == 1:
+            return -1
+        command = block[start:start + COMMAND_SIZE].copy()
+        answered = block[self._ANSWERED_SEQUENCE]
+        if block[self._COMMAND_SEQUENCE] != before:
+            return -1
+        self._command = command
+        return answered
+
+    def close(self):
+        """
+        Stop the controller process and release the shared memory block.
+        """
+        if self._process is None:
+            return
+        self._block[self._STOP] = 1
+        self._process.join(timeout=1)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+        del self._block
+        self._memory.close()
+        self._memory.unlink()
+
+
+def _run_controller(memory_name: str, controller: Controller,
+                    observation_size: int, poll_interval: float):
+    """
+    Body of the controller process: answer every new observation with a command.
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    block = np.ndarray(
+        (SharedMemoryController._HEADER_SIZE + observation_size +
+         COMMAND_SIZE, ),
+        dtype=np.float64,
+        buffer=memory.buf,
+    )
+    observation_start = SharedMemoryController._HEADER_SIZE
+    command_start = observation_start + observation_size
+    answered = 0
+
+    try:
+        while block[SharedMemoryController._STOP] == 0:
+            sequence = block[SharedMemoryController._OBSERVATION_SEQUENCE]
+            if sequence == answered or sequence % 2 == 1:
+                time.sleep(poll_interval)
+                continue
+
+            observation = block[observation_start:command_start].copy()
+            if block[SharedMemoryController._OBSERVATION_SEQUENCE] != sequence:
+                continue  # torn read, the observation was overwritten meanwhile
+
+            command = controller.compute(observation)
+
+            block[SharedMemoryController._COMMAND_SEQUENCE] += 1
+            block[command_start:command_start + COMMAND_SIZE] = command
+            block[SharedMemoryController._ANSWERED_SEQUENCE] = sequence
+            block[SharedMemoryController._COMMAND_SEQUENCE] += 1
+            answered = sequence
+    finally:
+        del block
+        memory.close()
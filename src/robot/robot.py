@@ -1,7 +1,15 @@
 import math
 
+import numpy as np
 import pygame as pg
 
+from src.robot.controller import OBSERVATION_POSE_SIZE, Controller
+from src.robot.utils.sensor_noise import SensorNoise
+from src.utils.input_snapshot import InputSnapshot
+
+STATE_SIZE = 12
+"""Length of the array returned by `Robot.get_state`"""
+
 
 class Robot:
     """
@@ -18,12 +26,18 @@ class Robot:
         angular_velocity (float): The current angular velocity of the robot, indicating how fast it is rotating.
         base_color (tuple[int, int, int]): The color of the robot's body.
         outline_color (tuple[int, int, int]): The color of the robot's outline.
+        controller (Controller): Optional controller setting the accelerations from the robot's observation at every update.
+        sensor_data (np.ndarray): The latest data of each sensor, see `read_sensors`; a view into `Simulator.sensor_data` once the robot is simulated.
+        sensor_timestamps (np.ndarray): Simulated time each value of `sensor_data` was read at, NaN before the first reading.
+        sensor_noise (SensorNoise): Applies the sensors' noise models to `sensor_data`, None if no sensor has one.
     """
     body_surface: pg.Surface = None
     sudo_surface: pg.Surface = None
     """Surface containing area including border"""
     base_colorkey: pg.Surface = (0, 0, 0)
     base_outline_colorkey: pg.Surface = (255, 255, 255)
+    input_event_types: tuple = None
+    """Event types `event_handler` is called for; None means it is called on every frame with all the input"""
 
     # todo center_of_rotation
     def __init__(
@@ -35,6 +49,8 @@ class Robot:
             sensors: list = [],
             base_color: tuple[int, int, int] = (0, 128, 255),
             outline_color: tuple[int, int, int] = (0, 0, 0),
+            controller: Controller = None,
+            noise_seed=None,
     ):
         """
         Initializes the Robot.
@@ -47,12 +63,20 @@ class Robot:
             sensors (dict): A dictionary of sensors associated with the robot.
             base_color (tuple[int, int, int]): The color of the robot's body (default: blue).
             outline_color (tuple[int, int, int]): The color of the robot's outline (default: black).
+            controller (Controller): Optional controller driving the robot, e.g. a SharedMemoryController running it in another process.
+            noise_seed: Seed of the sensor noise, see `seed_sensor_noise`.
         """
         self._size = size
         self._position = pg.Vector2(position[0], position[1])
         self._angle = angle
         self._sensors = sensors
         self._center_of_rotation = center_of_rotation
+        self._previous_position = pg.Vector2(self._position)
+        self._previous_angle = self._angle
+        self._footprint_masks: dict[int, pg.Mask] = {}
+        self._sensor_offsets: list[tuple[float, float]] = None
+        self._sensor_pose_key: tuple = None
+        self._sensor_positions: list[pg.Vector2] = []
 
         self._friction = 0.1
 
@@ -63,6 +87,12 @@ class Robot:
 
         self.base_color = base_color
         self.outline_color = outline_color
+        self.controller = controller
+
+        self.sensor_data = np.zeros(len(sensors))
+        self.sensor_timestamps = np.full(len(sensors), np.nan)
+        self.sensor_noise: SensorNoise = None
+        self.seed_sensor_noise(noise_seed)
 
     def set_position(self, position: list[float]):
         """
@@ -178,12 +208,122 @@ class Robot:
         """
         return self.angular_velocity
 
+    def bind_sensor_data(self, data: np.ndarray, timestamps: np.ndarray):
+        """
+        Keep the sensor data in the given arrays from now on, e.g. views into a buffer shared by all robots.
+
+        The current values are copied into them first.
+
+        Args:
+            data (np.ndarray): Array of one float per sensor.
+            timestamps (np.ndarray): Array of one float per sensor.
+        """
+        data[:] = self.sensor_data
+        timestamps[:] = self.sensor_timestamps
+        self.sensor_data = data
+        self.sensor_timestamps = timestamps
+
+    def seed_sensor_noise(self, seed):
+        """
+        Restart the random numbers of the sensor noise from a seed, e.g. one per robot for reproducible parallel runs.
+
+        Args:
+            seed: An int or a `np.random.SeedSequence`; None for random noise.
+        """
+        models = [sensor.noise for sensor in self._sensors]
+        self.sensor_noise = (SensorNoise(models, seed) if any(
+            model is not None for model in models) else None)
+
+    def read_sensors(self, time: float):
+        """
+        Copy the latest reading of every sensor into `sensor_data`, in place, and apply the sensor noise.
+
+        Args:
+            time (float): The simulated time of the readings, stored in `sensor_timestamps`.
+        """
+        self.sensor_data[:] = [sensor.get_data() for sensor in self._sensors]
+        if self.sensor_noise is not None:
+            self.sensor_noise.apply(self.sensor_data)
+        self.sensor_timestamps[:] = time
+
+    def get_observation(self) -> np.ndarray:
+        """
+        Get the robot's pose followed by the data of each of its sensors, as consumed by a Controller.
+
+        Returns:
+            np.ndarray: [x, y, angle (radians), velocity x, velocity y, angular velocity, *sensor data].
+        """
+        observation = np.empty(OBSERVATION_POSE_SIZE + len(self._sensors))
+        observation[:OBSERVATION_POSE_SIZE] = (
+            self._position.x,
+            self._position.y,
+            self._angle,
+            self.velocity.x,
+            self.velocity.y,
+            self.angular_velocity,
+        )
+        observation[OBSERVATION_POSE_SIZE:] = self.sensor_data
+        return observation
+
+    def get_state(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        Get the robot's dynamic state as a flat array.
+
+        Args:
+            out (np.ndarray): Optional array of length `STATE_SIZE` to write into instead of allocating one.
+
+        Returns:
+            np.ndarray: [x, y, angle, velocity x, velocity y, acceleration x, acceleration y,
+            angular velocity, angular acceleration, previous x, previous y, previous angle], angles in radians.
+        """
+        if out is None:
+            out = np.empty(STATE_SIZE)
+        out[:] = (
+            self._position.x,
+            self._position.y,
+            self._angle,
+            self.velocity.x,
+            self.velocity.y,
+            self.acceleration.x,
+            self.acceleration.y,
+            self.angular_velocity,
+            self.angular_acceleration,
+            self._previous_position.x,
+            self._previous_position.y,
+            self._previous_angle,
+        )
+        return out
+
+    def set_state(self, state: np.ndarray):
+        """
+        Restore a state returned by `get_state`.
+
+        Example:
+            state = robot.get_state()
+            robot.update(60, [])
+            robot.set_state(state)  # Back to where it was
+        """
+        (x, y, self._angle, vx, vy, ax, ay, self.angular_velocity,
+         self.angular_acceleration, px, py,
+         self._previous_angle) = state.tolist()
+        self._position = pg.Vector2(x, y)
+        self.velocity = pg.Vector2(vx, vy)
+        self.acceleration = pg.Vector2(ax, ay)
+        self._previous_position = pg.Vector2(px, py)
+
+    def close(self):
+        """
+        Release the resources held by the robot's controller, if any.
+        """
+        if self.controller is not None:
+            self.controller.close()
+
     def event_handler(self, events):
         """
         Handle user input events.
 
         Args:
-            events: The list of Pygame events to handle.
+            events (InputSnapshot): The input of the frame, filtered to `input_event_types`.
         
         This method processes key events to control the robot's movement.
         """
@@ -195,11 +335,12 @@ class Robot:
 
         Args:
             time_step (float): The time step for the update, usually based on the simulation frame rate. It is basically the FPS.
-            events: The list of Pygame events for handling user input.
+            events (InputSnapshot): The input of the frame; a plain list of Pygame events is accepted too.
         
         This method calculates the new position and angle of the robot using its acceleration and velocity.
         """
-        self.event_handler(events)
+        events = InputSnapshot.of(events)
+        events.dispatch(self)
 
         try:
             dt = 1 / time_step
@@ -207,6 +348,14 @@ class Robot:
             # The simulation is still not started as a whole
             return
 
+        if self.controller is not None:
+            command = self.controller.step(self.get_observation())
+            self.set_acceleration([command[0], 0])
+            self.set_angular_acceleration(command[1])
+
+        self._previous_position = pg.Vector2(self._position)
+        self._previous_angle = self._angle
+
         self.velocity += self.acceleration.rotate_rad(self._angle) * dt
         self.velocity *= (1 - self._friction)
 
@@ -275,13 +424,88 @@ class Robot:
             self.body_surface.get_rect(center=self.robot_rect.center).topleft,
         )
 
-        for sensor in self._sensors:
+        for sensor, sensor_position in zip(self._sensors,
+                                           self.sensor_positions()):
             sensor.draw(
                 screen,
                 self._position,
                 self._angle,
+                sensor_position,
             )  # contains a blit function
 
+    def sensor_positions(self) -> list[pg.Vector2]:
+        """
+        Get the screen position of every sensor at the robot's current pose.
+
+        The rotation of the robot is computed once for all the sensors and the result is cached
+        until the robot moves, so sensing and drawing in the same frame share it. The offsets are
+        read from the sensors' `relative_position` when first needed; call `reset_sensor_poses`
+        after changing them or the list of sensors.
+
+        Returns:
+            list[pg.Vector2]: One position per sensor, in the order of the sensors. Do not modify them.
+        """
+        key = (self._position.x, self._position.y, self._angle)
+        if key != self._sensor_pose_key:
+            if self._sensor_offsets is None:
+                self._sensor_offsets = [(sensor.relative_position.x,
+                                         sensor.relative_position.y)
+                                        for sensor in self._sensors]
+            x, y, angle = key
+            cos, sin = math.cos(angle), math.sin(angle)
+            self._sensor_positions = [
+                pg.Vector2(x + dx * cos - dy * sin, y + dx * sin + dy * cos)
+                for dx, dy in self._sensor_offsets
+            ]
+            self._sensor_pose_key = key
+        return self._sensor_positions
+
+    def reset_sensor_poses(self):
+        """
+        Forget the cached sensor offsets and positions, see `sensor_positions`.
+        """
+        self._sensor_offsets = None
+        self._sensor_pose_key = None
+
     @property
     def robot_mask(self) -> pg.Mask:
         return pg.mask.from_surface(self.body_surface)
+
+    @property
+    def bounding_radius(self) -> float:
+        """
+        Radius of the smallest circle around the robot's position that encloses its body at any angle.
+        """
+        return math.hypot(self._size[0], self._size[1]) / 2
+
+    def footprint_polygon(self) -> list[pg.Vector2]:
+        """
+        Get the corners of the robot's body at its current pose, for vector collision checks.
+        """
+        half_width, half_height = self._size[0] / 2, self._size[1] / 2
+        return [
+            self._position + pg.Vector2(x, y).rotate_rad(self._angle)
+            for x, y in ((-half_width, -half_height), (half_width, -half_height),
+                         (half_width, half_height), (-half_width, half_height))
+        ]
+
+    def footprint_mask(self, angle: float) -> pg.Mask:
+        """
+        Get the mask of the robot's body rotated by the given angle.
+
+        Masks are cached per whole degree, so repeated queries during swept collision checks are cheap.
+
+        Args:
+            angle (float): The angle of the robot in radians.
+
+        Returns:
+            pg.Mask: The mask of the rotated body, centred the same way as `body_surface`.
+        """
+        degrees = round(math.degrees(angle)) % 360
+        if degrees not in self._footprint_masks:
+            body = pg.Surface((self._size[0], self._size[1]))
+            body.fill(self.base_color)
+            body.set_colorkey(self.base_colorkey)
+            self._footprint_masks[degrees] = pg.mask.from_surface(
+                pg.transform.rotate(body, -degrees))
+        return self._footprint_masks[degrees]
@@ -2,6 +2,9 @@ import math
 
 import pygame as pg
 
+from src.robot.utils.sensor_noise import NoiseModel
+from src.utils.input_snapshot import InputSnapshot
+
 
 class Sensor:
     """
@@ -13,7 +16,12 @@ class Sensor:
         shape (str): The shape of the sensor (e.g., "circle", "rectangle").
         size (list[int, int]): The dimensions of the sensor (width, height) for rectangular shapes.
         color (tuple[int, int, int]): The color of the sensor.
+        noise (NoiseModel): How the readings are disturbed in `Robot.sensor_data`, None for exact readings.
     """
+    input_event_types: tuple = ()
+    """Event types `event_handler` is called for; set it in child classes that handle input, None means every frame"""
+    _dynamic_layer = None
+    noise: NoiseModel = None
 
     def __init__(self,
                  name: str,
@@ -27,16 +35,37 @@ class Sensor:
         self.size = size
         self.color = color
 
-    def get_data(self):
-        #todo
+    def get_data(self) -> float:
+        """
+        Get the latest reading of the sensor as a number.
+
+        Override this function in child class, the base sensor does not measure anything.
+        """
+        return 0.0
+
+    def set_data(self, value: float):
+        """
+        Overwrite the latest reading with a value previously returned by `get_data`, e.g. when restoring a snapshot.
+
+        Override this function in child class along with `get_data`.
+        """
         pass
 
+    def attach_map(self, simulator):
+        """
+        Called by the simulator before the first `calculate_sensor_data`, with itself.
+
+        Keeps the simulator's `dynamic_layer` so child classes can see other robots. Override this
+        function in child class to keep what else it needs from the simulator, e.g. `Simulator.wall_bvh`.
+        """
+        self._dynamic_layer = simulator.dynamic_layer
+
     def event_handler(self, events):
         """
         Handle user input events.
 
         Args:
-            events: The list of Pygame events to handle.
+            events (InputSnapshot): The input of the frame, filtered to `input_event_types`.
         
         This method processes key events to control the sensors's properties.
         """
@@ -48,11 +77,11 @@ class Sensor:
 
         Args:
             time_step (float): The time step for the update, usually based on the simulation frame rate. It is basically the FPS.
-            events: The list of Pygame events for handling user input.
+            events (InputSnapshot): The input of the frame; a plain list of Pygame events is accepted too.
         """
-        self.event_handler(events)
+        InputSnapshot.of(events).dispatch(self)
 
-    def draw(self, screen, robot_position, robot_angle):
+    def draw(self, screen, robot_position, robot_angle, sensor_position=None):
         """
         Draw the sensor on the screen relative to the robot's position and angle.
 
@@ -60,9 +89,11 @@ class Sensor:
             screen: The Pygame screen surface.
             robot_position: The position of the robot in the simulation.
             robot_angle: The current angle of the robot in radians.
+            sensor_position: The position of the sensor on the screen, see `Robot.sensor_positions`; computed from the robot's pose if None.
         """
-        offset = self.relative_position.rotate_rad(robot_angle)
-        sensor_position = robot_position + offset
+        if sensor_position is None:
+            sensor_position = robot_position + self.relative_position.rotate_rad(
+                robot_angle)
 
         if self.shape == "circle":
             pg.draw.circle(
@@ -82,15 +113,35 @@ class Sensor:
 
             screen.blit(rotated_surface, rotated_rect)
 
+    def world_position(self,
+                       robot_position,
+                       robot_angle,
+                       sensor_position=None) -> pg.Vector2:
+        """
+        Get the position of the sensor on the screen.
+
+        Args:
+            robot_position: The position of the robot in the simulation.
+            robot_angle: The current angle of the robot in degrees.
+            sensor_position: The already known position, e.g. from `Robot.sensor_positions`, returned as is.
+        """
+        if sensor_position is not None:
+            return sensor_position
+        return robot_position + self.relative_position.rotate(robot_angle)
+
     def calculate_sensor_data(
         self,
         robot_position,
         robot_angle,  #degrees
         map_mask: pg.Mask,
         map_position: pg.Vector2,
+        sensor_position: pg.Vector2 = None,
     ):
         """
         Override this function in child class as it is called at every frame
+
+        `sensor_position` is the position of the sensor on the screen when the caller already knows
+        it (see `Robot.sensor_positions`), otherwise get it with `world_position`.
         """
         pass
 
@@ -109,18 +160,63 @@ class LIDARSensor(Sensor):
         lidar_ray_color: tuple[int] = (0, 204, 146),
         lidar_ray_thickness: int = 3,
         lidar_max_distance: int = 150,
+        method: str = "march",
+        ray_angle_resolution: float = 0.5,
+        noise: NoiseModel = None,
     ):
+        """
+        Args:
+            name (str): The name or identifier of the sensor.
+            relative_position (list[int]): Position of the sensor relative to the robot.
+            angle (float): Direction of the ray relative to the robot, in degrees.
+            size (list[int]): The dimensions of the sensor.
+            color (tuple[int, int, int]): The color of the sensor.
+            lidar_ray_color (tuple[int, int, int]): The color of the drawn ray.
+            lidar_ray_thickness (int): The thickness of the drawn ray.
+            lidar_max_distance (int): Range of the sensor in pixels, returned when nothing is hit.
+            method (str): How the ray is cast:
+                - "march": test the map mask pixel by pixel, giving whole pixel distances.
+                - "bvh": intersect the wall segments of `Simulator.wall_bvh`, giving exact distances to the pixel edges.
+                - "mask": test precomputed ray masks against the map mask with `pg.Mask.overlap`, see `ray_mask`; same pixels as "march" with the ray start rounded to a pixel and its direction to `ray_angle_resolution`.
+                - "pyramid": skip empty blocks of `Simulator.occupancy_pyramid`, giving the exact distance to the first wall pixel like "bvh"; best for large maps.
+            ray_angle_resolution (float): Angle step in degrees of the cached ray masks of the "mask" method.
+            noise (NoiseModel): How the readings are disturbed in `Robot.sensor_data`, None for exact readings.
+        """
         super().__init__(name, relative_position, "rectangle", size, color)
         self.angle = angle
         self.lidar_ray_color = lidar_ray_color
         self.lidar_ray_thickness = lidar_ray_thickness
         self.lidar_max_distance = lidar_max_distance
+        if method not in ("march", "bvh", "mask", "pyramid"):
+            raise ValueError(f"Unknown LIDAR method: {method}")
+        self.method = method
+        self.ray_angle_resolution = ray_angle_resolution
+        self._ray_caster = None
+        self.noise = noise
+
+    def attach_map(self, simulator):
+        super().attach_map(simulator)
+        if self.method == "bvh":
+            self._ray_caster = simulator.wall_bvh
+        elif self.method == "pyramid":
+            self._ray_caster = simulator.occupancy_pyramid
+
+    def get_data(self) -> float:
+        """
+        Get the distance to the closest wall along the ray.
+        """
+        return float(self.distance)
+
+    def set_data(self, value: float):
+        self.distance = int(value) if self.method in ("march",
+                                                      "mask") else value
 
-    def draw(self, screen, robot_position, robot_angle):
-        super().draw(screen, robot_position, robot_angle)
+    def draw(self, screen, robot_position, robot_angle, sensor_position=None):
+        super().draw(screen, robot_position, robot_angle, sensor_position)
         if self.distance != None:
-            sensor_position = robot_position + self.relative_position.rotate_rad(
-                robot_angle)
+            if sensor_position is None:
+                sensor_position = robot_position + self.relative_position.rotate_rad(
+                    robot_angle)
 
             lidar_angle = math.degrees(robot_angle) + self.angle
 
@@ -144,12 +240,14 @@ class LIDARSensor(Sensor):
         robot_angle,  #degrees
         map_mask: pg.Mask,
         map_position: pg.Vector2,
+        sensor_position: pg.Vector2 = None,
     ):
         self.calculate_lidar_ray_length(
             robot_position,
             robot_angle,
             map_mask,
             map_position,
+            sensor_position,
         )
 
     def calculate_lidar_ray_length(
@@ -158,24 +256,120 @@ class LIDARSensor(Sensor):
         robot_angle,  #degrees
         map_mask: pg.Mask,
         map_position: pg.Vector2,
+        sensor_position: pg.Vector2 = None,
     ):
-        sensor_position = robot_position + self.relative_position.rotate(
-            robot_angle)
+        sensor_position = self.world_position(robot_position, robot_angle,
+                                              sensor_position)
 
         lidar_angle = math.radians(robot_angle + self.angle)
 
+        self.distance = self._cast_map_ray(sensor_position, lidar_angle,
+                                           map_mask, map_position)
+        if self._dynamic_layer is not None:
+            # robots only matter when they are closer than the walls
+            self.distance = min(
+                self.distance,
+                self._cast_ray_mask(sensor_position, lidar_angle,
+                                    self._dynamic_layer.mask,
+                                    self._dynamic_layer.offset,
+                                    math.ceil(self.distance)),
+            )
+
+    def _cast_map_ray(self, sensor_position, lidar_angle, map_mask,
+                      map_position):
+        """
+        Get the distance to the first wall of the map along the ray, with the method of the sensor.
+        """
+        if self.method == "mask":
+            return self._cast_ray_mask(sensor_position, lidar_angle, map_mask,
+                                       map_position, self.lidar_max_distance)
+
+        if self._ray_caster is not None:
+            distance = self._ray_caster.raycast(
+                sensor_position,
+                (math.cos(lidar_angle), math.sin(lidar_angle)),
+                self.lidar_max_distance,
+            )
+            return self.lidar_max_distance if distance is None else distance
+
         for distance in range(1, self.lidar_max_distance):
             x = sensor_position.x + distance * math.cos(lidar_angle)
             y = sensor_position.y + distance * math.sin(lidar_angle)
             try:
                 if map_mask.get_at((int(x - map_position.x),
                                     int(y - map_position.y))) == True:
-                    self.distance = distance
-                    return
+                    return distance
             except:
-                self.distance = self.lidar_max_distance
+                continue  # outside of the map
 
-        self.distance = self.lidar_max_distance
+        return self.lidar_max_distance
+
+    def _cast_ray_mask(self, sensor_position, lidar_angle, map_mask,
+                       map_position, max_distance: int) -> int:
+        """
+        Find the first wall pixel along the ray with `pg.Mask.overlap` on ray masks of growing length.
+
+        A single overlap test with the full ray tells if anything is in range; if so, a binary
+        search over the ray length finds the first hit, so a ray costs about log2(range) C-level
+        overlap tests instead of one Python `get_at` per pixel.
+        """
+        bucket = round(math.degrees(lidar_angle) /
+                       self.ray_angle_resolution) % round(
+                           360 / self.ray_angle_resolution)
+        origin = (int(sensor_position.x - map_position.x),
+                  int(sensor_position.y - map_position.y))
+
+        def hits(length):
+            mask, (offset_x, offset_y) = ray_mask(bucket, length,
+                                                  self.ray_angle_resolution)
+            return map_mask.overlap(
+                mask, (origin[0] + offset_x, origin[1] + offset_y)) is not None
+
+        low, high = 1, max_distance - 1
+        if high < low or not hits(high):
+            return max_distance
+        while low < high:
+            middle = (low + high) // 2
+            if hits(middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+
+_ray_masks: dict = {}
+
+
+def ray_mask(bucket: int, length: int,
+             angle_resolution: float) -> tuple[pg.Mask, tuple[int, int]]:
+    """
+    Get the mask of the pixels a LIDAR ray crosses, shared by every sensor and cached per (angle bucket, length).
+
+    The ray starts at pixel (0, 0) and covers the points at distances 1 to `length` along the angle
+    `bucket * angle_resolution` degrees, rounded down to pixels like the "march" method does.
+
+    Args:
+        bucket (int): The quantized angle of the ray.
+        length (int): The length of the ray in pixels.
+        angle_resolution (float): Degrees per angle bucket.
+
+    Returns:
+        tuple[pg.Mask, tuple[int, int]]: The mask and the position of its top left corner relative to the start of the ray.
+    """
+    key = (bucket, length, angle_resolution)
+    if key not in _ray_masks:
+        angle = math.radians(bucket * angle_resolution)
+        points = [(math.floor(distance * math.cos(angle)),
+                   math.floor(distance * math.sin(angle)))
+                  for distance in range(1, length + 1)]
+        left = min(x for x, _ in points)
+        top = min(y for _, y in points)
+        mask = pg.Mask((max(x for x, _ in points) - left + 1,
+                        max(y for _, y in points) - top + 1))
+        for x, y in points:
+            mask.set_at((x - left, y - top))
+        _ray_masks[key] = (mask, (left, top))
+    return _ray_masks[key]
 
 
 class IRSensor(Sensor):
@@ -189,14 +383,25 @@ class IRSensor(Sensor):
             size: list[int] = [4, 4],
             off_color: tuple[int] = (0, 0, 0),
             on_color: tuple[int] = (255, 255, 255),
+            noise: NoiseModel = None,
     ):
         super().__init__(name, relative_position, "circle", size, off_color)
         self.on_color = on_color
         self.off_color = off_color
+        self.noise = noise
+
+    def get_data(self) -> float:
+        """
+        Get 1.0 if the sensor is on, otherwise 0.0.
+        """
+        return float(self.is_on)
+
+    def set_data(self, value: float):
+        self.is_on = bool(value)
 
-    def draw(self, screen, robot_position, robot_angle):
+    def draw(self, screen, robot_position, robot_angle, sensor_position=None):
         self.color = self.on_color if self.is_on else self.off_color
-        super().draw(screen, robot_position, robot_angle)
+        super().draw(screen, robot_position, robot_angle, sensor_position)
 
     def calculate_sensor_data(
         self,
@@ -204,12 +409,14 @@ class IRSensor(Sensor):
         robot_angle,  #degrees
         map_mask: pg.Mask,
         map_position: pg.Vector2,
+        sensor_position: pg.Vector2 = None,
     ):
         self.calculate_ir_value(
             robot_position,
             robot_angle,
             map_mask,
             map_position,
+            sensor_position,
         )
 
     def calculate_ir_value(
@@ -218,11 +425,16 @@ class IRSensor(Sensor):
         robot_angle,  # degrees
         map_mask: pg.Mask,
         map_position: pg.Vector2,
+        sensor_position: pg.Vector2 = None,
     ):
         try:
-            self.is_on = not map_mask.get_at(
-                robot_position + self.relative_position.rotate(robot_angle) -
-                map_position)
+            position = self.world_position(robot_position, robot_angle,
+                                           sensor_position) - map_position
+            self.is_on = not map_mask.get_at(position)
+            if self.is_on and self._dynamic_layer is not None:
+                # another robot under the sensor reads like the map
+                self.is_on = not self._dynamic_layer.mask.get_at(
+                    position + map_position - self._dynamic_layer.offset)
         except IndexError:
             # If out of bounds, set the sensor as off
             self.is_on = False
@@ -0,0 +1,217 @@
+import copy
+
+import numpy as np
+
+
+class NoiseModel:
+    """
+    How the readings of one sensor are disturbed before controllers see them.
+
+    The disturbances are applied in this order: latency, gaussian noise, quantization, clipping to
+    [low, high], bit flips and dropouts. A model with the default values leaves readings untouched.
+
+    Attributes:
+        std (float): Standard deviation of the gaussian noise added to the reading, e.g. in pixels for a LIDAR.
+        quantization (float): Step the reading is rounded to, 0 for none.
+        low (float): Smallest reading after noise, None for no bound.
+        high (float): Largest reading after noise, None for no bound.
+        flip (float): Probability of inverting a 0/1 reading, e.g. for an IR sensor.
+        dropout (float): Probability of a reading being lost and replaced by `dropout_value`.
+        dropout_value (float): The value a lost reading reads as, e.g. the max distance of a LIDAR.
+        latency (int): Number of steps a reading is delayed by.
+
+    Example:
+        lidar = LIDARSensor("front", [7, 0], 0, noise=NoiseModel(std=2, quantization=1, low=0, dropout=0.01, dropout_value=150))
+    """
+
+    def __init__(self,
+                 std: float = 0.0,
+                 quantization: float = 0.0,
+                 low: float = None,
+                 high: float = None,
+                 flip: float = 0.0,
+                 dropout: float = 0.0,
+                 dropout_value: float = 0.0,
+                 latency: int = 0):
+        self.std = std
+        self.quantization = quantization
+        self.low = low
+        self.high = high
+        self.flip = flip
+        self.dropout = dropout
+        self.dropout_value = dropout_value
+        self.latency = latency
+
+
+class RandomBuffer:
+    """
+    Random numbers drawn from a seeded NumPy generator a block at a time.
+
+    Asking the generator for a few numbers per step costs far more than the numbers themselves, so
+    a large block is drawn at once and handed out in slices. With the same seed and the same calls,
+    the same numbers come out.
+
+    Example:
+        buffer = RandomBuffer(seed=3)
+        noise = buffer.normal(8)
+    """
+
+    def __init__(self, seed=None, block_size: int = 4096):
+        """
+        Args:
+            seed: Seed of the generator, an int or a `np.random.SeedSequence`; None for a random one.
+            block_size (int): Numbers drawn at once per distribution.
+        """
+        self._generator = np.random.default_rng(seed)
+        self._block_size = block_size
+        self._blocks = {}  # distribution -> [block, position]
+
+    def _take(self, distribution: str, count: int) -> np.ndarray:
+        block = self._blocks.get(distribution)
+        if block is None or block[1] + count > len(block[0]):
+            size = max(self._block_size, count)
+            rest = block[0][block[1]:] if block is not None else np.empty(0)
+            draw = getattr(self._generator, distribution)
+            block = [np.concatenate([rest, draw(size=size - len(rest))]), 0]
+            self._blocks[distribution] = block
+        values = block[0][block[1]:block[1] + count]
+        block[1] += count
+        return values
+
+    def normal(self, count: int) -> np.ndarray:
+        """
+        Get `count` standard normal numbers; the array is only valid until the next call.
+        """
+        return self._take("standard_normal", count)
+
+    def uniform(self, count: int) -> np.ndarray:
+        """
+        Get `count` numbers uniform in [0, 1); the array is only valid until the next call.
+        """
+        return self._take("random", count)
+
+    def get_state(self) -> dict:
+        return {
+            "generator": copy.deepcopy(self._generator.bit_generator.state),
+            "blocks": {
+                distribution: (block.copy(), position)
+                for distribution, (block, position) in self._blocks.items()
+            },
+        }
+
+    def set_state(self, state: dict):
+        self._generator.bit_generator.state = copy.deepcopy(
+            state["generator"])
+        self._blocks = {
+            distribution: [block.copy(), position]
+            for distribution, (block, position) in state["blocks"].items()
+        }
+
+
+class SensorNoise:
+    """
+    Applies the `NoiseModel` of every sensor of a robot to its whole sensor data array at once.
+
+    The parameters of the models are stacked into arrays, so a step costs a few NumPy operations
+    whatever the number of sensors. Sensors without a model are left untouched.
+
+    Attributes:
+        random (RandomBuffer): The source of randomness, seeded per robot so parallel runs are reproducible.
+    """
+
+    def __init__(self, models: list, seed=None):
+        """
+        Args:
+            models (list[NoiseModel]): The model of each sensor, None for exact sensors.
+            seed: Seed of the random numbers, see `RandomBuffer`.
+        """
+        models = [NoiseModel() if model is None else model for model in models]
+        self.random = RandomBuffer(seed)
+
+        def stack(name, missing=0.0):
+            return np.array([
+                missing if getattr(model, name) is None else getattr(
+                    model, name) for model in models
+            ],
+                            dtype=np.float64)
+
+        self._std = stack("std")
+        self._quantization = stack("quantization")
+        self._low = stack("low", -np.inf)
+        self._high = stack("high", np.inf)
+        self._flip = stack("flip")
+        self._dropout = stack("dropout")
+        self._dropout_value = stack("dropout_value")
+        self._latency = np.array([model.latency for model in models],
+                                 dtype=np.int64)
+
+        self._noisy = bool(self._std.any())
+        self._quantized = self._quantization > 0
+        self._quantizes = bool(self._quantized.any())
+        self._quantization_step = np.where(self._quantized, self._quantization,
+                                           1)
+        self._clipped = bool(np.isfinite(self._low).any()
+                             or np.isfinite(self._high).any())
+        self._flips = bool(self._flip.any())
+        self._drops = bool(self._dropout.any())
+        # ring buffer of the last exact readings, the delayed ones are read back from it
+        self._history = None
+        if self._latency.any():
+            self._history = np.full((self._latency.max() + 1, len(models)),
+                                    np.nan)
+            self._history_index = 0
+            self._readings = 0
+            self._columns = np.arange(len(models))
+
+    def apply(self, data: np.ndarray):
+        """
+        Disturb the exact readings of a step, in place.
+
+        Args:
+            data (np.ndarray): One reading per sensor, in the order of the models.
+        """
+        if self._history is not None:
+            self._history[self._history_index] = data
+            rows = (self._history_index - self._latency) % len(self._history)
+            delayed = self._history[rows, self._columns]
+            if self._readings < len(self._history):
+                # until enough readings were taken to delay by the full latency, the current one is used
+                np.copyto(data, delayed, where=~np.isnan(delayed))
+                self._readings += 1
+            else:
+                data[:] = delayed
+            self._history_index = (self._history_index + 1) % len(
+                self._history)
+        if self._noisy:
+            data += self._std * self.random.normal(len(data))
+        if self._quantizes:
+            np.copyto(data,
+                      np.round(data / self._quantization_step) *
+                      self._quantization_step,
+                      where=self._quantized)
+        if self._clipped:
+            np.clip(data, self._low, self._high, out=data)
+        if self._flips:
+            np.copyto(data,
+                      1 - data,
+                      where=self.random.uniform(len(data)) < self._flip)
+        if self._drops:
+            np.copyto(data,
+                      self._dropout_value,
+                      where=self.random.uniform(len(data)) < self._dropout)
+
+    def get_state(self) -> dict:
+        """
+        Get the random and latency state, to be given back to `set_state` e.g. when restoring a snapshot.
+        """
+        return {
+            "random": self.random.get_state(),
+            "history": None if self._history is None else
+            (self._history.copy(), self._history_index, self._readings),
+        }
+
+    def set_state(self, state: dict):
+        self.random.set_state(state["random"])
+        if self._history is not None:
+            history, self._history_index, self._readings = state["history"]
+            self._history[:] = history
@@ -0,0 +1,172 @@
+import numpy as np
+import pygame as pg
+
+from src.simulator.maze_walls import CellTransform, MazeWalls
+
+#* headings of a robot in cell mode; the robot angle is heading * 90 degrees (screen y points down)
+HEADING_EAST = 0
+HEADING_SOUTH = 1
+HEADING_WEST = 2
+HEADING_NORTH = 3
+
+#* actions of a robot in cell mode
+FORWARD = 0
+TURN_RIGHT = 1
+TURN_LEFT = 2
+TURN_AROUND = 3
+
+# (x, y) step of each heading, in maze cells (y grows to the north)
+_DX = np.array([1, 0, -1, 0])
+_DY = np.array([0, -1, 0, 1])
+# heading change of each action
+_TURN = np.array([0, 1, 3, 2])
+
+
+def build_sensor_table(sensors: list, transform: CellTransform,
+                       map_mask: pg.Mask,
+                       map_position: pg.Vector2) -> np.ndarray:
+    """
+    Precompute the readings of sensors for a robot centred in every cell, facing every heading.
+
+    Each reading is what `calculate_sensor_data` followed by `get_data` returns for the sensor,
+    so the table matches the continuous simulation exactly for these poses, with the walls only:
+    other robots are left out. The data the sensors held before is put back afterwards.
+
+    Args:
+        sensors (list[Sensor]): The sensors of the robot.
+        transform (CellTransform): Pixel position of the cells.
+        map_mask (pg.Mask): The wall mask of the map.
+        map_position (pg.Vector2): Position of the mask on the screen.
+
+    Returns:
+        np.ndarray: Array of shape (size, size, 4, number of sensors) indexed [x, y, heading, sensor].
+    """
+    size = transform.size
+    table = np.empty((size, size, 4, len(sensors)))
+    saved = [(sensor.get_data(), sensor._dynamic_layer) for sensor in sensors]
+    for sensor in sensors:
+        sensor._dynamic_layer = None
+    for x in range(size):
+        for y in range(size):
+            centre = transform.centre_of(x, y)
+            for heading in range(4):
+                for i, sensor in enumerate(sensors):
+                    sensor.calculate_sensor_data(centre, heading * 90,
+                                                 map_mask, map_position)
+                    table[x, y, heading, i] = sensor.get_data()
+    for sensor, (value, dynamic_layer) in zip(sensors, saved):
+        sensor.set_data(value)
+        sensor._dynamic_layer = dynamic_layer
+    return table
+
+
+class CellModeSim:
+    """
+    A discrete maze simulation where robots are always centred in a cell facing a cardinal direction.
+
+    Sensor readings come from a table precomputed per cell and heading (see `build_sensor_table`)
+    and every robot moves one cell or turns per step, so a whole batch of robots is stepped with a
+    few NumPy operations. This is meant for developing exploration algorithms, not for physics.
+
+    Attributes:
+        walls (MazeWalls): The walls of the maze.
+        sensor_table (np.ndarray): The sensor readings, indexed [x, y, heading, sensor].
+        x (np.ndarray): Cell column of each robot.
+        y (np.ndarray): Cell row of each robot.
+        heading (np.ndarray): Heading of each robot, see `HEADING_EAST` and the others.
+        bumps (np.ndarray): Number of times each robot tried to move forward into a wall.
+        steps (int): Number of steps since the last reset.
+
+    Example:
+        cells = simulator.cell_mode(num_robots=1024)
+        observation = cells.reset()
+        for _ in range(10000):
+            observation = cells.step(np.random.randint(0, 4, size=1024))
+    """
+
+    def __init__(self,
+                 walls: MazeWalls,
+                 sensor_table: np.ndarray,
+                 num_robots: int = 1,
+                 start: tuple[int, int] = (0, 0),
+                 heading: int = HEADING_NORTH):
+        """
+        Args:
+            walls (MazeWalls): The walls of the maze.
+            sensor_table (np.ndarray): The sensor readings, as returned by `build_sensor_table`.
+            num_robots (int): Number of robots stepped together.
+            start (tuple[int, int]): The (x, y) cell the robots start in.
+            heading (int): The heading the robots start with.
+        """
+        self.walls = walls
+        self.sensor_table = sensor_table
+        self.num_robots = num_robots
+        self._start = start
+        self._start_heading = heading
+
+        # open[x, y, heading] tells if the robot can move forward
+        size = walls.size
+        self._open = np.empty((size, size, 4), dtype=bool)
+        self._open[..., HEADING_EAST] = ~walls.vertical[:, 1:].T
+        self._open[..., HEADING_SOUTH] = ~walls.horizontal[:-1].T
+        self._open[..., HEADING_WEST] = ~walls.vertical[:, :-1].T
+        self._open[..., HEADING_NORTH] = ~walls.horizontal[1:].T
+        self.reset()
+
+    def reset(self, start: tuple[int, int] = None, heading: int = None):
+        """
+        Put every robot back in the start cell.
+
+        Args:
+            start (tuple[int, int]): The start cell, the one given at construction by default.
+            heading (int): The start heading, the one given at construction by default.
+
+        Returns:
+            np.ndarray: The observation, see `observe`.
+        """
+        start = self._start if start is None else start
+        heading = self._start_heading if heading is None else heading
+        self.x = np.full(self.num_robots, start[0])
+        self.y = np.full(self.num_robots, start[1])
+        self.heading = np.full(self.num_robots, heading)
+        self.bumps = np.zeros(self.num_robots, dtype=np.int64)
+        self.steps = 0
+        return self.observe()
+
+    def observe(self) -> np.ndarray:
+        """
+        Get the sensor readings of every robot.
+
+        Returns:
+            np.ndarray: Array of shape (num_robots, number of sensors).
+        """
+        return self.sensor_table[self.x, self.y, self.heading]
+
+    def can_move(self) -> np.ndarray:
+        """
+        Get, for every robot, whether there is no wall in front of it.
+        """
+        return self._open[self.x, self.y, self.heading]
+
+    def step(self, actions) -> np.ndarray:
+        """
+        Apply one action per robot.
+
+        A robot moving forward into a wall stays where it is and counts a bump.
+
+        Args:
+            actions (np.ndarray): One of `FORWARD`, `TURN_RIGHT`, `TURN_LEFT` or `TURN_AROUND` per robot.
+
+        Returns:
+            np.ndarray: The observation after the step, see `observe`.
+        """
+        actions = np.asarray(actions)
+        forward = actions == FORWARD
+        blocked = forward & ~self.can_move()
+        moving = forward & ~blocked
+        self.x += _DX[self.heading] * moving
+        self.y += _DY[self.heading] * moving
+        self.heading = (self.heading + _TURN[actions]) % 4
+        self.bumps += blocked
+        self.steps += 1
+        return self.observe()
@@ -0,0 +1,244 @@
+import math
+from collections import deque
+
+import numpy as np
+import pygame as pg
+
+
+def mask_to_array(mask: pg.Mask) -> np.ndarray:
+    """
+    Convert a pygame mask into a boolean NumPy array.
+
+    Args:
+        mask (pg.Mask): The mask to convert.
+
+    Returns:
+        np.ndarray: Boolean array of shape (width, height), indexed as [x, y].
+    """
+    return pg.surfarray.array_red(mask.to_surface()) > 0
+
+
+def build_distance_field(mask: pg.Mask, max_distance: int = 64) -> np.ndarray:
+    """
+    Build a distance field holding, for every pixel, the distance to the nearest set pixel of the mask.
+
+    The distance is measured with the chessboard metric, which never exceeds the euclidean
+    distance, so stepping by a value read from the field can never jump over a wall.
+
+    Args:
+        mask (pg.Mask): The wall mask.
+        max_distance (int): Distances are clamped to this value, which bounds the build time.
+
+    Returns:
+        np.ndarray: Array of shape (width, height) with dtype uint16, indexed as [x, y].
+
+    Example:
+        field = build_distance_field(sim._map_mask)
+        field[10, 20]  # Pixels between (10, 20) and the closest wall
+    """
+    reached = mask_to_array(mask)
+    field = np.full(reached.shape, max_distance, dtype=np.uint16)
+    field[reached] = 0
+
+    for distance in range(1, max_distance):
+        grown = reached.copy()
+        grown[1:, :] |= reached[:-1, :]
+        grown[:-1, :] |= reached[1:, :]
+        grown[:, 1:] |= grown[:, :-1].copy()
+        grown[:, :-1] |= grown[:, 1:].copy()
+        front = grown & ~reached
+        if not front.any():
+            break
+        field[front] = distance
+        reached = grown
+
+    return field
+
+
+def _shortest_angle(from_angle: float, to_angle: float) -> float:
+    """Signed smallest rotation (radians) taking from_angle to to_angle."""
+    return (to_angle - from_angle + math.pi) % (2 * math.pi) - math.pi
+
+
+def sweep_footprint(
+    distance_field: np.ndarray,
+    map_mask: pg.Mask,
+    map_position: pg.Vector2,
+    footprint,
+    radius: float,
+    start_position: pg.Vector2,
+    start_angle: float,
+    end_position: pg.Vector2,
+    end_angle: float,
+):
+    """
+    Find the first moment a footprint moving between two poses touches the map.
+
+    The footprint is advanced conservatively: at each sample the distance field tells how far the
+    centre is from the nearest wall, and the footprint can travel that distance minus its bounding
+    radius without touching anything. Only when the clearance drops to about a pixel is the exact
+    mask overlap test performed, one pixel of travel at a time.
+
+    Args:
+        distance_field (np.ndarray): Field built by `build_distance_field` for map_mask.
+        map_mask (pg.Mask): The wall mask.
+        map_position (pg.Vector2): The position of the map on the screen.
+        footprint: Callable returning the footprint pg.Mask for an angle in radians.
+        radius (float): Radius of a circle around the centre enclosing the footprint.
+        start_position (pg.Vector2): Centre of the footprint at the start of the step.
+        start_angle (float): Angle (radians) at the start of the step.
+        end_position (pg.Vector2): Centre of the footprint at the end of the step.
+        end_angle (float): Angle (radians) at the end of the step.
+
+    Returns:
+        tuple[float, pg.Vector2] or None: (time of impact as a fraction of the step in [0, 1],
+        contact point on the screen) if the footprint touches a wall, otherwise None.
+    """
+    delta = end_position - start_position
+    turn = _shortest_angle(start_angle, end_angle)
+    #* upper bound on how far any point of the footprint travels during the whole step
+    travel = delta.length() + radius * abs(turn)
+    width, height = distance_field.shape
+
+    t = 0.0
+    while True:
+        position = start_position + delta * t
+        x = position.x - map_position.x
+        y = position.y - map_position.y
+        ix = min(max(int(x), 0), width - 1)
+        iy = min(max(int(y), 0), height - 1)
+        #* clipping moves the sample, the moved amount is subtracted to stay conservative
+        clearance = (int(distance_field[ix, iy]) - math.hypot(x - ix, y - iy) -
+                     radius)
+
+        if clearance <= 1:
+            mask = footprint(start_angle + turn * t)
+            offset = (int(x - mask.get_size()[0] / 2),
+                      int(y - mask.get_size()[1] / 2))
+            contact = map_mask.overlap(mask, offset)
+            if contact is not None:
+                return t, pg.Vector2(contact) + map_position
+            clearance = 1
+
+        if t >= 1 or travel == 0:
+            return None
+        t = min(1.0, t + clearance / travel)
+
+
+class CollisionEvent:
+    """
+    A single collision between a robot and the map.
+
+    Attributes:
+        robot: The robot that collided.
+        time (float): Simulated time (seconds) of the impact.
+        contact_point (pg.Vector2): The point of contact on the screen.
+    """
+    __slots__ = ("robot", "time", "contact_point")
+
+    def __init__(self, robot, time: float, contact_point: pg.Vector2):
+        self.robot = robot
+        self.time = time
+        self.contact_point = contact_point
+
+    def __repr__(self):
+        return f"CollisionEvent(time={self.time:.3f}, contact_point={self.contact_point})"
+
+
+class CollisionEventStream:
+    """
+    A buffered stream of collision events with per-robot counters.
+
+    A robot scraping along a wall touches it on every frame; contacts of the same robot closer
+    together than `debounce_time` are treated as one collision, so only the first contact of
+    such a run produces an event and increments the counter.
+
+    Attributes:
+        debounce_time (float): Seconds without contact after which a new contact counts as a new collision.
+        events (collections.deque): Events not yet consumed by `drain`, oldest first.
+    """
+
+    def __init__(self, debounce_time: float = 0.25, buffer_size: int = 1024):
+        """
+        Args:
+            debounce_time (float): Seconds without contact after which a new contact counts as a new collision.
+            buffer_size (int): Maximum number of buffered events, the oldest ones are dropped first.
+        """
+        self.debounce_time = debounce_time
+        self.events: deque[CollisionEvent] = deque(maxlen=buffer_size)
+        self._counters: dict[int, int] = {}
+        self._last_contact: dict[int, float] = {}
+
+    def record(self, robot, time: float, contact_point: pg.Vector2):
+        """
+        Record a contact of a robot with the map.
+
+        Args:
+            robot: The robot that is in contact.
+            time (float): Simulated time (seconds) of the contact.
+            contact_point (pg.Vector2): The point of contact on the screen.
+
+        Returns:
+            CollisionEvent or None: The new event, or None if the contact was debounced.
+        """
+        key = id(robot)
+        last_contact = self._last_contact.get(key)
+        self._last_contact[key] = time
+        if last_contact is not None and time - last_contact < self.debounce_time:
+            return None
+
+        self._counters[key] = self._counters.get(key, 0) + 1
+        event = CollisionEvent(robot, time, contact_point)
+        self.events.append(event)
+        return event
+
+    def count(self, robot=None) -> int:
+        """
+        Get the number of collisions of a robot, or of all robots if robot is None.
+        """
+        if robot is None:
+            return sum(self._counters.values())
+        return self._counters.get(id(robot), 0)
+
+    def drain(self) -> list[CollisionEvent]:
+        """
+        Remove and return all buffered events.
+
+        Example:
+            for event in simulator.collisions.drain():
+                log.info(event)
+        """
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+    def get_state(self, robots: list) -> np.ndarray:
+        """
+        Get the counters and last contact times of the given robots as an array of shape (len(robots), 2).
+
+        Robots without any contact so far have NaN as their last contact time.
+        """
+        state = np.empty((len(robots), 2))
+        for row, robot in zip(state, robots):
+            row[0] = self._counters.get(id(robot), 0)
+            row[1] = self._last_contact.get(id(robot), math.nan)
+        return state
+
+    def set_state(self, robots: list, state: np.ndarray):
+        """
+        Restore counters and last contact times returned by `get_state`; buffered events are dropped.
+        """
+        self.reset()
+        for (count, last_contact), robot in zip(state.tolist(), robots):
+            if count:
+                self._counters[id(robot)] = int(count)
+            if not math.isnan(last_contact):
+                self._last_contact[id(robot)] = last_contact
+
+    def reset(self):
+        """
+        Clear all buffered events and counters.
+        """
+        self.events.clear()
+        self._counters.clear()
+        self._last_contact.clear()
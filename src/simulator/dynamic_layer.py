@@ -0,0 +1,88 @@
+import pygame as pg
+
+
+class DynamicOccupancy:
+    """
+    A mask of the pixels covered by robots, kept up to date incrementally so sensors can see other robots.
+
+    Each robot's footprint is stamped into `mask` at its pose; when a robot moves, only its old
+    footprint is erased (re-stamping the robots it overlapped) and the new one drawn, so a step
+    costs a few small mask operations per robot instead of rebuilding a map-sized mask. The
+    overlapping robots are found through a spatial hash of the footprint rectangles, so an erase
+    only looks at the robots nearby. Sensors combine this mask with the static map mask at query
+    time.
+
+    Attributes:
+        mask (pg.Mask): The robot pixels, aligned with the map mask.
+        offset (pg.Vector2): Position of the mask on the screen.
+
+    Example:
+        layer = DynamicOccupancy(simulator._map_mask.get_size(), simulator._map_position)
+        layer.erase(robot)  # the robot does not see itself
+        ...  # sense
+        layer.stamp(robot)
+    """
+    grid_size: int = 32
+    """Side in pixels of the cells of the spatial hash, about the size of a robot"""
+
+    def __init__(self, size: tuple[int, int], offset: pg.Vector2 = (0, 0)):
+        """
+        Args:
+            size (tuple[int, int]): Size of the mask, the size of the map mask.
+            offset (pg.Vector2): Position of the mask on the screen.
+        """
+        self.mask = pg.Mask(size)
+        self.offset = pg.Vector2(offset)
+        self._stamps = {}  # robot -> (footprint mask, rect in mask coordinates)
+        self._grid = {}  # (column, row) -> robots whose rect touches the cell
+
+    def _grid_cells(self, rect: pg.Rect) -> list[tuple[int, int]]:
+        size = self.grid_size
+        columns = range(rect.left // size, (rect.right - 1) // size + 1)
+        rows = range(rect.top // size, (rect.bottom - 1) // size + 1)
+        return [(column, row) for column in columns for row in rows]
+
+    def __contains__(self, robot) -> bool:
+        return robot in self._stamps
+
+    def stamp(self, robot):
+        """
+        Draw the footprint of a robot at its current pose, replacing the previous one.
+        """
+        self.erase(robot)
+        footprint = robot.footprint_mask(robot._angle)
+        rect = footprint.get_rect(center=robot._position - self.offset)
+        self.mask.draw(footprint, rect.topleft)
+        self._stamps[robot] = (footprint, rect)
+        for cell in self._grid_cells(rect):
+            self._grid.setdefault(cell, set()).add(robot)
+
+    def erase(self, robot):
+        """
+        Remove the footprint of a robot, keeping the pixels of the other robots it overlapped.
+        """
+        stamp = self._stamps.pop(robot, None)
+        if stamp is None:
+            return
+        footprint, rect = stamp
+        self.mask.erase(footprint, rect.topleft)
+        nearby = set()
+        for cell in self._grid_cells(rect):
+            robots = self._grid[cell]
+            robots.discard(robot)
+            if robots:
+                nearby.update(robots)
+            else:
+                del self._grid[cell]
+        for other in nearby:
+            other_footprint, other_rect = self._stamps[other]
+            if rect.colliderect(other_rect):
+                self.mask.draw(other_footprint, other_rect.topleft)
+
+    def clear(self):
+        """
+        Remove every robot.
+        """
+        self.mask.clear()
+        self._stamps.clear()
+        self._grid.clear()
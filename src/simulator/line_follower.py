@@ -14,6 +14,8 @@ class LineSim(Simulator):
         overlay_fps=True,
         overlay_font_size=15,
         overlays=[],
+        headless=False,
+        noise_seed: int = None,
     ):
         """
         Initialize the LineSim with map loading.
@@ -26,9 +28,12 @@ class LineSim(Simulator):
             overlay_fps (bool): Display FPS overlay.
             overlay_font_size (int): Font size for overlays.
             overlays (list): Additional overlays.
+            headless (bool): Draw off-screen instead of opening a window.
+            noise_seed (int): Seed of the sensor noise of all robots, see `Simulator`.
         """
         super().__init__(robots, scaling_factor, tick, overlay_fps,
-                         overlay_font_size, overlays)
+                         overlay_font_size, overlays, headless,
+                         noise_seed=noise_seed)
 
         try:
             self._map_image = pg.image.load(map_file)
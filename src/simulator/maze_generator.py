@@ -0,0 +1,164 @@
+import os
+
+import numpy as np
+
+from src.simulator.maze_walls import MazeWalls
+
+CLASSIC_SIZE = 16
+"""Cells along one side of a classic micromouse maze"""
+HALF_SIZE = 32
+"""Cells along one side of a half-size micromouse maze"""
+
+
+def _goal_cells(size: int, goal_size: int) -> set:
+    low = (size - goal_size) // 2
+    return {(x, y)
+            for x in range(low, low + goal_size)
+            for y in range(low, low + goal_size)}
+
+
+def _open(walls: MazeWalls, cell, other):
+    (x, y), (other_x, other_y) = cell, other
+    if x == other_x:
+        walls.horizontal[max(y, other_y), x] = False
+    else:
+        walls.vertical[y, max(x, other_x)] = False
+
+
+def _post_has_other_wall(walls: MazeWalls, post_x: int, post_y: int,
+                         wall) -> bool:
+    """Check if a post keeps a wall besides the given one, so removing that wall leaves no lonely post."""
+    touching = []
+    if post_x > 0:
+        touching.append(("h", post_y, post_x - 1))
+    if post_x < walls.size:
+        touching.append(("h", post_y, post_x))
+    if post_y > 0:
+        touching.append(("v", post_y - 1, post_x))
+    if post_y < walls.size:
+        touching.append(("v", post_y, post_x))
+    return any((walls.horizontal if kind == "h" else walls.vertical)[row, col]
+               for kind, row, col in touching if (kind, row, col) != wall)
+
+
+def generate_maze(size: int = CLASSIC_SIZE,
+                  seed: int = None,
+                  loops: float = 0.0,
+                  goal_size: int = 2) -> MazeWalls:
+    """
+    Generate a random micromouse maze following the usual contest layout.
+
+    A randomized depth first search carves a perfect maze from the start cell (0, 0), which keeps a
+    wall to the east so the mouse can only leave it to the north. The goal, a square of cells in the
+    centre, is carved as one open room with a single entrance. Afterwards a fraction of the
+    remaining inner walls is knocked down to add loops, sparing the start cell, the goal walls and
+    any wall whose removal would leave a post without walls.
+
+    Args:
+        size (int): Cells along one side, e.g. `CLASSIC_SIZE` or `HALF_SIZE`.
+        seed (int): Seed of the random generator; the same seed always gives the same maze.
+        loops (float): Fraction (0 to 1) of the removable inner walls knocked down after carving.
+        goal_size (int): Cells along one side of the centre goal, 0 for no goal room.
+
+    Returns:
+        MazeWalls: The walls of the maze.
+
+    Example:
+        walls = generate_maze(16, seed=3, loops=0.1)
+        simulator = MazeSim(robots, walls, scaling_factor=0.7)
+    """
+    rng = np.random.default_rng(seed)
+    walls = MazeWalls(np.ones((size + 1, size), dtype=bool),
+                      np.ones((size, size + 1), dtype=bool))
+    goal = _goal_cells(size, goal_size) if goal_size else set()
+    for cell in goal:
+        for other in ((cell[0] + 1, cell[1]), (cell[0], cell[1] + 1)):
+            if other in goal:
+                _open(walls, cell, other)
+
+    visited = np.zeros((size, size), dtype=bool)
+    visited[0, 0] = True
+    _open(walls, (0, 0), (0, 1))
+    visited[0, 1] = True
+    stack = [(0, 1)]
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy)
+                   for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if 0 <= x + dx < size and 0 <= y + dy < size
+                   and not visited[x + dx, y + dy]]
+        if not options:
+            stack.pop()
+            continue
+        other = options[rng.integers(len(options))]
+        _open(walls, (x, y), other)
+        if other in goal:
+            # the goal room is entered once and is a dead end of the tree
+            for cell in goal:
+                visited[cell] = True
+            continue
+        visited[other] = True
+        stack.append(other)
+
+    if loops > 0:
+        goal_walls = set()
+        for x, y in goal:
+            goal_walls.update({("h", y, x), ("h", y + 1, x), ("v", y, x),
+                               ("v", y, x + 1)})
+        candidates = [("h", y, x) for y in range(1, size)
+                      for x in range(size) if walls.horizontal[y, x]]
+        candidates += [("v", y, x) for y in range(size)
+                       for x in range(1, size) if walls.vertical[y, x]]
+        candidates = [
+            wall for wall in candidates
+            if wall not in goal_walls and wall != ("v", 0, 1)
+        ]
+        for index in rng.permutation(len(candidates))[:round(
+                loops * len(candidates))]:
+            kind, row, col = candidates[index]
+            posts = (((col, row), (col + 1, row)) if kind == "h" else
+                     ((col, row), (col, row + 1)))
+            wall = (kind, row, col)
+            if all(
+                    _post_has_other_wall(walls, post_x, post_y, wall)
+                    for post_x, post_y in posts):
+                (walls.horizontal if kind == "h" else walls.vertical)[row,
+                                                                      col] = False
+    return walls
+
+
+def generate_corpus(directory: str,
+                    count: int,
+                    size: int = CLASSIC_SIZE,
+                    loops: float = 0.0,
+                    goal_size: int = 2,
+                    first_seed: int = 0) -> list[str]:
+    """
+    Get a corpus of generated mazes saved as .maz files, generating only those not cached on disk yet.
+
+    The file name holds every generation parameter, so the same call always returns the same mazes
+    and a corpus can be grown by asking for a larger count. The files can be given straight to
+    `MazeSim`, which also gets the ground truth walls from them.
+
+    Args:
+        directory (str): Where the .maz files are kept; it is created if needed.
+        count (int): Number of mazes, generated with the seeds first_seed to first_seed + count - 1.
+        size (int): Cells along one side.
+        loops (float): Fraction of the removable inner walls knocked down, see `generate_maze`.
+        goal_size (int): Cells along one side of the centre goal.
+        first_seed (int): Seed of the first maze.
+
+    Returns:
+        list[str]: The paths of the .maz files, in seed order.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for seed in range(first_seed, first_seed + count):
+        path = os.path.join(
+            directory,
+            f"maze_{size}x{size}_loops{loops:g}_goal{goal_size}_seed{seed}.maz"
+        )
+        if not os.path.exists(path):
+            generate_maze(size, seed, loops, goal_size).save(path)
+        paths.append(path)
+    return paths
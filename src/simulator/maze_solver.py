@@ -1,55 +1,117 @@
 import math
+import os
 
 import pygame as pg
 
+from src.simulator.cell_mode import HEADING_NORTH, CellModeSim, build_sensor_table
+from src.simulator.collision import CollisionEventStream, build_distance_field, sweep_footprint
+from src.simulator.maze_walls import MAZE_FILE_EXTENSIONS, CellTransform, MazeWalls
 from src.simulator.simulator import Simulator
 from src.utils import helper_functions as hf
 
 
 class MazeSim(Simulator):
-    number_of_collisions_occurred: int = 0
 
     def __init__(
         self,
         robots,
-        map_file: str,
+        map_file: str | MazeWalls,
         scaling_factor=1,
         tick=60,
         overlay_fps=True,
         overlay_font_size=15,
         overlays=[],
+        collision_debounce_time: float = 0.25,
+        headless=False,
+        maze_size: int = None,
+        sensors_see_robots: bool = False,
+        noise_seed: int = None,
     ):
         """
         Initialize the MazeSim with map loading and collision detection.
         
         Args:
             robots (list): List of Robot instances.
-            map_file (str): The path to the maze map image file (PNG or SVG).
+            map_file (str | MazeWalls): The path to the maze map, either an image file (PNG or SVG) or a maze file (.maz, .num or .txt, see `MazeWalls.load`), or the walls themselves.
             scaling_factor (float): Scaling factor for display.
             tick (int): Frames per second.
             overlay_fps (bool): Display FPS overlay.
             overlay_font_size (int): Font size for overlays.
             overlays (list): Additional overlays.
+            collision_debounce_time (float): Contacts of a robot closer together than this (seconds) count as one collision.
+            headless (bool): Draw off-screen instead of opening a window.
+            maze_size (int): Number of cells along one side of an image map; when given, the walls are extracted from the image (and cached next to it as a .maz file).
+            sensors_see_robots (bool): Let sensors see the other robots, see `Simulator`.
+            noise_seed (int): Seed of the sensor noise of all robots, see `Simulator`.
         """
         super().__init__(robots, scaling_factor, tick, overlay_fps,
-                         overlay_font_size, overlays)
+                         overlay_font_size, overlays, headless,
+                         sensors_see_robots, noise_seed)
+        self.collisions = CollisionEventStream(collision_debounce_time)
 
-        try:
-            self._map_image = pg.image.load(map_file)
-        except Exception as e:
-            raise RuntimeError("Unable to load the map\n", e)
-
-        self._map_image.set_colorkey((0, 0, 0))
         self._map_size: list[int] = [min(self.screen.get_size())] * 2
         self._map_position = pg.Vector2(
             self.screen.get_size()[0] - self._map_size[0],
             self.screen.get_size()[1] - self._map_size[1])
-        self._map_image = pg.transform.scale(
-            self._map_image,
-            self._map_size,
+
+        self.maze_walls: MazeWalls = None
+        """The ground truth walls, when the map was given as a maze file"""
+        if isinstance(map_file, MazeWalls):
+            self.maze_walls = map_file
+        elif os.path.splitext(map_file)[1].lower() in MAZE_FILE_EXTENSIONS:
+            self.maze_walls = MazeWalls.load(map_file)
+
+        if self.maze_walls is not None:
+            self._map_image, self._map_mask = self.maze_walls.rasterize(
+                self._map_size[0])
+        else:
+            try:
+                self._map_image = pg.image.load(map_file)
+            except Exception as e:
+                raise RuntimeError("Unable to load the map\n", e)
+
+            self._map_image.set_colorkey((0, 0, 0))
+            self._map_image = pg.transform.scale(
+                self._map_image,
+                self._map_size,
+            )
+            self._map_mask = pg.mask.from_surface(self._map_image)
+            self._map_mask.invert()
+
+        self.cell_transform: CellTransform = None
+        """Pixel position of the maze cells, when the size of the maze is known"""
+        if self.maze_walls is not None or maze_size is not None:
+            self.cell_transform = CellTransform.from_mask(
+                self._map_mask,
+                maze_size or self.maze_walls.size,
+                self._map_position,
+            )
+        if self.maze_walls is None and maze_size is not None:
+            self.maze_walls = self._extract_maze_walls(map_file)
+        self._map_distance_field = build_distance_field(self._map_mask)
+
+    def _extract_maze_walls(self, map_file: str) -> MazeWalls:
+        """
+        Get the walls of an image map, reading them from the cache next to the image when it is up to date.
+        """
+        cache_file = os.path.splitext(map_file)[0] + ".walls.maz"
+        if (os.path.exists(cache_file) and
+                os.path.getmtime(cache_file) >= os.path.getmtime(map_file)):
+            maze_walls = MazeWalls.load(cache_file)
+            if maze_walls.size == self.cell_transform.size:
+                return maze_walls
+
+        transform = CellTransform(
+            self.cell_transform.origin - self._map_position,
+            self.cell_transform.cell_size,
+            self.cell_transform.size,
         )
-        self._map_mask = pg.mask.from_surface(self._map_image)
-        self._map_mask.invert()
+        maze_walls = MazeWalls.from_mask(self._map_mask, transform)
+        try:
+            maze_walls.save(cache_file)
+        except OSError:
+            pass  # a read-only map directory only costs the extraction next time
+        return maze_walls
 
     def draw(self):
         """
@@ -65,13 +127,77 @@ class MazeSim(Simulator):
 
         for robot in self._robots:
             robot.draw(self.screen)
-            if self.detect_collision(robot):
-                self.number_of_collisions_occurred += 1
-                print(
-                    f"Oops you collided! Total number of collisions occurred = {self.number_of_collisions_occurred}"
-                )
         self.draw_overlay()
 
+    def step(self, time_step: float, events):
+        """
+        Advance the simulation by one frame and record collisions into `collisions`.
+
+        Args:
+            time_step (float): The time step for the update, usually based on the simulation frame rate. It is basically the FPS.
+            events (InputSnapshot): The input of the frame, shared by all robots and sensors.
+        """
+        super().step(time_step, events)
+        if not time_step:
+            return
+
+        for robot in self._robots:
+            collision = self.detect_swept_collision(robot)
+            if collision is not None:
+                time_of_impact, contact_point = collision
+                self.collisions.record(
+                    robot,
+                    self.time - (1 - time_of_impact) / time_step,
+                    contact_point,
+                )
+
+    def cell_mode(self,
+                  robot_index: int = 0,
+                  num_robots: int = 1,
+                  start: tuple[int, int] = (0, 0),
+                  heading: int = HEADING_NORTH) -> CellModeSim:
+        """
+        Build a discrete version of this maze for the sensors of one robot, see `CellModeSim`.
+
+        The sensor readings of every cell and heading are computed once here, with the same sensor
+        code as the continuous simulation.
+
+        Args:
+            robot_index (int): The robot whose sensors are tabulated.
+            num_robots (int): Number of robots stepped together in cell mode.
+            start (tuple[int, int]): The (x, y) cell the robots start in, (0, 0) being the south west corner.
+            heading (int): The heading the robots start with.
+
+        Returns:
+            CellModeSim: The discrete simulation.
+        """
+        if self.maze_walls is None:
+            raise RuntimeError(
+                "Cell mode needs the maze walls, load a maze file or give maze_size"
+            )
+        if not self._sensors_attached:
+            self.attach_sensors()
+        table = build_sensor_table(
+            self._robots[robot_index]._sensors,
+            self.cell_transform,
+            self._map_mask,
+            self._map_position,
+        )
+        return CellModeSim(self.maze_walls, table, num_robots, start, heading)
+
+    def _snapshot_extra(self) -> dict:
+        return {"collisions": self.collisions.get_state(self._robots)}
+
+    def _restore_extra(self, extra: dict):
+        self.collisions.set_state(self._robots, extra["collisions"])
+
+    @property
+    def number_of_collisions_occurred(self) -> int:
+        """
+        Total number of collisions of all robots since the start of the simulation.
+        """
+        return self.collisions.count()
+
     def detect_collision(self, robot) -> bool:
         """
         Detect collision for a robot with the maze walls.
@@ -82,6 +208,10 @@ class MazeSim(Simulator):
         Returns:
             bool: True if a collision is detected, False otherwise.
         """
+        rect = robot.body_surface.get_rect(center=robot.robot_rect.center)
+        if self.occupancy_pyramid.box_is_empty(rect.left, rect.top,
+                                               rect.right, rect.bottom):
+            return False
         if self._map_mask.overlap(
                 robot.robot_mask,
                 robot.body_surface.get_rect(
@@ -90,3 +220,56 @@ class MazeSim(Simulator):
         ) != None:
             return True
         return False
+
+    def detect_vector_collision(self, robot) -> bool:
+        """
+        Detect collision for a robot with the maze walls using the wall segments of `wall_bvh`.
+
+        The body is tested as an exact rotated rectangle instead of a rasterized mask.
+
+        Args:
+            robot: The robot instance for which to check collision.
+
+        Returns:
+            bool: True if a collision is detected, False otherwise.
+        """
+        return self.wall_bvh.intersects_polygon(robot.footprint_polygon())
+
+    def detect_swept_collision(self, robot):
+        """
+        Detect collision for a robot along the whole path it travelled during the last step.
+
+        Unlike `detect_collision`, which only tests the final pose, this also catches a fast robot
+        passing through a thin wall between two frames, which matters for large time steps.
+
+        Args:
+            robot: The robot instance for which to check collision.
+
+        Returns:
+            tuple[float, pg.Vector2] or None: (time of impact as a fraction of the last step, contact point) if a collision is detected, None otherwise.
+
+        Example:
+            collision = simulator.detect_swept_collision(robot)
+            if collision is not None:
+                time_of_impact, contact_point = collision
+        """
+        radius = robot.bounding_radius + 1
+        start, end = robot._previous_position, robot._position
+        if self.occupancy_pyramid.box_is_empty(
+                min(start.x, end.x) - radius,
+                min(start.y, end.y) - radius,
+                max(start.x, end.x) + radius,
+                max(start.y, end.y) + radius,
+        ):
+            return None
+        return sweep_footprint(
+            self._map_distance_field,
+            self._map_mask,
+            self._map_position,
+            robot.footprint_mask,
+            robot.bounding_radius,
+            robot._previous_position,
+            robot._previous_angle,
+            robot._position,
+            robot._angle,
+        )
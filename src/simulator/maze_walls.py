@@ -0,0 +1,374 @@
+import math
+import os
+
+import numpy as np
+import pygame as pg
+
+from src.simulator.collision import mask_to_array
+
+#* wall bits of a cell, as used by the .maz format
+NORTH = 1
+EAST = 2
+SOUTH = 4
+WEST = 8
+
+MAZE_FILE_EXTENSIONS = (".maz", ".num", ".txt")
+"""Extensions of the maze files understood by `MazeWalls.load`"""
+
+
+class MazeWalls:
+    """
+    The ground truth walls of a square micromouse maze.
+
+    Cells are addressed by (x, y) with x growing to the east and y growing to the north, so (0, 0)
+    is the south west corner where the mouse starts. Walls are stored on the grid lines between
+    cells, so the two cells sharing a wall always agree about it.
+
+    Mazes can be read from the usual micromouse maze files:
+        - ".maz": one byte per cell, column by column from the south west corner, with the wall bits `NORTH`, `EAST`, `SOUTH`, `WEST`.
+        - ".num": one line "x y north east south west" per cell, with 0/1 wall flags.
+        - ".txt": the text drawing used by the public maze archives, with "o" or "+" posts, "---" and "|" walls.
+
+    Attributes:
+        size (int): Number of cells along one side of the maze.
+        horizontal (np.ndarray): Boolean array of shape (size + 1, size); horizontal[y, x] is the wall on the south side of cell (x, y).
+        vertical (np.ndarray): Boolean array of shape (size, size + 1); vertical[y, x] is the wall on the west side of cell (x, y).
+
+    Example:
+        walls = MazeWalls.load("mazes/apec2019.maz")
+        surface, mask = walls.rasterize(630)
+    """
+
+    def __init__(self, horizontal: np.ndarray, vertical: np.ndarray):
+        """
+        Args:
+            horizontal (np.ndarray): The horizontal walls, of shape (size + 1, size).
+            vertical (np.ndarray): The vertical walls, of shape (size, size + 1).
+        """
+        self.horizontal = np.asarray(horizontal, dtype=bool)
+        self.vertical = np.asarray(vertical, dtype=bool)
+        self.size = self.vertical.shape[0]
+        if (self.horizontal.shape != (self.size + 1, self.size)
+                or self.vertical.shape != (self.size, self.size + 1)):
+            raise ValueError(
+                f"Inconsistent wall arrays {self.horizontal.shape} and {self.vertical.shape}"
+            )
+
+    @classmethod
+    def from_cells(cls, cells: np.ndarray) -> "MazeWalls":
+        """
+        Create the walls from per cell wall bits.
+
+        A wall is kept when either of the two cells it separates has it.
+
+        Args:
+            cells (np.ndarray): Array of shape (size, size) indexed [x, y] holding the `NORTH`, `EAST`, `SOUTH` and `WEST` bits of each cell.
+
+        Returns:
+            MazeWalls: The walls of the maze.
+        """
+        cells = np.asarray(cells, dtype=np.uint8).T  # indexed [y, x]
+        size = cells.shape[0]
+        horizontal = np.zeros((size + 1, size), dtype=bool)
+        vertical = np.zeros((size, size + 1), dtype=bool)
+        horizontal[:-1] |= (cells & SOUTH) != 0
+        horizontal[1:] |= (cells & NORTH) != 0
+        vertical[:, :-1] |= (cells & WEST) != 0
+        vertical[:, 1:] |= (cells & EAST) != 0
+        return cls(horizontal, vertical)
+
+    def cells(self) -> np.ndarray:
+        """
+        Get the wall bits of every cell.
+
+        Returns:
+            np.ndarray: Array of shape (size, size) indexed [x, y], see `from_cells`.
+        """
+        cells = (self.horizontal[:-1] * SOUTH | self.horizontal[1:] * NORTH
+                 | self.vertical[:, :-1] * WEST | self.vertical[:, 1:] * EAST)
+        return cells.T.astype(np.uint8)
+
+    def has_wall(self, x: int, y: int, direction: int) -> bool:
+        """
+        Check if the side of a cell given by a direction bit is a wall.
+        """
+        if direction == NORTH:
+            return bool(self.horizontal[y + 1, x])
+        if direction == SOUTH:
+            return bool(self.horizontal[y, x])
+        if direction == EAST:
+            return bool(self.vertical[y, x + 1])
+        if direction == WEST:
+            return bool(self.vertical[y, x])
+        raise ValueError(f"Unknown direction: {direction}")
+
+    def graph(self) -> dict:
+        """
+        Get the maze as a graph of the cells connected by open passages.
+
+        Returns:
+            dict: Every cell (x, y) mapped to the list of cells reachable from it without crossing a wall.
+        """
+        graph = {(x, y): [] for y in range(self.size) for x in range(self.size)}
+        for y, x in np.argwhere(~self.horizontal[1:-1]).tolist():
+            graph[(x, y)].append((x, y + 1))
+            graph[(x, y + 1)].append((x, y))
+        for y, x in np.argwhere(~self.vertical[:, 1:-1]).tolist():
+            graph[(x, y)].append((x + 1, y))
+            graph[(x + 1, y)].append((x, y))
+        return graph
+
+    @classmethod
+    def from_mask(cls, mask: pg.Mask,
+                  transform: "CellTransform") -> "MazeWalls":
+        """
+        Recover the walls of a maze image by sampling its wall mask along the grid lines.
+
+        Every wall position is sampled at three points along its middle and counts as a wall when
+        most of them are set, which tolerates the anti-aliasing and rounding of scaled images.
+
+        Args:
+            mask (pg.Mask): The wall pixels of the maze image.
+            transform (CellTransform): The position of the cells in the mask, e.g. from `CellTransform.from_mask`.
+
+        Returns:
+            MazeWalls: The walls of the maze.
+        """
+        pixels = mask_to_array(mask)
+        size, cell = transform.size, transform.cell_size
+        along = np.array([0.3, 0.5, 0.7])
+
+        def sample(x, y):
+            x = np.clip(np.floor(x).astype(np.int64), 0, pixels.shape[0] - 1)
+            y = np.clip(np.floor(y).astype(np.int64), 0, pixels.shape[1] - 1)
+            return pixels[x, y].sum(axis=-1) >= 2
+
+        rows, cols = np.mgrid[0:size + 1, 0:size]
+        horizontal = sample(
+            transform.origin.x + (cols[..., None] + along) * cell,
+            np.broadcast_to(
+                (transform.origin.y - rows * cell)[..., None], rows.shape +
+                (3, )),
+        )
+        rows, cols = np.mgrid[0:size, 0:size + 1]
+        vertical = sample(
+            np.broadcast_to((transform.origin.x + cols * cell)[..., None],
+                            cols.shape + (3, )),
+            transform.origin.y - (rows[..., None] + along) * cell,
+        )
+        return cls(horizontal, vertical)
+
+    @classmethod
+    def load(cls, path: str) -> "MazeWalls":
+        """
+        Read a maze file, the format being given by the extension (see `MAZE_FILE_EXTENSIONS`).
+
+        Args:
+            path (str): The maze file.
+
+        Returns:
+            MazeWalls: The walls of the maze.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".maz":
+            with open(path, "rb") as file:
+                cells = np.frombuffer(file.read(), dtype=np.uint8)
+            size = math.isqrt(len(cells))
+            if size * size != len(cells):
+                raise ValueError(f"{path} does not hold a square maze")
+            return cls.from_cells(cells.reshape(size, size))
+        if extension == ".num":
+            rows = np.loadtxt(path, dtype=np.int64, ndmin=2)
+            size = int(rows[:, :2].max()) + 1
+            cells = np.zeros((size, size), dtype=np.uint8)
+            cells[rows[:, 0], rows[:, 1]] = (rows[:, 2] * NORTH
+                                             | rows[:, 3] * EAST
+                                             | rows[:, 4] * SOUTH
+                                             | rows[:, 5] * WEST)
+            return cls.from_cells(cells)
+        if extension == ".txt":
+            with open(path) as file:
+                return cls.from_text(file.read())
+        raise ValueError(f"Unknown maze file format: {extension}")
+
+    @classmethod
+    def from_text(cls, text: str) -> "MazeWalls":
+        """
+        Parse the text drawing of a maze, north at the top (see the ".txt" format above).
+        """
+        lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+        size = (len(lines) - 1) // 2
+        lines = [line.ljust(4 * size + 1) for line in lines]
+        horizontal = np.zeros((size + 1, size), dtype=bool)
+        vertical = np.zeros((size, size + 1), dtype=bool)
+        for y in range(size + 1):
+            line = lines[2 * (size - y)]
+            horizontal[y] = [line[4 * x + 2] != " " for x in range(size)]
+        for y in range(size):
+            line = lines[2 * (size - y) - 1]
+            vertical[y] = [line[4 * x] != " " for x in range(size + 1)]
+        return cls(horizontal, vertical)
+
+    def save(self, path: str):
+        """
+        Write the maze to a ".maz", ".num" or ".txt" file, the format being given by the extension.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".maz":
+            with open(path, "wb") as file:
+                file.write(self.cells().tobytes())
+        elif extension == ".num":
+            cells = self.cells()
+            with open(path, "w") as file:
+                for x in range(self.size):
+                    for y in range(self.size):
+                        bits = int(cells[x, y])
+                        file.write(f"{x} {y} " + " ".join(
+                            str(int(bool(bits & bit)))
+                            for bit in (NORTH, EAST, SOUTH, WEST)) + "\n")
+        elif extension == ".txt":
+            with open(path, "w") as file:
+                file.write(self.to_text())
+        else:
+            raise ValueError(f"Unknown maze file format: {extension}")
+
+    def to_text(self) -> str:
+        """
+        Draw the maze as text, north at the top (see the ".txt" format above).
+        """
+        lines = []
+        for y in range(self.size, -1, -1):
+            lines.append("o" + "".join(
+                ("---" if wall else "   ") + "o"
+                for wall in self.horizontal[y]))
+            if y > 0:
+                lines.append("".join(
+                    ("|" if self.vertical[y - 1, x] else " ") +
+                    ("   " if x < self.size else "")
+                    for x in range(self.size + 1)).rstrip())
+        return "\n".join(lines) + "\n"
+
+    def rasterize(self,
+                  map_size: int,
+                  wall_width: float = 0.125,
+                  color=(0, 0, 0)) -> tuple[pg.Surface, pg.Mask]:
+        """
+        Draw the walls straight into a render surface and a collision mask, without going through an image file.
+
+        The layout matches the maze images in `assets/`: square wall caps, and walls centred on the
+        grid lines with a margin of half a wall around the maze.
+
+        Args:
+            map_size (int): Side of the square surface and mask in pixels.
+            wall_width (float): Wall thickness as a fraction of a cell.
+            color (tuple): Color of the walls; the rest of the surface is transparent.
+
+        Returns:
+            tuple[pg.Surface, pg.Mask]: The surface to draw and the mask of the wall pixels.
+        """
+        cell = map_size / (self.size + wall_width * 2)
+        half_width = wall_width * cell / 2
+
+        def line(index):
+            return (wall_width + index) * cell
+
+        rects = []
+        for y, x in np.argwhere(self.horizontal).tolist():
+            rects.append((line(x) - half_width, line(self.size - y) -
+                          half_width, line(x + 1) + half_width,
+                          line(self.size - y) + half_width))
+        for y, x in np.argwhere(self.vertical).tolist():
+            rects.append((line(x) - half_width, line(self.size - y - 1) -
+                          half_width, line(x) + half_width,
+                          line(self.size - y) + half_width))
+
+        surface = pg.Surface((map_size, map_size), pg.SRCALPHA)
+        mask = pg.Mask((map_size, map_size))
+        for left, top, right, bottom in rects:
+            rect = pg.Rect(round(left), round(top),
+                           round(right) - round(left),
+                           round(bottom) - round(top))
+            surface.fill(color, rect)
+            mask.draw(pg.Mask(rect.size, fill=True), rect.topleft)
+        return surface, mask
+
+
+class CellTransform:
+    """
+    Converts between pixel positions and the (x, y) cells of a maze, see `MazeWalls`.
+
+    Attributes:
+        origin (pg.Vector2): Pixel position of the south west corner of cell (0, 0), on the middle of the walls.
+        cell_size (float): Distance in pixels between two grid lines.
+        size (int): Number of cells along one side of the maze.
+
+    Example:
+        transform = simulator.cell_transform
+        cell = transform.cell_of(robot.get_position(), max_offset=0.25)
+    """
+
+    def __init__(self, origin: pg.Vector2, cell_size: float, size: int):
+        self.origin = pg.Vector2(origin)
+        self.cell_size = cell_size
+        self.size = size
+
+    @classmethod
+    def from_mask(cls,
+                  mask: pg.Mask,
+                  size: int,
+                  offset: pg.Vector2 = (0, 0),
+                  wall_width: float = 0.125) -> "CellTransform":
+        """
+        Find where the cells of a maze are from the bounding box of its wall mask.
+
+        The outer walls span `size + wall_width` cells from outer edge to outer edge, which gives the
+        cell size, and the grid lines run through the middle of the walls.
+
+        Args:
+            mask (pg.Mask): The wall pixels of the maze.
+            size (int): Number of cells along one side of the maze.
+            offset (pg.Vector2): Position of the mask on the screen, added to the origin.
+            wall_width (float): Wall thickness as a fraction of a cell.
+
+        Returns:
+            CellTransform: The transform, in the coordinates of the mask shifted by `offset`.
+        """
+        pixels = mask_to_array(mask)
+        columns = np.flatnonzero(pixels.any(axis=1))
+        rows = np.flatnonzero(pixels.any(axis=0))
+        if len(columns) == 0:
+            raise ValueError("The mask has no walls")
+        cell_size = (columns[-1] + 1 - columns[0]) / (size + wall_width)
+        half_wall = wall_width * cell_size / 2
+        return cls(
+            pg.Vector2(offset) + (float(columns[0] + half_wall),
+                                  float(rows[-1] + 1 - half_wall)),
+            float(cell_size),
+            size,
+        )
+
+    def cell_of(self, position: pg.Vector2, max_offset: float = 0.5):
+        """
+        Get the cell a position is in.
+
+        Args:
+            position (pg.Vector2): Pixel position.
+            max_offset (float): Largest distance from the centre of the cell along either axis, as a fraction of a cell.
+
+        Returns:
+            tuple[int, int] or None: The (x, y) cell, or None if the position is outside the maze or too far from the centre of its cell.
+        """
+        x = (position[0] - self.origin.x) / self.cell_size - 0.5
+        y = (self.origin.y - position[1]) / self.cell_size - 0.5
+        cell_x, cell_y = round(x), round(y)
+        if (abs(x - cell_x) > max_offset or abs(y - cell_y) > max_offset
+                or not (0 <= cell_x < self.size and 0 <= cell_y < self.size)):
+            return None
+        return cell_x, cell_y
+
+    def centre_of(self, x: int, y: int) -> pg.Vector2:
+        """
+        Get the pixel position of the centre of a cell.
+        """
+        return pg.Vector2(self.origin.x + (x + 0.5) * self.cell_size,
+                          self.origin.y - (y + 0.5) * self.cell_size)
@@ -0,0 +1,149 @@
+import math
+
+import numpy as np
+import pygame as pg
+
+from src.simulator.collision import mask_to_array
+
+
+class OccupancyPyramid:
+    """
+    A mipmap of a wall mask where every level tells which blocks contain at least one wall pixel.
+
+    Level 0 is the mask itself and each next level halves the resolution, a cell being occupied when
+    any of the 2x2 cells below it is. Rays and boxes are tested from the coarse levels down, so
+    large empty areas are skipped in one step and only the blocks near walls are looked at in full
+    resolution; a ray crosses O(log(size)) blocks per empty stretch instead of one per pixel.
+
+    Attributes:
+        levels (list[np.ndarray]): Boolean arrays indexed [x, y], level 0 being the full resolution mask.
+        size (tuple[int, int]): Width and height of the mask.
+        offset (pg.Vector2): Position of the mask on the screen, queries are in screen coordinates.
+
+    Example:
+        pyramid = OccupancyPyramid(simulator._map_mask, simulator._map_position)
+        distance = pyramid.raycast(sensor_position, direction, 150)
+    """
+
+    def __init__(self, mask: pg.Mask, offset: pg.Vector2 = (0, 0)):
+        """
+        Args:
+            mask (pg.Mask): The wall mask.
+            offset (pg.Vector2): Position of the mask on the screen.
+        """
+        self.offset = pg.Vector2(offset)
+        self.size = mask.get_size()
+        level = mask_to_array(mask)
+        self.levels = [level]
+        while level.shape[0] > 1 or level.shape[1] > 1:
+            level = np.pad(level,
+                           ((0, level.shape[0] % 2), (0, level.shape[1] % 2)))
+            level = (level[0::2, 0::2] | level[1::2, 0::2]
+                     | level[0::2, 1::2] | level[1::2, 1::2])
+            self.levels.append(level)
+        # row major bytes per level, indexing them is much cheaper than indexing NumPy arrays
+        self._rows = [(level.shape[0], level.T.tobytes())
+                      for level in self.levels]
+
+    def _occupied(self, level: int, x: int, y: int) -> bool:
+        width, data = self._rows[level]
+        return data[y * width + x] != 0
+
+    def raycast(self, origin, direction, max_distance: float = math.inf):
+        """
+        Find the first wall pixel entered by a ray.
+
+        Args:
+            origin (pg.Vector2): Start of the ray, on the screen.
+            direction (pg.Vector2): Unit direction of the ray.
+            max_distance (float): Hits farther than this are ignored.
+
+        Returns:
+            float or None: Distance to the edge of the first wall pixel (0 if the ray starts in one), or None if nothing is hit within `max_distance`.
+        """
+        ox, oy = origin[0] - self.offset.x, origin[1] - self.offset.y
+        dx, dy = direction[0], direction[1]
+        width, height = self.size
+
+        # clip the ray to the mask, nothing is outside of it
+        start, end = 0.0, max_distance
+        for o, d, limit in ((ox, dx, width), (oy, dy, height)):
+            if d:
+                t0, t1 = (0 - o) / d, (limit - o) / d
+                start, end = max(start, min(t0, t1)), min(end, max(t0, t1))
+            elif not 0 <= o < limit:
+                return None
+        if start > end:
+            return None
+
+        top = len(self.levels) - 1
+        level = top
+        t = start
+        x = min(max(int(ox + t * dx), 0), width - 1)
+        y = min(max(int(oy + t * dy), 0), height - 1)
+        while t <= end:
+            # go up while the parent block is empty, then down to the largest empty block
+            while level < top and not self._occupied(level + 1, x >> level + 1,
+                                                     y >> level + 1):
+                level += 1
+            while self._occupied(level, x >> level, y >> level):
+                if level == 0:
+                    return t
+                level -= 1
+
+            # step to the pixel just past the side where the ray leaves the empty block
+            left, top_edge = (x >> level) << level, (y >> level) << level
+            right, bottom = left + (1 << level), top_edge + (1 << level)
+            exit_x = exit_y = math.inf
+            if dx > 0:
+                exit_x = (right - ox) / dx
+            elif dx < 0:
+                exit_x = (left - ox) / dx
+            if dy > 0:
+                exit_y = (bottom - oy) / dy
+            elif dy < 0:
+                exit_y = (top_edge - oy) / dy
+            if exit_x <= exit_y:
+                t = max(t, exit_x)
+                x = right if dx > 0 else left - 1
+                y = min(max(int(oy + t * dy), top_edge), bottom - 1)
+            else:
+                t = max(t, exit_y)
+                y = bottom if dy > 0 else top_edge - 1
+                x = min(max(int(ox + t * dx), left), right - 1)
+            if not (0 <= x < width and 0 <= y < height):
+                return None
+        return None
+
+    def box_is_empty(self, min_x: float, min_y: float, max_x: float,
+                     max_y: float) -> bool:
+        """
+        Check that a box on the screen contains no wall pixel, e.g. as the broad phase of a collision test.
+
+        Starts at the level where the box spans at most 2x2 blocks and only descends into the
+        occupied ones.
+        """
+        x0 = max(int(math.floor(min_x - self.offset.x)), 0)
+        y0 = max(int(math.floor(min_y - self.offset.y)), 0)
+        x1 = min(int(math.floor(max_x - self.offset.x)), self.size[0] - 1)
+        y1 = min(int(math.floor(max_y - self.offset.y)), self.size[1] - 1)
+        if x0 > x1 or y0 > y1:
+            return True
+
+        level = min(max(x1 - x0, y1 - y0, 1).bit_length(),
+                    len(self.levels) - 1)
+        blocks = [(bx, by) for bx in range(x0 >> level, (x1 >> level) + 1)
+                  for by in range(y0 >> level, (y1 >> level) + 1)]
+        while True:
+            blocks = [(bx, by) for bx, by in blocks
+                      if self._occupied(level, bx, by)]
+            if not blocks:
+                return True
+            if level == 0:
+                return False
+            level -= 1
+            blocks = [(x, y) for bx, by in blocks
+                      for x in (2 * bx, 2 * bx + 1)
+                      for y in (2 * by, 2 * by + 1)
+                      if x0 >> level <= x <= x1 >> level
+                      and y0 >> level <= y <= y1 >> level]
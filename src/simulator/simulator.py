@@ -1,7 +1,13 @@
+import numpy as np
 import pygame as pg
 import pygame.freetype as ft
 
-from src.robot.robot import Robot
+from src.robot.robot import STATE_SIZE, Robot
+from src.simulator.dynamic_layer import DynamicOccupancy
+from src.simulator.occupancy_pyramid import OccupancyPyramid
+from src.simulator.state import SimulatorState
+from src.simulator.wall_geometry import SegmentBVH
+from src.utils.input_snapshot import InputSnapshot
 
 
 class Simulator:
@@ -15,6 +21,12 @@ class Simulator:
         overlay_fps (bool): If True, display the current frames per second.
         overlay_font_size (int): Font size for overlay text.
         overlays (list): A list of additional overlays to display.
+        headless (bool): If True, draw into an off-screen surface instead of opening a window.
+        dynamic_layer (DynamicOccupancy): The robot footprints seen by sensors, None unless sensors_see_robots is set.
+        obstacles (list): Polygonal obstacles added to the wall segments by `add_obstacles`.
+        sensor_data (np.ndarray): The data of every sensor of every robot, robot by robot, updated in place by `step`.
+        sensor_timestamps (np.ndarray): Simulated time each value of `sensor_data` was read at.
+        sensor_slices (list[slice]): The part of `sensor_data` holding each robot's sensors; `Robot.sensor_data` is a view of it.
     """
     _map_mask: pg.Mask = None
     """Must be defined in child class"""
@@ -27,7 +39,10 @@ class Simulator:
                  tick: int = 60,
                  overlay_fps: bool = True,
                  overlay_font_size: int = 15,
-                 overlays: list = []):
+                 overlays: list = [],
+                 headless: bool = False,
+                 sensors_see_robots: bool = False,
+                 noise_seed: int = None):
         """
         Initializes the Simulator.
 
@@ -38,6 +53,9 @@ class Simulator:
             overlay_fps (bool): If True, display the current frames per second.
             overlay_font_size (int): Font size for overlay text.
             overlays (list): A list of additional overlays to display.
+            headless (bool): If True, draw into an off-screen surface instead of opening a window, so many simulators can live in one process.
+            sensors_see_robots (bool): If True, the robots are kept in a `DynamicOccupancy` layer which sensors check along with the map.
+            noise_seed (int): If given, every robot's sensor noise is reseeded with its own seed derived from this one, see `Robot.seed_sensor_noise`.
 
         Example:
             robot1 = Robot(position=[100, 100], angle=0, size=[50, 30], center_of_rotation=[25, 15], sensors={})
@@ -46,11 +64,14 @@ class Simulator:
         """
         pg.init()
         self._tick = tick
-        self._overlays = overlays
+        self._overlays = list(overlays)
         self._overlay_font_size = overlay_font_size
-        self.screen = pg.display.set_mode(
-            (int(1600 * scaling_factor), int(900 * scaling_factor)), )
-        #! pg.RESIZABLE)
+        screen_size = (int(1600 * scaling_factor), int(900 * scaling_factor))
+        if headless:
+            self.screen = pg.Surface(screen_size)
+        else:
+            self.screen = pg.display.set_mode(screen_size, )
+            #! pg.RESIZABLE)
         self.clock = pg.time.Clock()
         self.font = ft.SysFont("Verdana", self._overlay_font_size)
 
@@ -61,6 +82,188 @@ class Simulator:
             )
 
         self._robots = robots
+        self.time: float = 0
+        """Simulated time in seconds, advanced by every call to `step`"""
+        self._wall_bvh: SegmentBVH = None
+        self.obstacles: list = []
+        self._occupancy_pyramid: OccupancyPyramid = None
+        self._sensors_attached = False
+        self._sensors_see_robots = sensors_see_robots
+        self.dynamic_layer: DynamicOccupancy = None
+
+        # one buffer for all the readings, each robot reads and writes its own slice of it
+        counts = np.cumsum([0] + [len(robot._sensors) for robot in robots])
+        self.sensor_data = np.zeros(counts[-1])
+        self.sensor_timestamps = np.full(counts[-1], np.nan)
+        self.sensor_slices = [
+            slice(start, end) for start, end in zip(counts[:-1], counts[1:])
+        ]
+        for robot, robot_slice in zip(robots, self.sensor_slices):
+            robot.bind_sensor_data(self.sensor_data[robot_slice],
+                                   self.sensor_timestamps[robot_slice])
+        if noise_seed is not None:
+            for robot, seed in zip(
+                    robots,
+                    np.random.SeedSequence(noise_seed).spawn(len(robots))):
+                robot.seed_sensor_noise(seed)
+
+    def step(self, time_step: float, events):
+        """
+        Advance the simulation by one frame without drawing anything.
+
+        Args:
+            time_step (float): The time step for the update, usually based on the simulation frame rate. It is basically the FPS.
+            events (InputSnapshot): The input of the frame, shared by all robots and sensors; a plain list of Pygame events is accepted too.
+        """
+        events = InputSnapshot.of(events)
+        if time_step:
+            self.time += 1 / time_step
+        if not self._sensors_attached:
+            self.attach_sensors()
+
+        for robot in self._robots:
+            robot.update(time_step, events)
+            if self.dynamic_layer is not None:
+                # erasing the old footprint also keeps the robot out of its own readings
+                self.dynamic_layer.erase(robot)
+            position, angle = robot.get_position(), robot.get_angle()
+            for sensor, sensor_position in zip(robot._sensors,
+                                               robot.sensor_positions()):
+                sensor.calculate_sensor_data(
+                    position,
+                    angle,
+                    self._map_mask,
+                    self._map_position,
+                    sensor_position,
+                )
+            robot.read_sensors(self.time)
+            if self.dynamic_layer is not None:
+                self.dynamic_layer.stamp(robot)
+
+    def attach_sensors(self):
+        """
+        Give every sensor access to the simulator, see `Sensor.attach_map`.
+
+        Called on the first `step`, once the child class has loaded its map; call it again if the
+        robots or their sensors change.
+        """
+        if self._sensors_see_robots and self.dynamic_layer is None:
+            self.dynamic_layer = DynamicOccupancy(self._map_mask.get_size(),
+                                                  self._map_position)
+            for robot in self._robots:
+                self.dynamic_layer.stamp(robot)
+        for robot in self._robots:
+            for sensor in robot._sensors:
+                sensor.attach_map(self)
+        self._sensors_attached = True
+
+    @property
+    def wall_bvh(self) -> SegmentBVH:
+        """
+        The outline of the map mask and the `obstacles` as line segments in a `SegmentBVH`, in screen coordinates, built on first use.
+        """
+        if self._wall_bvh is None:
+            self._wall_bvh = SegmentBVH.from_mask(self._map_mask,
+                                                  self._map_position,
+                                                  polygons=self.obstacles)
+        return self._wall_bvh
+
+    def add_obstacles(self, polygons: list):
+        """
+        Add polygonal obstacles to the walls of `wall_bvh`, e.g. boxes placed in a maze.
+
+        The obstacles are only part of the segment geometry: LIDARs using the "bvh" method and
+        `MazeSim.detect_vector_collision` see them, the map mask and what is based on it do not.
+
+        Args:
+            polygons (list): The obstacles, each a list of (x, y) corners in screen coordinates.
+
+        Example:
+            simulator.add_obstacles([[(700, 100), (740, 100), (740, 140), (700, 140)]])
+        """
+        self.obstacles.extend(list(polygon) for polygon in polygons)
+        self._wall_bvh = None
+        if self._sensors_attached:
+            # sensors keep the hierarchy they were given, hand them the new one
+            self.attach_sensors()
+
+    @property
+    def occupancy_pyramid(self) -> OccupancyPyramid:
+        """
+        The `OccupancyPyramid` of the map mask, in screen coordinates, built on first use.
+        """
+        if self._occupancy_pyramid is None:
+            self._occupancy_pyramid = OccupancyPyramid(self._map_mask,
+                                                       self._map_position)
+        return self._occupancy_pyramid
+
+    def snapshot(self) -> SimulatorState:
+        """
+        Capture the state of the simulation: robot poses and velocities, sensor data and controller states.
+
+        Returns:
+            SimulatorState: A snapshot which can be passed to `restore` any number of times.
+
+        Example:
+            state = simulator.snapshot()
+            for _ in range(100):
+                simulator.step(60, [])  # Look ahead
+            simulator.restore(state)  # And come back
+        """
+        robots = np.empty((len(self._robots), STATE_SIZE))
+        controllers = []
+        for row, robot in zip(robots, self._robots):
+            robot.get_state(row)
+            controllers.append(None if robot.controller is None else robot.
+                               controller.get_state())
+        return SimulatorState(self.time, robots, self.sensor_data.copy(),
+                              controllers, self._snapshot_extra(),
+                              self.sensor_timestamps.copy(), [
+                                  None if robot.sensor_noise is None else
+                                  robot.sensor_noise.get_state()
+                                  for robot in self._robots
+                              ])
+
+    def restore(self, state: SimulatorState):
+        """
+        Bring the simulation back to a state captured by `snapshot`, without reloading anything.
+
+        Args:
+            state (SimulatorState): The snapshot to restore, it is not modified.
+        """
+        self.time = state.time
+        self.sensor_data[:] = state.sensors
+        if state.sensor_timestamps is not None:
+            self.sensor_timestamps[:] = state.sensor_timestamps
+        for row, controller_state, robot in zip(state.robots,
+                                                state.controllers,
+                                                self._robots):
+            robot.set_state(row)
+            for sensor, value in zip(robot._sensors, robot.sensor_data):
+                sensor.set_data(value)
+            if robot.controller is not None:
+                robot.controller.set_state(controller_state)
+        if state.sensor_noise is not None:
+            for robot, noise_state in zip(self._robots, state.sensor_noise):
+                if noise_state is not None:
+                    robot.sensor_noise.set_state(noise_state)
+        if self.dynamic_layer is not None:
+            self.dynamic_layer.clear()
+            for robot in self._robots:
+                self.dynamic_layer.stamp(robot)
+        self._restore_extra(state.extra)
+
+    def _snapshot_extra(self) -> dict:
+        """
+        Override this function in child class to add its own state to snapshots.
+        """
+        return {}
+
+    def _restore_extra(self, extra: dict):
+        """
+        Override this function in child class to restore the state added by `_snapshot_extra`.
+        """
+        pass
 
     def draw(self):
         """
@@ -103,7 +306,7 @@ class Simulator:
         Handle Pygame events, including quitting the simulation.
 
         Args:
-            events: The list of events to handle.
+            events (InputSnapshot): The input of the frame.
         """
         for event in events:
             if event.type == pg.QUIT:
@@ -116,28 +319,20 @@ class Simulator:
         """
         Run the simulation loop.
 
-        This method handles event processing, updates the robots, and draws the screen.
+        This method handles event processing, steps the simulation, and draws the screen.
         
         Example:
             simulator.run()  # Start the simulation loop
         """
         self.running = True
         while self.running:
-            events = pg.event.get()
+            events = InputSnapshot.capture()
             self.event_handler(events)
-
-            for robot in self._robots:
-                robot.update(self.clock.get_fps(), events)
-                for sensor in robot._sensors:
-                    sensor.calculate_sensor_data(
-                        robot.get_position(),
-                        robot.get_angle(),
-                        self._map_mask,
-                        self._map_position,
-                    )
-
+            self.step(self.clock.get_fps(), events)
             self.draw()
             pg.display.flip()
             self.clock.tick(self._tick)
 
+        for robot in self._robots:
+            robot.close()
         pg.quit()
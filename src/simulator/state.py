@@ -0,0 +1,58 @@
+import copy
+
+import numpy as np
+
+
+class SimulatorState:
+    """
+    A snapshot of everything that changes while a simulator runs, as returned by `Simulator.snapshot`.
+
+    Numeric state is kept in a few contiguous arrays so copying a snapshot is cheap; the map and
+    other data fixed at construction are not part of it.
+
+    Attributes:
+        time (float): Simulated time in seconds.
+        robots (np.ndarray): One row per robot, as returned by `Robot.get_state`.
+        sensors (np.ndarray): The data of every sensor of every robot, robot by robot.
+        controllers (list): The state of each robot's controller, None for robots without one.
+        extra (dict): State added by child simulators, e.g. collision counters.
+        sensor_timestamps (np.ndarray): The time each sensor value was read at, in the order of `sensors`; None if not recorded.
+        sensor_noise (list): The state of each robot's sensor noise, None for robots without; None if not recorded.
+    """
+    __slots__ = ("time", "robots", "sensors", "controllers", "extra",
+                 "sensor_timestamps", "sensor_noise")
+
+    def __init__(self,
+                 time: float,
+                 robots: np.ndarray,
+                 sensors: np.ndarray,
+                 controllers: list,
+                 extra: dict,
+                 sensor_timestamps: np.ndarray = None,
+                 sensor_noise: list = None):
+        self.time = time
+        self.robots = robots
+        self.sensors = sensors
+        self.controllers = controllers
+        self.extra = extra
+        self.sensor_timestamps = sensor_timestamps
+        self.sensor_noise = sensor_noise
+
+    def copy(self) -> "SimulatorState":
+        """
+        Get an independent copy of the snapshot, e.g. to branch several rollouts from it.
+        """
+        return SimulatorState(
+            self.time,
+            self.robots.copy(),
+            self.sensors.copy(),
+            copy.deepcopy(self.controllers),
+            {
+                key: value.copy() if isinstance(value, np.ndarray) else
+                copy.deepcopy(value)
+                for key, value in self.extra.items()
+            },
+            None if self.sensor_timestamps is None else
+            self.sensor_timestamps.copy(),
+            copy.deepcopy(self.sensor_noise),
+        )
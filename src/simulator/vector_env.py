@@ -0,0 +1,258 @@
+import multiprocessing as mp
+
+import numpy as np
+
+from src.utils.input_snapshot import InputSnapshot
+
+
+def sensor_observation(simulator, robot) -> np.ndarray:
+    """
+    Default observation: the data of each sensor of the robot (LIDAR distances, IR states).
+    """
+    return robot.sensor_data.astype(np.float32)
+
+
+def collision_penalty(simulator, robot) -> float:
+    """
+    Default reward: minus the number of collisions of the robot so far, for simulators recording collisions.
+
+    SimEnv turns this cumulative value into a per-step reward by taking its difference between steps.
+    """
+    if not hasattr(simulator, "collisions"):
+        return 0.0
+    return -float(simulator.collisions.count(robot))
+
+
+class SimEnv:
+    """
+    A Gym-style environment driving one robot of a simulator with [forward acceleration, angular acceleration] actions.
+
+    Attributes:
+        simulator (Simulator): The wrapped simulator, created by `make_simulator` on the first reset and restored from a snapshot on the next ones.
+        robot (Robot): The robot the actions are applied to.
+    """
+
+    def __init__(
+        self,
+        make_simulator,
+        robot_index: int = 0,
+        time_step: float = 60,
+        observe=sensor_observation,
+        reward=collision_penalty,
+        done=None,
+        max_steps: int = None,
+        rebuild_on_reset: bool = False,
+    ):
+        """
+        Args:
+            make_simulator: Callable returning a new simulator, preferably created with headless=True.
+            robot_index (int): Index of the robot driven by the actions.
+            time_step (float): Frame rate the simulator is stepped at, in the same sense as `Simulator.step`.
+            observe: Callable (simulator, robot) -> np.ndarray giving the observation.
+            reward: Callable (simulator, robot) -> float giving a cumulative score; the reward of a step is its increase.
+            done: Optional callable (simulator, robot) -> bool ending the episode.
+            max_steps (int): Optional number of steps after which the episode is truncated.
+            rebuild_on_reset (bool): Call make_simulator on every reset instead of restoring a snapshot of the first simulator, e.g. when it randomizes the map.
+        """
+        self.make_simulator = make_simulator
+        self.robot_index = robot_index
+        self.time_step = time_step
+        self.observe = observe
+        self.reward = reward
+        self.done = done
+        self.max_steps = max_steps
+        self.rebuild_on_reset = rebuild_on_reset
+
+        self.simulator = None
+        self._initial_state = None
+        self.robot = None
+        self.steps = 0
+        self._score = 0.0
+        self._no_input = InputSnapshot()
+
+    def reset(self) -> np.ndarray:
+        """
+        Start a new episode and return its first observation.
+        """
+        if self._initial_state is None or self.rebuild_on_reset:
+            self.simulator = self.make_simulator()
+            self.robot = self.simulator._robots[self.robot_index]
+            self.simulator.step(0, self._no_input)  # only senses, nothing moves
+            self._initial_state = self.simulator.snapshot()
+        else:
+            self.simulator.restore(self._initial_state)
+        self.steps = 0
+        self._score = self.reward(self.simulator, self.robot)
+        return self.observe(self.simulator, self.robot)
+
+    def step(self, action):
+        """
+        Apply an action for one frame.
+
+        Args:
+            action: [forward acceleration, angular acceleration].
+
+        Returns:
+            tuple: (observation, reward, done, truncated).
+        """
+        self.robot.set_acceleration([action[0], 0])
+        self.robot.set_angular_acceleration(action[1])
+        self.simulator.step(self.time_step, self._no_input)
+        self.steps += 1
+
+        score = self.reward(self.simulator, self.robot)
+        reward = score - self._score
+        self._score = score
+        done = self.done is not None and bool(
+            self.done(self.simulator, self.robot))
+        truncated = self.max_steps is not None and self.steps >= self.max_steps
+
+        return self.observe(self.simulator,
+                            self.robot), reward, done, truncated
+
+
+class _EnvBatch:
+    """
+    A list of environments stepped together, returning stacked arrays and resetting finished episodes.
+    """
+
+    def __init__(self, make_envs):
+        self.envs = [make_env() for make_env in make_envs]
+
+    def reset(self):
+        return np.stack([env.reset() for env in self.envs])
+
+    def step(self, actions):
+        observations, rewards, dones, truncateds = [], [], [], []
+        for env, action in zip(self.envs, actions):
+            observation, reward, done, truncated = env.step(action)
+            if done or truncated:
+                observation = env.reset()
+            observations.append(observation)
+            rewards.append(reward)
+            dones.append(done)
+            truncateds.append(truncated)
+        return (
+            np.stack(observations),
+            np.array(rewards, dtype=np.float32),
+            np.array(dones),
+            np.array(truncateds),
+        )
+
+
+def _run_batch(connection, make_envs):
+    """
+    Body of a worker process owning a shard of the environments.
+    """
+    batch = _EnvBatch(make_envs)
+    try:
+        while True:
+            command, data = connection.recv()
+            if command == "reset":
+                connection.send(batch.reset())
+            elif command == "step":
+                connection.send(batch.step(data))
+            else:
+                break
+    finally:
+        connection.close()
+
+
+class VectorEnv:
+    """
+    K independent environments stepped as a batch.
+
+    With num_workers=0 all environments are stepped in the calling process, otherwise they are split
+    into num_workers shards, each stepped by its own process in parallel. Environments whose episode
+    ends are reset automatically, so the returned observation is already the first one of the next episode.
+
+    Workers are started with the "fork" method by default, so the environment factories can be
+    lambdas and closures as in the example. "fork" does not exist on Windows and is unsafe on macOS;
+    there, pass start_method="spawn" and picklable factories, i.e. module level functions or
+    `functools.partial` objects of them, since each factory is then pickled into its worker.
+
+    Example:
+        env = VectorEnv([lambda: SimEnv(make_maze_sim, max_steps=600)] * 8, num_workers=2)
+        observations = env.reset()  # shape (8, number of sensors)
+        observations, rewards, dones, truncateds = env.step(np.zeros((8, 2)))
+    """
+
+    def __init__(self,
+                 make_envs: list,
+                 num_workers: int = 0,
+                 start_method: str = "fork"):
+        """
+        Args:
+            make_envs (list): One callable per environment returning a SimEnv.
+            num_workers (int): Number of worker processes, 0 to step everything in this process.
+            start_method (str): How worker processes are started, see `multiprocessing.get_context`; the factories must be picklable unless it is "fork".
+        """
+        self.num_envs = len(make_envs)
+        self._batch = None
+        self._workers = []
+        self._shards = []
+
+        if num_workers == 0:
+            self._batch = _EnvBatch(make_envs)
+            return
+
+        context = mp.get_context(start_method)
+        for shard in np.array_split(np.arange(self.num_envs), num_workers):
+            if len(shard) == 0:
+                continue
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_run_batch,
+                args=(child, [make_envs[i] for i in shard]),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._workers.append((process, parent))
+            self._shards.append(shard)
+
+    def reset(self) -> np.ndarray:
+        """
+        Reset every environment.
+
+        Returns:
+            np.ndarray: The stacked first observations, shape (K, ...).
+        """
+        if self._batch is not None:
+            return self._batch.reset()
+
+        for _, connection in self._workers:
+            connection.send(("reset", None))
+        return np.concatenate(
+            [connection.recv() for _, connection in self._workers])
+
+    def step(self, actions):
+        """
+        Step every environment with its action.
+
+        Args:
+            actions: Array of shape (K, 2) holding [forward acceleration, angular acceleration] per environment.
+
+        Returns:
+            tuple: Stacked (observations, rewards, dones, truncateds) arrays, each with K rows.
+        """
+        actions = np.asarray(actions, dtype=np.float64)
+        if self._batch is not None:
+            return self._batch.step(actions)
+
+        for (_, connection), shard in zip(self._workers, self._shards):
+            connection.send(("step", actions[shard]))
+        results = [connection.recv() for _, connection in self._workers]
+        return tuple(
+            np.concatenate([result[i] for result in results])
+            for i in range(4))
+
+    def close(self):
+        """
+        Stop the worker processes.
+        """
+        for process, connection in self._workers:
+            connection.send(("close", None))
+            connection.close()
+            process.join(timeout=1)
+        self._workers = []
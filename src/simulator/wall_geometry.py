@@ -0,0 +1,372 @@
+import math
+
+import numpy as np
+import pygame as pg
+
+from src.simulator.collision import mask_to_array
+
+
+def _runs(edges: np.ndarray):
+    """Find the runs of True along the second axis, as (row, start, end) arrays with end exclusive."""
+    padded = np.zeros((edges.shape[0], edges.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = edges
+    steps = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(steps == 1)
+    _, ends = np.nonzero(steps == -1)
+    return rows, starts, ends
+
+
+def segments_from_mask(mask: pg.Mask,
+                       offset: pg.Vector2 = (0, 0)) -> np.ndarray:
+    """
+    Convert the set pixels of a mask into the line segments outlining them.
+
+    Pixel (x, y) covers the square from (x, y) to (x + 1, y + 1); every boundary between a set and
+    an unset pixel becomes part of a segment, and collinear neighbouring boundaries are merged, so
+    a wall drawn as a rectangle gives four segments whatever the resolution.
+
+    Args:
+        mask (pg.Mask): The mask to convert, e.g. the map mask of a simulator.
+        offset (pg.Vector2): Position of the mask on the screen, added to every point.
+
+    Returns:
+        np.ndarray: Array of shape (number of segments, 4) holding x0, y0, x1, y1.
+    """
+    pixels = mask_to_array(mask)  # [x, y]
+    padded = np.pad(pixels, 1)
+
+    # horizontal boundaries: line y runs between pixel rows y - 1 and y
+    horizontal = padded[1:-1, 1:] != padded[1:-1, :-1]  # [x, y]
+    ys, x_starts, x_ends = _runs(horizontal.T)
+    # vertical boundaries: line x runs between pixel columns x - 1 and x
+    vertical = padded[1:, 1:-1] != padded[:-1, 1:-1]  # [x, y]
+    xs, y_starts, y_ends = _runs(vertical)
+
+    segments = np.concatenate([
+        np.stack([x_starts, ys, x_ends, ys], axis=1),
+        np.stack([xs, y_starts, xs, y_ends], axis=1),
+    ]).astype(np.float64)
+    segments[:, [0, 2]] += offset[0]
+    segments[:, [1, 3]] += offset[1]
+    return segments
+
+
+def polygon_segments(polygon) -> np.ndarray:
+    """
+    Get the edges of a closed polygon as segments, in the format of `segments_from_mask`.
+
+    Args:
+        polygon (list): The corners of the polygon, as (x, y) pairs.
+    """
+    points = np.asarray(polygon, dtype=np.float64)
+    return np.concatenate([points, np.roll(points, -1, axis=0)], axis=1)
+
+
+def _cross(ax, ay, bx, by):
+    return ax * by - ay * bx
+
+
+def _segments_intersect(a, b) -> bool:
+    ax0, ay0, ax1, ay1 = a
+    bx0, by0, bx1, by1 = b
+    d1 = _cross(bx1 - bx0, by1 - by0, ax0 - bx0, ay0 - by0)
+    d2 = _cross(bx1 - bx0, by1 - by0, ax1 - bx0, ay1 - by0)
+    d3 = _cross(ax1 - ax0, ay1 - ay0, bx0 - ax0, by0 - ay0)
+    d4 = _cross(ax1 - ax0, ay1 - ay0, bx1 - ax0, by1 - ay0)
+    if ((d1 > 0) != (d2 > 0) and d1 != 0 and d2 != 0 and (d3 > 0) !=
+        (d4 > 0) and d3 != 0 and d4 != 0):
+        return True
+
+    def on_segment(px, py, x0, y0, x1, y1, d):
+        return d == 0 and min(x0, x1) <= px <= max(x0, x1) and min(
+            y0, y1) <= py <= max(y0, y1)
+
+    return (on_segment(ax0, ay0, bx0, by0, bx1, by1, d1)
+            or on_segment(ax1, ay1, bx0, by0, bx1, by1, d2)
+            or on_segment(bx0, by0, ax0, ay0, ax1, ay1, d3)
+            or on_segment(bx1, by1, ax0, ay0, ax1, ay1, d4))
+
+
+def _point_in_polygon(x, y, polygon) -> bool:
+    inside = False
+    for (x0, y0), (x1, y1) in zip(polygon, polygon[1:] + polygon[:1]):
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+class SegmentBVH:
+    """
+    A bounding volume hierarchy over line segments, for exact ray casts and polygon overlap tests.
+
+    Nodes are axis aligned boxes split at the median of the segment centres along their longest
+    side, so a query only looks at the few segments near the ray or the polygon: the cost grows with
+    the logarithm of the number of walls and does not depend on the resolution of the map.
+
+    Segments are expected to form closed outlines, as given by `segments_from_mask` and
+    `polygon_segments`, so that `contains_point` can tell the inside of an obstacle by parity.
+
+    Attributes:
+        segments (np.ndarray): The segments, reordered so every leaf holds a contiguous range, see `segments_from_mask`.
+
+    Example:
+        bvh = SegmentBVH.from_mask(simulator._map_mask, simulator._map_position)
+        distance = bvh.raycast(sensor_position, direction, 150)
+    """
+
+    leaf_size: int = 4
+    """Largest number of segments in a leaf"""
+
+    def __init__(self, segments: np.ndarray, groups: np.ndarray = None):
+        """
+        Args:
+            segments (np.ndarray): Array of shape (number of segments, 4) holding x0, y0, x1, y1.
+            groups (np.ndarray): The outline each segment belongs to, e.g. the mask or one polygon; all in one outline if None.
+        """
+        segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+        if groups is None:
+            groups = np.zeros(len(segments), dtype=np.int64)
+        order = np.arange(len(segments))
+        centres = (segments[:, :2] + segments[:, 2:]) / 2
+        low = np.minimum(segments[:, :2], segments[:, 2:])
+        high = np.maximum(segments[:, :2], segments[:, 2:])
+
+        # per node: bounding box, [split axis, left, right] (None for leaves) and range of segments
+        self._boxes = []
+        self._children = []
+        self._ranges = []
+        pending = [(0, len(segments), None, 0)]
+        while pending:
+            start, end, parent, side = pending.pop()
+            index = len(self._boxes)
+            if parent is not None:
+                children = self._children[parent]
+                children[side] = index
+            members = order[start:end]
+            if len(members):
+                self._boxes.append(
+                    (*low[members].min(axis=0).tolist(),
+                     *high[members].max(axis=0).tolist()))
+            else:
+                self._boxes.append((math.inf, math.inf, -math.inf, -math.inf))
+            self._ranges.append((start, end))
+            if end - start <= self.leaf_size:
+                self._children.append(None)
+                continue
+            axis = int(np.argmax(np.ptp(centres[members], axis=0)))
+            self._children.append([axis, -1, -1])
+            middle = (end - start) // 2
+            order[start:end] = members[np.argpartition(
+                centres[members, axis], middle)]
+            pending.append((start + middle, end, index, 2))
+            pending.append((start, start + middle, index, 1))
+
+        self.segments = segments[order]
+        self._segments = self.segments.tolist()
+        self._groups = np.asarray(groups)[order].tolist()
+
+    @classmethod
+    def from_mask(cls,
+                  mask: pg.Mask,
+                  offset: pg.Vector2 = (0, 0),
+                  polygons: list = ()) -> "SegmentBVH":
+        """
+        Build the hierarchy from the outline of the set pixels of a mask, plus optional polygonal obstacles.
+
+        Args:
+            mask (pg.Mask): The wall mask, e.g. the map mask of a simulator.
+            offset (pg.Vector2): Position of the mask on the screen.
+            polygons (list): Extra obstacles, each a list of (x, y) corners in screen coordinates.
+        """
+        outlines = [segments_from_mask(mask, offset)] + [
+            polygon_segments(polygon) for polygon in polygons
+        ]
+        # overlapping obstacles would cancel out in a parity test, so every outline is counted on its own
+        groups = np.concatenate([
+            np.full(len(outline), group, dtype=np.int64)
+            for group, outline in enumerate(outlines)
+        ])
+        return cls(np.concatenate(outlines), groups)
+
+    def __len__(self):
+        return len(self._segments)
+
+    def raycast(self, origin, direction, max_distance: float = math.inf):
+        """
+        Find the first segment hit by a ray.
+
+        Args:
+            origin (pg.Vector2): Start of the ray.
+            direction (pg.Vector2): Direction of the ray; distances are measured in multiples of its length, so pass a unit vector to get pixels.
+            max_distance (float): Hits farther than this are ignored.
+
+        Returns:
+            float or None: The distance to the first hit, or None if nothing is hit within `max_distance`.
+        """
+        ox, oy = origin[0], origin[1]
+        dx, dy = direction[0], direction[1]
+        inverse_x = 1 / dx if dx else 0.0
+        inverse_y = 1 / dy if dy else 0.0
+        best = max_distance
+        hit = False
+
+        boxes, children, ranges, segments = (self._boxes, self._children,
+                                             self._ranges, self._segments)
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            min_x, min_y, max_x, max_y = boxes[node]
+            # slab test; a zero direction component only checks the origin is within the slab
+            near, far = 0.0, best
+            if dx > 0:
+                t0, t1 = (min_x - ox) * inverse_x, (max_x - ox) * inverse_x
+            elif dx < 0:
+                t0, t1 = (max_x - ox) * inverse_x, (min_x - ox) * inverse_x
+            elif min_x <= ox <= max_x:
+                t0, t1 = near, far
+            else:
+                continue
+            if t0 > near:
+                near = t0
+            if t1 < far:
+                far = t1
+            if dy > 0:
+                t0, t1 = (min_y - oy) * inverse_y, (max_y - oy) * inverse_y
+            elif dy < 0:
+                t0, t1 = (max_y - oy) * inverse_y, (min_y - oy) * inverse_y
+            elif min_y <= oy <= max_y:
+                t0, t1 = near, far
+            else:
+                continue
+            if t0 > near:
+                near = t0
+            if t1 < far:
+                far = t1
+            if near > far:
+                continue
+
+            node_children = children[node]
+            if node_children is not None:
+                # visit the child nearer along the ray first, it often prunes the other one
+                axis, left, right = node_children
+                if (dx if axis == 0 else dy) < 0:
+                    stack.append(left)
+                    stack.append(right)
+                else:
+                    stack.append(right)
+                    stack.append(left)
+                continue
+            start, end = ranges[node]
+            for x0, y0, x1, y1 in segments[start:end]:
+                ex, ey = x1 - x0, y1 - y0
+                denominator = dx * ey - dy * ex
+                if denominator == 0:
+                    continue  # parallel, the segments touching its ends report the hit
+                px, py = x0 - ox, y0 - oy
+                t = (px * ey - py * ex) / denominator
+                s = (px * dy - py * dx) / denominator
+                if 0 <= t <= best and 0 <= s <= 1:
+                    best = t
+                    hit = True
+        return best if hit else None
+
+    def query_box(self, min_x: float, min_y: float, max_x: float,
+                  max_y: float) -> list:
+        """
+        Get the segments whose bounding box overlaps the given box.
+
+        Returns:
+            list: The segments as (x0, y0, x1, y1) tuples.
+        """
+        return [
+            self._segments[index]
+            for index in self._query(min_x, min_y, max_x, max_y)
+        ]
+
+    def _query(self, min_x, min_y, max_x, max_y) -> list:
+        """Get the indices of the segments whose bounding box overlaps the given box."""
+        found = []
+        boxes, children, ranges, segments = (self._boxes, self._children,
+                                             self._ranges, self._segments)
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            box_min_x, box_min_y, box_max_x, box_max_y = boxes[node]
+            if (box_min_x > max_x or box_max_x < min_x or box_min_y > max_y
+                    or box_max_y < min_y):
+                continue
+            node_children = children[node]
+            if node_children is not None:
+                stack.append(node_children[1])
+                stack.append(node_children[2])
+                continue
+            start, end = ranges[node]
+            for index in range(start, end):
+                x0, y0, x1, y1 = segments[index]
+                if ((x0 if x0 < x1 else x1) <= max_x
+                        and (x1 if x0 < x1 else x0) >= min_x
+                        and (y0 if y0 < y1 else y1) <= max_y
+                        and (y1 if y0 < y1 else y0) >= min_y):
+                    found.append(index)
+        return found
+
+    def contains_point(self, x: float, y: float) -> bool:
+        """
+        Check if a point lies inside an obstacle, i.e. inside a filled region of the mask or inside a polygon.
+
+        An axis aligned ray is cast from the point towards the nearest side of the hierarchy and the
+        crossings of each outline are counted: an odd count means the point is inside that outline.
+
+        Returns:
+            bool: True if the point is inside an obstacle.
+        """
+        if not self._segments:
+            return False
+        min_x, min_y, max_x, max_y = self._boxes[0]
+        # (length, axis, sign, query box) of the four rays
+        length, axis, sign, box = min(
+            (x - min_x, 0, -1, (min_x, y, x, y)),
+            (max_x - x, 0, 1, (x, y, max_x, y)),
+            (y - min_y, 1, -1, (x, min_y, x, y)),
+            (max_y - y, 1, 1, (x, y, x, max_y)),
+        )
+        if length < 0:
+            return False  # outside the hierarchy
+        along, across = (x, y) if axis == 0 else (y, x)
+        inside = set()
+        for index in self._query(*box):
+            x0, y0, x1, y1 = self._segments[index]
+            a0, c0, a1, c1 = (x0, y0, x1, y1) if axis == 0 else (y0, x0, y1,
+                                                                   x1)
+            # half open across the ray, so a ray through a shared corner counts one of the two segments
+            if (c0 > across) != (c1 > across):
+                crossing = a0 + (across - c0) * (a1 - a0) / (c1 - c0)
+                if (crossing - along) * sign > 0:
+                    inside ^= {self._groups[index]}
+        return bool(inside)
+
+    def intersects_polygon(self, polygon) -> bool:
+        """
+        Check if a polygon, e.g. the footprint of a robot, overlaps an obstacle.
+
+        The polygon overlaps if a segment crosses or lies inside it, or, with no segment near it, if
+        it lies entirely inside a filled region.
+
+        Args:
+            polygon (list): The corners of the polygon, as (x, y) pairs.
+
+        Returns:
+            bool: True if the polygon touches a wall.
+        """
+        polygon = [(float(x), float(y)) for x, y in polygon]
+        xs, ys = [x for x, _ in polygon], [y for _, y in polygon]
+        candidates = self.query_box(min(xs), min(ys), max(xs), max(ys))
+        if candidates:
+            edges = polygon_segments(polygon).tolist()
+            for segment in candidates:
+                if _point_in_polygon(segment[0], segment[1], polygon):
+                    return True
+                if any(_segments_intersect(segment, edge) for edge in edges):
+                    return True
+        # no outline crosses the polygon, so it is either all inside or all outside the obstacles
+        return self.contains_point(*polygon[0])
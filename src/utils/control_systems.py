@@ -0,0 +1,167 @@
+import numpy as np
+
+
+class PIDController:
+    """
+    A single PID controller working on Python floats, for one robot; see `PIDBank` for many.
+
+    Example:
+        pid = PIDController(10, 0, 0.5)
+        acceleration = pid.calculate(target - position, 1 / 60)
+    """
+
+    def __init__(self, kp: float, ki: float, kd: float):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.previous_error = 0
+        self.integral = 0
+
+    def calculate(self, error: float, delta_time: float) -> float:
+        self.integral += error * delta_time
+        self.derivative = (error - self.previous_error) / delta_time
+        self.output = (self.kp * error) + (self.ki * self.integral) + (
+            self.kd * self.derivative)
+        self.previous_error = error
+
+        return self.output
+
+
+class PIDBank:
+    """
+    K PID controllers updated together over NumPy arrays, e.g. one per robot of a large simulation.
+
+    Every parameter is either a scalar shared by all the controllers or an array with one value
+    per controller. Besides the plain PID terms, each controller has:
+        - a first order low-pass filter on the derivative, with time constant `derivative_filter`;
+        - output limits, with anti-windup: the integral is clamped to `integral_limit` and stops
+          growing while the output is saturated in the direction of the error.
+
+    With no filter, limits or integral limit, a controller gives the same outputs as a
+    `PIDController` with the same gains.
+
+    Attributes:
+        kp (np.ndarray): Proportional gains.
+        ki (np.ndarray): Integral gains.
+        kd (np.ndarray): Derivative gains.
+        integral (np.ndarray): Integral of the error of each controller.
+        previous_error (np.ndarray): Error of the last update.
+        derivative (np.ndarray): Filtered derivative of the error at the last update.
+        output (np.ndarray): Output of the last update, updated in place.
+
+    Example:
+        bank = PIDBank(len(robots), kp=10, kd=0.5, low=-2000, high=2000)
+        accelerations = bank.update(targets - simulator.sensor_data[0::4], 1 / 60)
+    """
+
+    def __init__(self,
+                 count: int,
+                 kp=0.0,
+                 ki=0.0,
+                 kd=0.0,
+                 derivative_filter=0.0,
+                 low=-np.inf,
+                 high=np.inf,
+                 integral_limit=np.inf):
+        """
+        Args:
+            count (int): Number of controllers.
+            kp (float | np.ndarray): Proportional gains.
+            ki (float | np.ndarray): Integral gains.
+            kd (float | np.ndarray): Derivative gains.
+            derivative_filter (float | np.ndarray): Time constant in seconds of the derivative filter, 0 for none.
+            low (float | np.ndarray): Smallest output.
+            high (float | np.ndarray): Largest output.
+            integral_limit (float | np.ndarray): Largest absolute value of the integral.
+        """
+        self.count = count
+
+        def per_controller(value):
+            return np.broadcast_to(np.asarray(value, dtype=np.float64),
+                                   (count, )).copy()
+
+        self.kp = per_controller(kp)
+        self.ki = per_controller(ki)
+        self.kd = per_controller(kd)
+        self.derivative_filter = per_controller(derivative_filter)
+        self.low = per_controller(low)
+        self.high = per_controller(high)
+        self.integral_limit = per_controller(integral_limit)
+
+        self.integral = np.zeros(count)
+        self.previous_error = np.zeros(count)
+        self.derivative = np.zeros(count)
+        self.output = np.zeros(count)
+        self._unsaturated = np.zeros(count)
+        self._scratch = np.zeros(count)
+
+    def update(self, error: np.ndarray, delta_time) -> np.ndarray:
+        """
+        Advance every controller by one step.
+
+        Args:
+            error (np.ndarray): The error of each controller, target minus measurement.
+            delta_time (float | np.ndarray): Time since the last update, in seconds.
+
+        Returns:
+            np.ndarray: The output of each controller; it is `output`, overwritten by the next update.
+        """
+        error = np.asarray(error, dtype=np.float64)
+        previous_integral = self._scratch
+        previous_integral[:] = self.integral
+
+        self.integral += error * delta_time
+        np.clip(self.integral,
+                -self.integral_limit,
+                self.integral_limit,
+                out=self.integral)
+
+        raw_derivative = (error - self.previous_error) / delta_time
+        # low-pass filter: the derivative moves a fraction dt / (tau + dt) towards the new value
+        self.derivative += (raw_derivative - self.derivative) * (
+            delta_time / (self.derivative_filter + delta_time))
+        self.previous_error[:] = error
+
+        unsaturated = self._unsaturated
+        np.multiply(self.kp, error, out=unsaturated)
+        unsaturated += self.ki * self.integral
+        unsaturated += self.kd * self.derivative
+        np.clip(unsaturated, self.low, self.high, out=self.output)
+
+        # anti-windup: do not integrate further into a saturated output
+        winding_up = (self.output != unsaturated) & (
+            np.sign(error) == np.sign(unsaturated - self.output))
+        if winding_up.any():
+            np.copyto(self.integral, previous_integral, where=winding_up)
+        return self.output
+
+    def reset(self, which=None):
+        """
+        Clear the integral, derivative and previous error, e.g. when a robot starts a new task.
+
+        Args:
+            which (np.ndarray): Indices or a boolean mask of the controllers to reset, all of them if None.
+        """
+        which = slice(None) if which is None else which
+        self.integral[which] = 0
+        self.previous_error[which] = 0
+        self.derivative[which] = 0
+        self.output[which] = 0
+
+    def get_state(self) -> np.ndarray:
+        """
+        Get a copy of the internal state, e.g. to store it in a controller snapshot.
+
+        Returns:
+            np.ndarray: Array of shape (4, count) holding the integral, previous error, derivative and output.
+        """
+        return np.stack([
+            self.integral, self.previous_error, self.derivative, self.output
+        ])
+
+    def set_state(self, state: np.ndarray):
+        """
+        Restore a state returned by `get_state`.
+        """
+        (self.integral[:], self.previous_error[:], self.derivative[:],
+         self.output[:]) = state
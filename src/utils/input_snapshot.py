@@ -0,0 +1,96 @@
+import pygame as pg
+
+
+class _ReleasedKeys:
+    """Key state in which no key is pressed, used when there is no keyboard to poll."""
+
+    def __getitem__(self, key) -> bool:
+        return False
+
+
+class InputSnapshot:
+    """
+    An immutable view of the user input of one frame, captured once and shared by all robots and sensors.
+
+    Iterating over a snapshot yields its events, so handlers written for a plain list of Pygame
+    events keep working.
+
+    Attributes:
+        events (tuple): The Pygame events of the frame.
+        keys: The key state of the frame, as returned by `pg.key.get_pressed()`.
+    """
+    __slots__ = ("events", "keys", "_filtered")
+
+    def __init__(self, events=(), keys=None):
+        """
+        Args:
+            events: The Pygame events of the frame.
+            keys: The key state of the frame; if None, no key is considered pressed.
+        """
+        object.__setattr__(self, "events", tuple(events))
+        object.__setattr__(self, "keys",
+                           _ReleasedKeys() if keys is None else keys)
+        object.__setattr__(self, "_filtered", {})
+
+    @classmethod
+    def capture(cls) -> "InputSnapshot":
+        """
+        Poll Pygame for the events and key state of the current frame.
+
+        Example:
+            inputs = InputSnapshot.capture()
+        """
+        return cls(pg.event.get(), pg.key.get_pressed())
+
+    @classmethod
+    def of(cls, events) -> "InputSnapshot":
+        """
+        Wrap a list of events into a snapshot, returning snapshots unchanged.
+        """
+        if isinstance(events, cls):
+            return events
+        return cls(events)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("InputSnapshot is immutable")
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def filter(self, event_types) -> "InputSnapshot":
+        """
+        Get a snapshot with the same key state containing only events of the given types.
+
+        The result is cached per set of types, so subscribers sharing the same types share one filtered snapshot.
+
+        Args:
+            event_types: Iterable of Pygame event types, e.g. (pg.KEYDOWN, pg.KEYUP).
+        """
+        event_types = frozenset(event_types)
+        if event_types not in self._filtered:
+            self._filtered[event_types] = InputSnapshot(
+                [event for event in self.events if event.type in event_types],
+                self.keys,
+            )
+        return self._filtered[event_types]
+
+    def dispatch(self, subscriber):
+        """
+        Call `subscriber.event_handler` with the part of this snapshot it subscribed to.
+
+        A subscriber whose `input_event_types` is None receives the whole snapshot on every frame,
+        otherwise it is only called on frames containing at least one event of those types.
+
+        Args:
+            subscriber: An object with an `input_event_types` attribute and an `event_handler` method, e.g. a Robot or a Sensor.
+        """
+        if subscriber.input_event_types is None:
+            subscriber.event_handler(self)
+            return
+
+        filtered = self.filter(subscriber.input_event_types)
+        if filtered.events:
+            subscriber.event_handler(filtered)
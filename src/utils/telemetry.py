@@ -0,0 +1,167 @@
+import csv
+import os
+import queue
+import threading
+
+import numpy as np
+
+
+class TelemetryWriter:
+    """
+    Records rows of telemetry into typed column buffers and appends them to a file from a background thread.
+
+    Rows are written into preallocated NumPy columns; whenever `chunk_size` rows are buffered the
+    chunk is handed to a writer thread which appends it to the file, so the cost of a row in the
+    simulation loop does not depend on how long the run has been going.
+
+    At most `max_pending_chunks` chunks wait for the writer thread: past that, handing over a chunk
+    waits for the disk, so a slow disk slows the simulation down instead of filling the memory. If
+    the writer thread fails, e.g. because the disk is full, the error is raised again by the next
+    `flush` or `close`.
+
+    Two formats are supported:
+        - "csv": an append-only CSV file with a header line.
+        - "npy": a columnar binary file holding, per chunk, one `np.save`d array per column; read it back with `read_telemetry`.
+
+    Example:
+        writer = TelemetryWriter("bin/run.csv", {"time": np.float64, "x": np.float32, "facing": str})
+        writer.append(0.016, 103.5, "north")
+        writer.close()
+    """
+
+    def __init__(self,
+                 path: str,
+                 columns: dict,
+                 chunk_size: int = 1024,
+                 format: str = "csv",
+                 max_pending_chunks: int = 16):
+        """
+        Args:
+            path (str): The file to write; its directory is created if needed.
+            columns (dict): Column names mapped to NumPy dtypes (use `str` or `object` for text).
+            chunk_size (int): Number of rows buffered before they are handed to the writer thread.
+            format (str): "csv" or "npy".
+            max_pending_chunks (int): Number of chunks that can wait for the writer thread before `flush` blocks.
+        """
+        if format not in ("csv", "npy"):
+            raise ValueError(f"Unknown telemetry format: {format}")
+
+        self.path = path
+        self.columns = list(columns)
+        self.chunk_size = chunk_size
+        self.format = format
+        self._dtypes = [
+            np.dtype(object) if dtype is str else np.dtype(dtype)
+            for dtype in columns.values()
+        ]
+        self._buffers = self._new_buffers()
+        self._size = 0
+        self.number_of_rows = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._chunks = queue.Queue(maxsize=max_pending_chunks)
+        self._error: BaseException = None
+        self._thread = threading.Thread(target=self._write_chunks,
+                                        daemon=True)
+        self._thread.start()
+
+    def _new_buffers(self):
+        return [np.empty(self.chunk_size, dtype) for dtype in self._dtypes]
+
+    def append(self, *row):
+        """
+        Append one row, with one value per column in the order of `columns`.
+        """
+        for buffer, value in zip(self._buffers, row):
+            buffer[self._size] = value
+        self._size += 1
+        self.number_of_rows += 1
+        if self._size == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Hand the buffered rows to the writer thread without waiting for them to be written.
+
+        Raises:
+            Exception: The error the writer thread stopped on, if any; the buffered rows are dropped.
+        """
+        if self._error is not None:
+            self._size = 0
+            raise self._error
+        if self._size == 0:
+            return
+        self._chunks.put([buffer[:self._size] for buffer in self._buffers])
+        self._buffers = self._new_buffers()
+        self._size = 0
+
+    def close(self):
+        """
+        Write every buffered row and stop the writer thread.
+
+        Raises:
+            Exception: The error the writer thread stopped on, if any.
+        """
+        if self._thread is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._chunks.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            raise self._error
+
+    def _write_chunks(self):
+        try:
+            self._write_file()
+        except BaseException as error:
+            self._error = error
+            # keep taking chunks so a full queue never blocks the simulation, until close
+            while self._chunks.get() is not None:
+                pass
+
+    def _write_file(self):
+        mode = "w" if self.format == "csv" else "wb"
+        newline = {"newline": ""} if self.format == "csv" else {}
+        with open(self.path, mode, **newline) as file:
+            if self.format == "csv":
+                writer = csv.writer(file)
+                writer.writerow(self.columns)
+            while True:
+                chunk = self._chunks.get()
+                if chunk is None:
+                    return
+                if self.format == "csv":
+                    writer.writerows(
+                        zip(*(column.tolist() for column in chunk)))
+                else:
+                    for column in chunk:
+                        np.save(file, column, allow_pickle=True)
+                file.flush()
+
+
+def read_telemetry(path: str, columns: list) -> dict:
+    """
+    Read a file written by a TelemetryWriter in the "npy" format.
+
+    Args:
+        path (str): The file to read.
+        columns (list): The column names, in the order they were given to the writer.
+
+    Returns:
+        dict: Column names mapped to NumPy arrays holding all the rows.
+    """
+    chunks = {column: [] for column in columns}
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        while file.tell() < size:
+            for column in columns:
+                chunks[column].append(np.load(file, allow_pickle=True))
+    return {
+        column: np.concatenate(arrays) if arrays else np.empty(0)
+        for column, arrays in chunks.items()
+    }
@@ -0,0 +1,77 @@
+import numpy as np
+
+from src.robot.robot import Robot
+from src.robot.utils.sensor import LIDARSensor
+from src.simulator.cell_mode import (FORWARD, HEADING_EAST, HEADING_NORTH,
+                                     HEADING_WEST, TURN_AROUND, TURN_LEFT,
+                                     TURN_RIGHT, CellModeSim)
+from src.simulator.maze_generator import generate_maze
+from src.simulator.maze_solver import MazeSim
+from src.simulator.maze_walls import MazeWalls
+
+# 2x2 maze, start cell (0, 0) in the south west corner opens to the north only
+TEXT = """
++---+---+
+|       |
++   +   +
+|   |   |
++---+---+
+"""
+
+
+def test_moves_and_bumps():
+    walls = MazeWalls.from_text(TEXT)
+    cells = CellModeSim(walls, np.zeros((2, 2, 4, 1)), num_robots=2)
+    for actions in ([FORWARD, TURN_RIGHT], [FORWARD, FORWARD],
+                    [TURN_RIGHT, TURN_AROUND], [FORWARD, FORWARD]):
+        cells.step(actions)
+    # the first robot went north, bumped the north wall, then went east; the
+    # second one bumped the walls east and west of the start
+    assert cells.x.tolist() == [1, 0]
+    assert cells.y.tolist() == [1, 0]
+    assert cells.heading.tolist() == [HEADING_EAST, HEADING_WEST]
+    assert cells.bumps.tolist() == [1, 2]
+    assert cells.steps == 4
+
+    cells.reset()
+    assert cells.x.tolist() == [0, 0] and cells.bumps.tolist() == [0, 0]
+    assert cells.heading.tolist() == [HEADING_NORTH] * 2
+
+
+def test_random_walks_follow_the_passages():
+    walls = generate_maze(16, seed=2, loops=0.1)
+    graph = walls.graph()
+    cells = CellModeSim(walls, np.zeros((16, 16, 4, 1)), num_robots=256)
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        before = list(zip(cells.x.tolist(), cells.y.tolist()))
+        could_move = cells.can_move().copy()
+        actions = rng.choice([FORWARD, FORWARD, TURN_LEFT, TURN_RIGHT],
+                             size=256)
+        cells.step(actions)
+        for cell, after, action, free in zip(before, zip(cells.x, cells.y),
+                                             actions, could_move):
+            if action == FORWARD and free:
+                assert tuple(after) in graph[cell]
+            else:
+                assert tuple(after) == cell
+
+
+def test_sensor_table_matches_the_simulation():
+    sensors = [
+        LIDARSensor(f"lidar {angle}", [3, 0], angle, method="bvh")
+        for angle in (-60, 0, 60)
+    ]
+    robot = Robot([0, 0], 0, [10, 8], sensors=sensors)
+    simulator = MazeSim([robot],
+                        generate_maze(4, seed=0),
+                        scaling_factor=0.7,
+                        headless=True)
+    cells = simulator.cell_mode()
+    rng = np.random.default_rng(0)
+    for x, y, heading in rng.integers(0, 4, (20, 3)).tolist():
+        robot.set_position(simulator.cell_transform.centre_of(x, y))
+        robot.set_angle(heading * 90)
+        simulator.step(0, [])
+        np.testing.assert_allclose(robot.sensor_data,
+                                   cells.sensor_table[x, y, heading])
@@ -0,0 +1,67 @@
+import os
+
+import pygame as pg
+
+from src.robot.robot import Robot
+from src.simulator.collision import CollisionEventStream
+from src.simulator.maze_solver import MazeSim
+
+MAZE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets",
+                    "16x16 sample maze for testing.svg")
+
+
+def test_contacts_closer_than_the_debounce_time_count_once():
+    stream = CollisionEventStream(debounce_time=0.25)
+    scraping, other = object(), object()
+    point = pg.Vector2(0, 0)
+
+    # one second of contact on every frame, then a gap, then a short contact
+    for frame in range(60):
+        stream.record(scraping, frame / 60, point)
+    assert stream.count(scraping) == 1
+    assert stream.record(scraping, 59 / 60 + 0.2, point) is None
+    assert stream.record(scraping, 59 / 60 + 0.2 + 0.3, point) is not None
+    assert stream.count(scraping) == 2
+
+    # contacts spaced by the debounce time or more all count
+    for contact in range(4):
+        stream.record(other, contact * 0.25, point)
+    assert stream.count(other) == 4
+    assert stream.count() == 6
+    assert [event.robot for event in stream.drain()
+            ] == [scraping, scraping] + [other] * 4
+    assert stream.drain() == []
+
+
+def test_state_keeps_the_debounce():
+    stream = CollisionEventStream(debounce_time=0.25)
+    robots = [object(), object()]
+    stream.record(robots[0], 1.0, pg.Vector2(0, 0))
+    state = stream.get_state(robots)
+
+    stream.reset()
+    stream.set_state(robots, state)
+    assert stream.count(robots[0]) == 1 and stream.count(robots[1]) == 0
+    assert stream.record(robots[0], 1.1, pg.Vector2(0, 0)) is None
+    assert stream.record(robots[1], 1.1, pg.Vector2(0, 0)) is not None
+
+
+def test_robot_against_a_wall_collides_once():
+    # pushed into the west wall of the maze, so it touches it on every frame
+    robot = Robot([497, 20], 0, [10, 8])
+    simulator = MazeSim([robot], MAZE, scaling_factor=0.7, headless=True)
+    for _ in range(30):
+        simulator.step(60, [])
+    assert simulator.number_of_collisions_occurred == 1
+    state = simulator.snapshot()
+
+    robot.set_position([510, 20])
+    for _ in range(30):
+        simulator.step(60, [])
+    robot.set_position([497, 20])
+    simulator.step(60, [])
+    assert simulator.number_of_collisions_occurred == 2
+
+    simulator.restore(state)
+    simulator.step(60, [])
+    assert simulator.number_of_collisions_occurred == 1
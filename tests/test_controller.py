@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+
+from src.robot.controller import Controller, SharedMemoryController
+
+
+class SumController(Controller):
+
+    def compute(self, observation):
+        return np.array([observation.sum(), observation[0]])
+
+
+class SlowController(Controller):
+    """Answers with the first entry of the observation twice, after a delay."""
+
+    def compute(self, observation):
+        time.sleep(0.01)
+        return np.array([observation[0], observation[0]])
+
+
+def test_commands_answer_their_observation():
+    controller = SharedMemoryController(SumController(), 3, latency_budget=2)
+    try:
+        for step in range(100):
+            observation = np.array([step, 2.0, -1.5])
+            command = controller.step(observation)
+            np.testing.assert_array_equal(command,
+                                          [observation.sum(), step])
+    finally:
+        controller.close()
+    controller.close()
+
+
+def test_slow_controller_gives_the_latest_whole_command():
+    controller = SharedMemoryController(SlowController(), 2,
+                                        latency_budget=0.001)
+    try:
+        previous = 0
+        for step in range(1, 150):
+            command = controller.step(np.array([step, 0.0]))
+            # never a mix of two commands, never newer than the observation
+            assert command[0] == command[1]
+            assert previous <= command[0] < step
+            previous = command[0]
+            time.sleep(0.001)
+        assert previous > 0
+        # within the budget again, the answer to the current observation comes back
+        controller.latency_budget = 2
+        np.testing.assert_array_equal(
+            controller.step(np.array([1000.0, 0.0])), [1000, 1000])
+
+        # a command being written is not read
+        block = controller._block
+        block[SharedMemoryController._COMMAND_SEQUENCE] += 1
+        assert controller._read_command() == -1
+        block[SharedMemoryController._COMMAND_SEQUENCE] += 1
+    finally:
+        controller.close()
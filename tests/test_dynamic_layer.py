@@ -0,0 +1,43 @@
+import numpy as np
+import pygame as pg
+
+from src.robot.robot import Robot
+from src.simulator.dynamic_layer import DynamicOccupancy
+
+
+def union_of_footprints(layer, robots):
+    mask = pg.Mask(layer.mask.get_size())
+    for robot in robots:
+        footprint = robot.footprint_mask(robot._angle)
+        mask.draw(footprint,
+                  footprint.get_rect(center=robot._position -
+                                     layer.offset).topleft)
+    return mask
+
+
+def test_moving_robots_keep_the_layer_exact():
+    rng = np.random.default_rng(0)
+    layer = DynamicOccupancy((200, 200), (10, 20))
+    # packed robots, so erasing one often has to restore the pixels of another
+    robots = [
+        Robot([rng.uniform(20, 200), rng.uniform(30, 210)],
+              rng.uniform(0, 6.28), [14, 10]) for _ in range(60)
+    ]
+    for robot in robots:
+        layer.stamp(robot)
+    for _ in range(5):
+        for robot in robots:
+            layer.erase(robot)
+            assert robot not in layer
+            robot._position += pg.Vector2(*rng.uniform(-8, 8, 2))
+            robot._angle += rng.uniform(-0.5, 0.5)
+            layer.stamp(robot)
+        expected = union_of_footprints(layer, robots)
+        assert expected.count() == layer.mask.count()
+        assert expected.overlap_area(layer.mask, (0, 0)) == expected.count()
+
+    layer.erase(robots[0])
+    expected = union_of_footprints(layer, robots[1:])
+    assert expected.overlap_area(layer.mask, (0, 0)) == layer.mask.count()
+    layer.clear()
+    assert layer.mask.count() == 0
@@ -0,0 +1,48 @@
+from examples.helpers.flood_fill import FloodFill
+from examples.helpers.micro_mouse_maze import (EAST, NORTH, SOUTH, WEST,
+                                               MicroMouseMaze)
+from src.simulator.maze_generator import generate_maze
+
+
+def explore(maze, truth, start, on_visit):
+    """Visits every reachable node depth first, telling the maze the true passages of each one."""
+    stack, seen = [start], {start}
+    while stack:
+        node = stack.pop()
+        passages = int(truth.cells[node])
+        maze.add_edges(
+            node,
+            facing_direction="north",
+            front=bool(passages & NORTH),
+            right=bool(passages & EAST),
+            back=bool(passages & SOUTH),
+            left=bool(passages & WEST),
+        )
+        on_visit(node)
+        for neighbour in truth.neighbours(node):
+            if neighbour not in seen:
+                seen.add(neighbour)
+                stack.append(neighbour)
+
+
+def test_update_matches_reflood_during_exploration():
+    for seed, loops in ((0, 0.0), (1, 0.2), (2, 0.5)):
+        truth = MicroMouseMaze.from_walls(generate_maze(16, seed, loops))
+        maze = MicroMouseMaze(16)
+        flood_fill = FloodFill(maze)
+
+        def check(node):
+            # a new flood fill computes its distances from scratch
+            reference = FloodFill(maze.copy())
+            assert flood_fill.distances == reference.distances, (seed, node)
+
+        explore(maze, truth, maze.node_of_cell(0, 0), check)
+
+
+def test_update_finds_unreachable_cells():
+    maze = MicroMouseMaze(4)
+    flood_fill = FloodFill(maze)
+    # wall a corner node in completely
+    maze.visit_node(0)
+    assert flood_fill.distances[0] == flood_fill.unreachable
+    assert flood_fill.distances == FloodFill(maze.copy()).distances
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src.simulator.maze_generator import generate_corpus, generate_maze
+from src.simulator.maze_walls import (EAST, MAZE_FILE_EXTENSIONS, NORTH,
+                                      SOUTH, WEST, MazeWalls)
+
+# 2x2 maze, start cell (0, 0) in the south west corner opens to the north only
+TEXT = """
++---+---+
+|       |
++   +   +
+|   |   |
++---+---+
+"""
+
+
+def test_parse_text():
+    walls = MazeWalls.from_text(TEXT)
+    assert walls.size == 2
+    assert walls.cells()[0, 0] == EAST | SOUTH | WEST
+    assert walls.cells()[1, 1] == NORTH | EAST
+    assert walls.has_wall(0, 0, EAST) and walls.has_wall(1, 0, WEST)
+    assert not walls.has_wall(0, 0, NORTH)
+    assert sorted(walls.graph()[(0, 1)]) == [(0, 0), (1, 1)]
+
+
+@pytest.mark.parametrize("extension", MAZE_FILE_EXTENSIONS)
+def test_files_round_trip(tmp_path, extension):
+    walls = generate_maze(16, seed=4, loops=0.2)
+    path = str(tmp_path / f"maze{extension}")
+    walls.save(path)
+    loaded = MazeWalls.load(path)
+    np.testing.assert_array_equal(loaded.horizontal, walls.horizontal)
+    np.testing.assert_array_equal(loaded.vertical, walls.vertical)
+
+
+def test_maz_layout(tmp_path):
+    path = str(tmp_path / "maze.maz")
+    MazeWalls.from_text(TEXT).save(path)
+    with open(path, "rb") as file:
+        # one byte per cell, column by column from the south west corner
+        assert list(file.read()) == [
+            EAST | SOUTH | WEST, NORTH | WEST, SOUTH | EAST | WEST,
+            NORTH | EAST
+        ]
+
+
+def test_generated_maze_is_connected():
+    walls = generate_maze(16, seed=1, goal_size=2)
+    again = generate_maze(16, seed=1, goal_size=2)
+    np.testing.assert_array_equal(walls.cells(), again.cells())
+    assert walls.horizontal[[0, -1]].all()
+    assert walls.vertical[:, [0, -1]].all()
+    assert walls.has_wall(0, 0, EAST)
+
+    graph = walls.graph()
+    seen, pending = {(0, 0)}, [(0, 0)]
+    while pending:
+        for other in graph[pending.pop()]:
+            if other not in seen:
+                seen.add(other)
+                pending.append(other)
+    assert len(seen) == 16 * 16
+
+
+def test_corpus_is_cached(tmp_path):
+    paths = generate_corpus(str(tmp_path), 2, size=8)
+    assert generate_corpus(str(tmp_path), 2, size=8) == paths
+    np.testing.assert_array_equal(
+        MazeWalls.load(paths[1]).cells(),
+        generate_maze(8, seed=1).cells())
@@ -0,0 +1,40 @@
+import math
+
+import pytest
+
+from examples.helpers.micro_mouse_maze import WEST, MicroMouseMaze
+
+
+@pytest.mark.parametrize("cells", range(1, 16))
+def test_fastest_path_time_of_one_straight(cells):
+    maze = MicroMouseMaze(16)
+    for node in range(cells):
+        maze.open_passages(node, WEST)
+
+    path, time = maze.fastest_path(0, cells, "west", return_time=True)
+
+    assert path == list(range(cells + 1))
+    assert math.isclose(time,
+                        MicroMouseMaze.straight_travel_time(cells, 35, 1000, 300))
+
+
+@pytest.mark.parametrize("policy", ["latest", "random", "heuristic"])
+def test_copy_keeps_the_frontier(policy):
+    maze = MicroMouseMaze(16, exploration_policy=policy)
+    maze.frontier._random.seed(3)
+    node = maze.node_of_cell(0, 0)
+    for _ in range(40):
+        maze.open_passages(node, 15)
+        maze.visit_node(node)
+        node = maze.frontier.select(node)
+    other = maze.copy()
+
+    assert list(other.frontier) == list(maze.frontier)
+    for _ in range(20):
+        for explored in (maze, other):
+            explored.open_passages(node, 15)
+            explored.visit_node(node)
+        expected = maze.frontier.select(node)
+        assert other.frontier.select(node) == expected
+        node = expected
+    assert list(other.frontier) == list(maze.frontier)
@@ -0,0 +1,59 @@
+import math
+
+import numpy as np
+import pygame as pg
+
+from src.simulator.collision import mask_to_array
+from src.simulator.occupancy_pyramid import OccupancyPyramid
+from src.simulator.wall_geometry import SegmentBVH
+
+
+def random_mask(rng, size):
+    mask = pg.Mask(size)
+    for _ in range(12):
+        width, height = rng.integers(1, 30, 2)
+        mask.draw(pg.Mask((int(width), int(height)), fill=True),
+                  tuple(int(value) for value in rng.integers(0, size)))
+    for x, y in zip(rng.integers(0, size[0], 40), rng.integers(0, size[1],
+                                                                40)):
+        mask.set_at((int(x), int(y)))
+    return mask
+
+
+def test_box_is_empty_matches_brute_force():
+    rng = np.random.default_rng(0)
+    offset = pg.Vector2(30, -12)
+    mask = random_mask(rng, (203, 150))
+    pixels = mask_to_array(mask)
+    pyramid = OccupancyPyramid(mask, offset)
+
+    for _ in range(3000):
+        width, height = rng.exponential(20, 2)
+        min_x, min_y = rng.uniform(-40, 240, 2) + offset
+        max_x, max_y = min_x + width, min_y + height
+        x0, y0 = (max(math.floor(value - origin), 0)
+                  for value, origin in ((min_x, offset.x), (min_y, offset.y)))
+        x1, y1 = math.floor(max_x - offset.x), math.floor(max_y - offset.y)
+        expected = not pixels[x0:max(x1 + 1, 0), y0:max(y1 + 1, 0)].any()
+        assert pyramid.box_is_empty(min_x, min_y, max_x, max_y) == expected
+
+
+def test_raycast_matches_the_wall_segments():
+    rng = np.random.default_rng(1)
+    mask = random_mask(rng, (160, 120))
+    pyramid = OccupancyPyramid(mask, (5, 5))
+    bvh = SegmentBVH.from_mask(mask, (5, 5))
+    pixels = mask_to_array(mask)
+
+    for _ in range(500):
+        origin = rng.uniform(5, 165), rng.uniform(5, 125)
+        if pixels[int(origin[0] - 5), int(origin[1] - 5)]:
+            continue  # both report 0 there, in their own way
+        angle = rng.uniform(0, 2 * math.pi)
+        direction = (math.cos(angle), math.sin(angle))
+        expected = bvh.raycast(origin, direction, 100)
+        distance = pyramid.raycast(origin, direction, 100)
+        if expected is None:
+            assert distance is None
+        else:
+            assert abs(distance - expected) < 1e-6
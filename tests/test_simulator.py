@@ -0,0 +1,32 @@
+import os
+
+from src.robot.robot import Robot
+from src.robot.utils.sensor import LIDARSensor
+from src.simulator.maze_solver import MazeSim
+
+MAZE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets",
+                    "16x16 sample maze for testing.svg")
+
+
+def square(x, y, size):
+    return [(x, y), (x + size, y), (x + size, y + size), (x, y + size)]
+
+
+def test_obstacles_reach_lidar_and_vector_collision():
+    lidar = LIDARSensor("front", [0, 0], 0, method="bvh")
+    # the centre of the first cell of the maze, away from its walls
+    robot = Robot([510, 20], 0, [10, 8], sensors=[lidar])
+    simulator = MazeSim([robot], MAZE, scaling_factor=0.7, headless=True)
+    simulator.step(60, [])
+    assert not simulator.detect_vector_collision(robot)
+    assert lidar.get_data() > 10
+
+    simulator.add_obstacles([square(517, 10, 20)])
+    simulator.step(60, [])
+    assert abs(lidar.get_data() - (517 - robot.get_position().x)) < 1e-6
+    assert not simulator.detect_vector_collision(robot)
+
+    # an obstacle under the whole robot, with none of its edges crossing the footprint
+    simulator.add_obstacles([square(495, 5, 30)])
+    assert simulator.detect_vector_collision(robot)
+    assert len(simulator.obstacles) == 2
@@ -0,0 +1,54 @@
+import csv
+
+import numpy as np
+import pytest
+
+from src.utils.telemetry import TelemetryWriter, read_telemetry
+
+COLUMNS = {"time": np.float64, "x": np.float32, "cell": np.int32, "facing": str}
+
+
+def rows(count):
+    return [(step / 60, step * 1.5, step % 16, ["north", "east"][step % 2])
+            for step in range(count)]
+
+
+def test_npy_round_trip(tmp_path):
+    path = str(tmp_path / "run" / "telemetry.npy")
+    writer = TelemetryWriter(path, COLUMNS, chunk_size=4, format="npy")
+    for row in rows(10):
+        writer.append(*row)
+    writer.close()
+    writer.close()
+
+    data = read_telemetry(path, list(COLUMNS))
+    assert writer.number_of_rows == 10
+    for index, column in enumerate(COLUMNS):
+        assert data[column].tolist() == [row[index] for row in rows(10)]
+    assert data["x"].dtype == np.float32
+
+
+def test_csv_round_trip(tmp_path):
+    path = str(tmp_path / "telemetry.csv")
+    writer = TelemetryWriter(path, COLUMNS, chunk_size=3)
+    for row in rows(7):
+        writer.append(*row)
+    writer.close()
+
+    with open(path, newline="") as file:
+        lines = list(csv.reader(file))
+    assert lines[0] == list(COLUMNS)
+    assert lines[1:] == [[str(value) for value in row] for row in rows(7)]
+
+
+def test_writer_errors_are_raised(tmp_path):
+    # the path is a directory, so the writer thread cannot open it
+    writer = TelemetryWriter(str(tmp_path), COLUMNS, chunk_size=1,
+                             max_pending_chunks=1)
+    with pytest.raises(OSError):
+        # a bounded queue must not block forever once the thread has failed
+        for row in rows(10000):
+            writer.append(*row)
+    with pytest.raises(OSError):
+        writer.close()
+    writer.close()
@@ -0,0 +1,64 @@
+import functools
+import os
+
+import numpy as np
+import pytest
+
+from src.robot.robot import Robot
+from src.robot.utils.sensor import LIDARSensor
+from src.simulator.maze_solver import MazeSim
+from src.simulator.vector_env import SimEnv, VectorEnv
+
+MAZE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets",
+                    "16x16 sample maze for testing.svg")
+
+
+def make_simulator():
+    sensors = [
+        LIDARSensor(f"lidar {angle}", [0, 0], angle, method="bvh")
+        for angle in (-45, 0, 45)
+    ]
+    robot = Robot([510, 20], 0, [10, 8], sensors=sensors)
+    return MazeSim([robot], MAZE, scaling_factor=0.7, headless=True)
+
+
+def make_env(max_steps):
+    return SimEnv(make_simulator, max_steps=max_steps)
+
+
+def run(env, actions):
+    results = [env.reset()]
+    for action in actions:
+        results.extend(env.step(action))
+    env.close()
+    return results
+
+
+def test_step_and_reset():
+    env = VectorEnv([functools.partial(make_env, 5)] * 3)
+    observations = env.reset()
+    assert observations.shape == (3, 3)
+    first = observations.copy()
+
+    actions = np.zeros((3, 2))
+    actions[:, 0] = 300
+    for step in range(5):
+        observations, rewards, dones, truncateds = env.step(actions)
+        assert rewards.shape == dones.shape == truncateds.shape == (3, )
+        assert truncateds.all() == (step == 4)
+    # the truncated episodes were reset, back to the first observation
+    np.testing.assert_array_equal(observations, first)
+    env.close()
+
+
+@pytest.mark.parametrize("start_method", ["fork", "spawn"])
+def test_workers_match_in_process(start_method):
+    make_envs = [functools.partial(make_env, 8)] * 3
+    rng = np.random.default_rng(0)
+    actions = rng.uniform(-200, 200, (12, 3, 2))
+
+    expected = run(VectorEnv(make_envs), actions)
+    results = run(VectorEnv(make_envs, num_workers=2,
+                            start_method=start_method), actions)
+    for result, value in zip(results, expected):
+        np.testing.assert_array_equal(result, value)
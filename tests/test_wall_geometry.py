@@ -0,0 +1,45 @@
+import numpy as np
+import pygame as pg
+
+from src.simulator.wall_geometry import SegmentBVH
+
+
+def square(x, y, size):
+    return [(x, y), (x + size, y), (x + size, y + size), (x, y + size)]
+
+
+def filled_mask():
+    # a 100x100 wall block with a 20x20 hole in the middle
+    mask = pg.Mask((200, 200))
+    mask.draw(pg.Mask((100, 100), fill=True), (50, 50))
+    mask.erase(pg.Mask((20, 20), fill=True), (90, 90))
+    return mask
+
+
+def test_footprint_inside_a_filled_region_collides():
+    bvh = SegmentBVH.from_mask(filled_mask(), (10, 0))
+    # far from any outline, entirely inside the block
+    assert bvh.intersects_polygon(square(70, 60, 10))
+    # crossing the outer outline, and inside the hole
+    assert bvh.intersects_polygon(square(55, 45, 10))
+    assert not bvh.intersects_polygon(square(105, 95, 10))
+    # outside the block
+    assert not bvh.intersects_polygon(square(10, 10, 10))
+    assert not bvh.intersects_polygon(square(170, 170, 10))
+
+
+def test_contains_point_matches_the_mask():
+    mask = filled_mask()
+    bvh = SegmentBVH.from_mask(mask)
+    rng = np.random.default_rng(0)
+    for x, y in rng.uniform(0, 200, (500, 2)):
+        assert bvh.contains_point(x, y) == bool(mask.get_at((int(x), int(y))))
+
+
+def test_overlapping_polygons_stay_inside():
+    bvh = SegmentBVH.from_mask(pg.Mask((200, 200)), (0, 0),
+                               polygons=[square(20, 20, 60),
+                                         square(40, 40, 60)])
+    assert bvh.contains_point(60, 60)
+    assert bvh.intersects_polygon(square(55, 55, 5))
+    assert not bvh.contains_point(150, 150)